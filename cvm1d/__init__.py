@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+# cvm1d: importable compute modules for the 1-D Cluster Variation Method (1D CVM) demos. 
+#
+# Copyright 2023 Themesis, Inc.; made available under the MIT License (see LICENSE).
+#
+# The configuration variables are always kept in the same order as the config_vars_list 
+#   of the demo programs: [y1, y2, y3, w1, w2, w3, z1, z2, z3, z4, z5, z6]
+#
+# The compute API (the functions imported here) is pure: the functions take NumPy arrays and the
+#   grid dimensions (array_size_list) as arguments, return arrays or dictionaries of arrays, and
+#   neither print nor keep global state, so they can be called in-process at a high rate, e.g.:
+#     import cvm1d
+#     activ = cvm1d.obtain_random_activations((1000, 2), x1=0.35, seed=1)
+#     grid_results = cvm1d.evaluate_activations(activ, (1000, 2), epsilon1=-0.25)
+#     grid_results['config_vars'], grid_results['neg_entropy'], grid_results['free_energy']
+#
+# The names are loaded lazily: cvm1d.<name> imports its submodule on first use (PEP 562), so
+#   importing one submodule (from cvm1d.grid import ...) does not also load the rest of the
+#   package, and the demo script pays at start only for the modules it actually calls.
+#
+####################################################################################################
+
+import importlib
+
+
+api_submodules = {
+    'grid': ['validate_array_size_list', 'obtain_random_activations', 'obtain_local_config_codes',
+             'obtain_config_var_counts_batch', 'obtain_config_vars_batch', 'evaluate_activations'],
+    'free_energy': ['compute_enthalpy_sweep', 'compute_free_energy_sweep', 'minimize_free_energy',
+                    'minimize_free_energy_curve'],
+    'node_grid': ['NodeGrid', 'assign_local_config_vars_node_grid', 'obtain_config_var_counts_node_grid'],
+    'patterns': ['obtain_builtin_activations', 'obtain_random_patterns', 'obtain_block_patterns',
+                 'obtain_alternating_patterns', 'obtain_cluster_patterns', 'obtain_template_patterns'],
+    'symmetry': ['obtain_canonical_key', 'ConfigVarCache', 'obtain_process_config_var_cache'],
+    'monte_carlo': ['obtain_swap_tables', 'swap_config_var_counts', 'run_swap_monte_carlo'],
+    'annealing': ['obtain_cooling_schedule', 'anneal_activations'],
+    'tempering': ['run_parallel_tempering'],
+    'enumeration': ['enumerate_config_var_counts', 'obtain_neg_entropy_distribution'],
+    'transfer_matrix': ['solve_transfer_matrix'],
+    'entropy': ['compute_neg_entropy_array', 'compute_neg_entropy_counts_array'],
+    'bitpack': ['pack_activation_rows', 'unpack_activation_rows', 'obtain_config_var_counts_packed'],
+    'replicas': ['obtain_random_replica_activations', 'run_replica_monte_carlo'],
+    'swaps': ['obtain_swap_deltas_base', 'obtain_swap_impact_matrix', 'obtain_best_swaps'],
+    'render': ['render_turtle_grid_image', 'render_turtle_grid_file', 'write_png'],
+    'trajectory': ['TrajectoryRecorder', 'write_trajectory_file'],
+}
+
+api_name_submodules = {name: submodule for submodule, names in api_submodules.items() for name in names}
+
+__all__ = list(api_name_submodules)
+
+
+def __getattr__(name):
+
+    if name not in api_name_submodules:
+        raise AttributeError("module 'cvm1d' has no attribute '" + name + "'")
+    value = getattr(importlib.import_module('cvm1d.' + api_name_submodules[name]), name)
+    globals()[name] = value
+    return(value)
+
+
+def __dir__():
+
+    return(sorted(set(globals()) | set(__all__)))
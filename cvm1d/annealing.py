@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+# Copyright 2023 Themesis, Inc.; made available under the MIT License (see LICENSE).
+#
+# Code created by: Alianna J. Maren; assigned to Themesis, Inc.
+#
+#===================================================================================================
+#
+# SIMULATED ANNEALING: search for the activation pattern of lowest free energy at a given eps1
+#   and a fixed x1, with node-swap moves under a cooling schedule.
+#
+#===================================================================================================
+#
+# The moves and their acceptance are those of run_swap_monte_carlo (cvm1d/monte_carlo.py): one ON
+#   node and one OFF node, picked at random, exchange activations (so x1 never changes), and a move
+#   is accepted with probability min(1, exp(-total_nodes*delta_free_energy/temperature)), with
+#     free_energy = epsilon1*(z2/2 + z3 + z4 + z5/2) + neg_entropy
+#   found from the incremental update of the config var counts. The temperature steps down through
+#   the schedule (a list of temperatures), with moves_per_temperature moves at each, and the
+#   pattern of lowest free energy seen is returned as well as the one at the end of the run.
+# With a ConfigVarCache (cvm1d/symmetry.py), the counts of the starting pattern and of the best one
+#   are looked up in it (and kept there), so that restarts from the same pattern, or annealing runs
+#   at other eps1 values that end on the same pattern or on a symmetric copy of it, skip the count.
+#
+####################################################################################################
+
+import numpy as np
+
+from cvm1d.grid import validate_array_size_list, obtain_config_var_counts_batch
+from cvm1d.monte_carlo import obtain_swap_tables, obtain_swap_state, obtain_swap_state_activ
+from cvm1d.monte_carlo import run_metropolis_moves, evaluate_config_var_counts
+
+
+####################################################################################################
+#
+# Cooling schedules: num_stages temperatures from initial_temperature down to final_temperature,
+#   in equal ratios (geometric) or in equal steps (linear)
+#
+####################################################################################################
+
+def obtain_cooling_schedule(initial_temperature, final_temperature, num_stages, schedule='geometric'):
+
+    if num_stages < 1:
+        raise ValueError('The cooling schedule needs at least one stage')
+    if schedule == 'geometric':
+        if initial_temperature <= 0.0 or final_temperature <= 0.0:
+            raise ValueError('A geometric schedule needs positive temperatures')
+        temperatures = np.geomspace(initial_temperature, final_temperature, num_stages)
+    elif schedule == 'linear':
+        temperatures = np.linspace(initial_temperature, final_temperature, num_stages)
+    else:
+        raise ValueError('Unknown cooling schedule: ' + str(schedule))
+
+    return(temperatures)
+
+
+####################################################################################################
+#
+# Anneal the activations activ (total_nodes values, in node order) at epsilon1, stepping through
+#   the temperatures (moves_per_temperature moves at each); returns a dictionary of results
+#   for the best pattern found, with the move statistics
+#
+####################################################################################################
+
+def anneal_activations(activ, array_size_list, epsilon1, temperatures, moves_per_temperature, seed=None,
+                       swap_tables=None, config_var_cache=None):
+
+    array_size_list = validate_array_size_list(array_size_list)
+    total_nodes = array_size_list[0]*array_size_list[1]
+    temperatures = np.atleast_1d(np.asarray(temperatures, dtype=float))
+    if swap_tables is None:
+        swap_tables = obtain_swap_tables(array_size_list)
+    swap_state = obtain_swap_state(activ, array_size_list, config_var_cache)
+    rng = np.random.default_rng(seed)
+
+    move_results = run_metropolis_moves(swap_tables, swap_state, epsilon1, temperatures, moves_per_temperature, rng,
+                                        track_best=True)
+    num_moves = move_results['moves']
+    elapsed_time = move_results['elapsed_time']
+    best_activ = np.frombuffer(move_results['best_state'], dtype=np.uint8).astype(np.int8)
+
+# The best pattern is re-evaluated from its counts, so that no rounding from the running sums is left
+    if config_var_cache is None:
+        best_counts = obtain_config_var_counts_batch(best_activ[None, :], array_size_list)[0]
+    else:
+        best_counts = config_var_cache.obtain_config_var_counts(best_activ, array_size_list)
+
+    annealing_results = {
+        'epsilon1': epsilon1,
+        'temperatures': temperatures,
+        'moves_per_temperature': moves_per_temperature,
+        'moves': num_moves,
+        'accepted_moves': move_results['accepted_moves'],
+        'acceptance_rate': move_results['accepted_moves']/float(num_moves) if num_moves > 0 else 0.0,
+        'elapsed_time': elapsed_time,
+        'moves_per_second': num_moves/elapsed_time if elapsed_time > 0.0 else 0.0,
+        'initial_free_energy': move_results['initial_free_energy'],
+        'final_free_energy': move_results['final_free_energy'],
+        'final_activ': obtain_swap_state_activ(swap_state),
+        'final_config_var_counts': np.array(swap_state['config_var_counts'], dtype=np.int64),
+        'best_move_num': move_results['best_move_num'],
+        'activ': best_activ,
+        'x1': float(best_activ.mean()),
+    }
+    annealing_results.update(evaluate_config_var_counts(best_counts, total_nodes, epsilon1))
+
+    return(annealing_results)
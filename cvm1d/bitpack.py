@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+# Copyright 2023 Themesis, Inc.; made available under the MIT License (see LICENSE).
+#
+# Code created by: Alianna J. Maren; assigned to Themesis, Inc.
+#
+#===================================================================================================
+#
+# BIT-PACKED GRIDS: activations packed 64 nodes to a word, with the y/w/z counts found by
+#   shifts, AND/XOR masks and popcount.
+#
+#===================================================================================================
+#
+# Each row of the grid is packed into ceil(array_length/64) unsigned 64-bit words:
+#   the node in column col is bit (col % 64) of word (col // 64), and the unused bits at the top
+#   of the last word are always 0. A grid of array_layers x array_length nodes is a
+#   (array_layers, num_words) uint64 array - one bit per node instead of one Node object
+#   (or one int8) per node. Leading axes, if any, hold a batch of grids.
+#
+# Along a zigzag chain (rows 2p and 2p + 1) the nodes alternate between the upper row U and the
+#   lower row D: U[0], D[0], U[1], D[1], ... so that, with "left" meaning one column to the left
+#   (with the wrap-around), Ul = rotate(U) and Dl = rotate(D):
+#   - for a node in U, the nearest neighbor to its left is in Dl, the next-nearest neighbor to its
+#     left is in Ul, and its triplet is (Ul, Dl, U);
+#   - for a node in D, the nearest neighbor to its left is in U, the next-nearest neighbor to its
+#     left is in Dl, and its triplet is (Dl, U, D).
+# Counting only to the left counts each pair and each triplet once, as in the config var counts of
+#   the demo programs. With a = the left-most node, b = the middle node and c = the node itself
+#   (A = 1, B = 0):
+#   y1 = popcount(c & b)          y2 = popcount(c ^ b)         y3 = the rest
+#   w1 = popcount(c & a)          w2 = popcount(c ^ a)         w3 = the rest
+#   z1 = popcount(a & b & c)      z2 = popcount(b & (a ^ c))   z3 = popcount(a & ~b & c)
+#   z4 = popcount(~a & b & ~c)    z5 = popcount(~b & (a ^ c))  z6 = the rest
+#
+####################################################################################################
+
+import numpy as np
+
+
+# Bits per word
+word_bits = 64
+
+# Number of 1 bits in each byte value, for NumPy versions without np.bitwise_count
+byte_popcounts = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
+
+
+####################################################################################################
+#
+# Pack and unpack the rows of activations (any array whose last two axes are (layers, length))
+#
+####################################################################################################
+
+def obtain_num_words(array_length):
+
+    return((array_length + word_bits - 1)//word_bits)
+
+
+def pack_activation_rows(activ_rows):
+
+    activ_rows = np.asarray(activ_rows)
+    array_length = activ_rows.shape[-1]
+    padded_rows = np.zeros(activ_rows.shape[:-1] + (obtain_num_words(array_length)*word_bits,), dtype=np.uint8)
+    padded_rows[..., :array_length] = activ_rows != 0
+    packed_bytes = np.packbits(padded_rows, axis=-1, bitorder='little')
+    packed_rows = np.ascontiguousarray(packed_bytes).view('<u8').astype(np.uint64)
+
+    return(packed_rows)
+
+
+def unpack_activation_rows(packed_rows, array_length):
+
+    packed_bytes = np.ascontiguousarray(packed_rows, dtype='<u8').view(np.uint8)
+    activ_rows = np.unpackbits(packed_bytes, axis=-1, count=array_length, bitorder='little')
+
+    return(activ_rows.astype(np.int8))
+
+
+####################################################################################################
+#
+# Word-level helpers: the mask of the bits in use, popcount, and rotation by one column
+#
+####################################################################################################
+
+def obtain_row_mask(array_length):
+
+    row_mask = np.full(obtain_num_words(array_length), np.uint64(0xFFFFFFFFFFFFFFFF))
+    unused_bits = row_mask.size*word_bits - array_length
+    row_mask[-1] = row_mask[-1] >> np.uint64(unused_bits)
+
+    return(row_mask)
+
+
+def count_bits(words, axis=None):
+
+    words = np.asarray(words, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):
+        bit_counts = np.bitwise_count(words)
+    else:
+        bit_counts = byte_popcounts[words[..., None].view(np.uint8)].sum(axis=-1)
+
+    return(bit_counts.sum(axis=axis, dtype=np.int64))
+
+
+# Rotate each row one column to the RIGHT, so that column col of the result holds column col - 1
+#   of the row (and column 0 holds column array_length - 1): the node to the left of each node.
+def rotate_columns_right(packed_rows, array_length):
+
+    one = np.uint64(1)
+    top_bit = np.uint64(word_bits - 1)
+    rotated = packed_rows << one
+    rotated[..., 1:] |= packed_rows[..., :-1] >> top_bit
+    last_bit = np.uint64((array_length - 1) % word_bits)
+    rotated[..., 0] |= (packed_rows[..., -1] >> last_bit) & one
+    rotated &= obtain_row_mask(array_length)
+
+    return(rotated)
+
+
+####################################################################################################
+#
+# Config var counts [Y1, Y2, Y3, W1, W2, W3, Z1, ..., Z6] of packed grids
+#
+####################################################################################################
+
+def obtain_config_var_counts_packed(packed_rows, array_size_list):
+
+    array_length = array_size_list[0]
+    array_layers = array_size_list[1]
+    packed_rows = np.asarray(packed_rows, dtype=np.uint64)
+    row_mask = obtain_row_mask(array_length)
+
+    upper = packed_rows[..., 0::2, :]
+    lower = packed_rows[..., 1::2, :]
+    upper_left = rotate_columns_right(upper, array_length)
+    lower_left = rotate_columns_right(lower, array_length)
+
+# (a, b, c) = (next-nearest neighbor to the left, nearest neighbor to the left, node) for U and D
+    config_var_counts = np.zeros(packed_rows.shape[:-2] + (12,), dtype=np.int64)
+    for a, b, c in ((upper_left, lower_left, upper), (lower_left, upper, lower)):
+        not_a, not_b, not_c = a ^ row_mask, b ^ row_mask, c ^ row_mask
+        a_xor_c = a ^ c
+        config_var_counts[..., 0] += count_bits(c & b, axis=(-2, -1))
+        config_var_counts[..., 1] += count_bits(c ^ b, axis=(-2, -1))
+        config_var_counts[..., 3] += count_bits(c & a, axis=(-2, -1))
+        config_var_counts[..., 4] += count_bits(a_xor_c, axis=(-2, -1))
+        config_var_counts[..., 6] += count_bits(a & b & c, axis=(-2, -1))
+        config_var_counts[..., 7] += count_bits(b & a_xor_c, axis=(-2, -1))
+        config_var_counts[..., 8] += count_bits(a & not_b & c, axis=(-2, -1))
+        config_var_counts[..., 9] += count_bits(not_a & b & not_c, axis=(-2, -1))
+        config_var_counts[..., 10] += count_bits(not_b & a_xor_c, axis=(-2, -1))
+
+    total_nodes = array_length*array_layers
+    config_var_counts[..., 2] = total_nodes - config_var_counts[..., 0] - config_var_counts[..., 1]
+    config_var_counts[..., 5] = total_nodes - config_var_counts[..., 3] - config_var_counts[..., 4]
+    config_var_counts[..., 11] = total_nodes - config_var_counts[..., 6:11].sum(axis=-1)
+
+    return(config_var_counts)
+
+
+####################################################################################################
+#
+# Read and change single nodes of a packed grid (node_num = row*array_length + col)
+#
+####################################################################################################
+
+def obtain_packed_activation(packed_rows, node_num, array_length):
+
+    row, col = divmod(int(node_num), array_length)
+    word = packed_rows[row, col//word_bits]
+
+    return(int((word >> np.uint64(col % word_bits)) & np.uint64(1)))
+
+
+def swap_packed_activations(packed_rows, node1_num, node2_num, array_length):
+
+    activ1 = obtain_packed_activation(packed_rows, node1_num, array_length)
+    activ2 = obtain_packed_activation(packed_rows, node2_num, array_length)
+    if activ1 != activ2:
+        for node_num in (node1_num, node2_num):
+            row, col = divmod(int(node_num), array_length)
+            packed_rows[row, col//word_bits] ^= np.uint64(1) << np.uint64(col % word_bits)
+
+    return(packed_rows)
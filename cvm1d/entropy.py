@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+# Copyright 2023 Themesis, Inc.; made available under the MIT License (see LICENSE).
+#
+# Code created by: Alianna J. Maren; assigned to Themesis, Inc.
+#
+#===================================================================================================
+#
+# NEGATIVE ENTROPY: batched NumPy kernels for the negative entropy of compute_neg_entropy,
+#   for many config-var vectors at once.
+#
+#===================================================================================================
+#
+# The negative entropy is a sum of one x*ln(x) term per config var:
+#   neg_entropy = -2*(y1 ln y1 + 2*y2' ln y2' + y3 ln y3)
+#                 +2*(z1 ln z1 + 2*z2' ln z2' + z3 ln z3 + z4 ln z4 + 2*z5' ln z5' + z6 ln z6)
+#   where y2' = y2/2, z2' = z2/2 and z5' = z5/2 account for the degeneracy in counting,
+#   and the w's do not enter.
+# A config var of zero contributes zero (x*ln(x) -> 0 as x -> 0), so that uniform grids and other
+#   edge patterns, where some y or z fractions are zero, give finite values.
+#
+# For a grid of total_nodes nodes, every config var is count/total_nodes for an integer count
+#   between 0 and total_nodes, so the terms can be looked up instead of computed:
+#   obtain_neg_entropy_table builds a (12 x (total_nodes + 1)) table of the term for each config
+#   var and each count, and compute_neg_entropy_counts_array adds up 12 table entries per count
+#   vector. The tables of the neg_entropy_tables_kept most recently used grid sizes are kept
+#   (functools.lru_cache), so a sweep over many chain lengths does not keep one table per length
+#   for the life of the process.
+#   For very large grids (more than neg_entropy_table_limit nodes) the table would be too big to
+#   keep (12 x 8 bytes per node), and the terms are computed directly instead.
+#
+####################################################################################################
+
+from functools import lru_cache
+
+import numpy as np
+
+
+# Scale factors: y2, w2, z2 and z5 are divided by two to account for degeneracy in counting
+neg_entropy_scales = np.array([1.0, 0.5, 1.0, 1.0, 0.5, 1.0, 1.0, 0.5, 1.0, 1.0, 0.5, 1.0])
+# Coefficients: -2.0 for the y terms (2.0*2.0 for y2) and +2.0 for the z terms (2.0*2.0 for z2, z5);
+#   the w's do not enter the negative entropy
+neg_entropy_coeffs = np.array([-2.0, -4.0, -2.0, 0.0, 0.0, 0.0, 2.0, 4.0, 2.0, 2.0, 4.0, 2.0])
+
+# Lookup tables kept (for the most recently used grid sizes), and the largest grid given a table
+neg_entropy_tables_kept = 8
+neg_entropy_table_limit = 1 << 16
+
+
+####################################################################################################
+#
+# x*ln(x), with 0*ln(0) = 0
+#
+####################################################################################################
+
+def compute_x_log_x(x):
+
+    x = np.asarray(x, dtype=float)
+    safe_x = np.where(x > 0.0, x, 1.0)
+
+    return(x*np.log(safe_x))
+
+
+####################################################################################################
+#
+# Negative entropy of fractional config vars (any array whose last axis holds the 12 config vars)
+#
+####################################################################################################
+
+def compute_neg_entropy_array(config_vars):
+
+    fractions = np.asarray(config_vars, dtype=float)*neg_entropy_scales
+
+    return(compute_x_log_x(fractions) @ neg_entropy_coeffs)
+
+
+####################################################################################################
+#
+# Negative entropy of integer config var counts, by table lookup
+#
+####################################################################################################
+
+@lru_cache(maxsize=neg_entropy_tables_kept)
+def obtain_neg_entropy_table(total_nodes):
+
+    fractions = np.arange(total_nodes + 1)/float(total_nodes)
+    table = neg_entropy_coeffs[:, None]*compute_x_log_x(neg_entropy_scales[:, None]*fractions)
+    table.setflags(write=False)
+
+    return(table)
+
+
+def compute_neg_entropy_counts_array(config_var_counts, total_nodes):
+
+    config_var_counts = np.asarray(config_var_counts)
+    if np.any(config_var_counts < 0) or np.any(config_var_counts > total_nodes):
+        raise ValueError('config var counts must be between 0 and total_nodes')
+    if total_nodes > neg_entropy_table_limit:
+        return(compute_neg_entropy_array(config_var_counts/float(total_nodes)))
+    table = obtain_neg_entropy_table(total_nodes)
+    terms = table[np.arange(12), config_var_counts]
+
+    return(terms.sum(axis=-1))
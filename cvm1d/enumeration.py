@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+# Copyright 2023 Themesis, Inc.; made available under the MIT License (see LICENSE).
+#
+# Code created by: Alianna J. Maren; assigned to Themesis, Inc.
+#
+#===================================================================================================
+#
+# EXACT ENUMERATION: every activation pattern of a (small) grid, and the histogram of the y/w/z
+#   count vectors of the patterns.
+#
+#===================================================================================================
+#
+# Pattern number p (0 .. 2**total_nodes - 1) gives node x the activation (p >> x) & 1
+#   (bit x of p).
+# With x1_count given, only the C(total_nodes, x1_count) patterns with x1_count ON nodes are made:
+#   pattern number r (0 .. C(total_nodes, x1_count) - 1) is the r-th combination of x1_count ON
+#   nodes in colexicographic order, i.e. the nodes c_k > ... > c_1 with r = C(c_k, k) + ... + C(c_1, 1);
+#   from k = x1_count down to 1, c_k is the largest c with C(c, k) <= r (a search of the column k
+#   of a table of binomial coefficients, for the whole chunk at once).
+# The patterns are handled in chunks of patterns_per_chunk, so the memory used stays flat:
+#   - the left-triplet index of every node is found with obtain_left_triplet_index;
+#   - each index adds its y, w and z counts (triplet_count_vectors) to a single integer KEY per
+#     pattern, in which each of the nine independent counts (Y1, Y2, W1, W2, Z1 .. Z5) is one
+#     digit in base (total_nodes + 1); Y3, W3 and Z6 follow from the others, since each kind sums
+#     to total_nodes;
+#   - the keys of the chunk are counted with np.unique.
+# Chunks can be spread over worker processes (max_workers), for longer chains; at most
+#   tasks_in_flight_per_worker chunks per worker are submitted at a time (cvm1d/parallel.py).
+# The key must fit in 63 bits, which holds for grids of up to 127 nodes;
+#   far beyond what can be enumerated.
+#
+# enumerate_config_var_counts returns the distinct count vectors (an (n_distinct, 12) array, each
+#   row in the order of the config_vars_list) and the number of patterns that have each count
+#   vector.
+#
+####################################################################################################
+
+import concurrent.futures
+from math import comb
+
+import numpy as np
+
+from cvm1d.entropy import compute_neg_entropy_counts_array
+from cvm1d.grid import triplet_count_vectors, obtain_left_triplet_index
+from cvm1d.parallel import run_bounded_tasks, tasks_in_flight_per_worker
+
+
+# Positions of the independent counts (the key digits) within the 12 config var counts
+enumeration_key_counts = (0, 1, 3, 4, 6, 7, 8, 9, 10)
+
+
+def obtain_enumeration_key_table(total_nodes):
+
+    base = total_nodes + 1
+    digit_values = base**np.arange(len(enumeration_key_counts), dtype=np.int64)
+    key_table = triplet_count_vectors[:, enumeration_key_counts] @ digit_values
+
+    return(key_table)
+
+
+def decode_enumeration_keys(keys, total_nodes):
+
+    base = total_nodes + 1
+    config_var_counts = np.zeros((len(keys), 12), dtype=np.int64)
+    remainder = np.array(keys, dtype=np.int64)
+    for digit, position in enumerate(enumeration_key_counts):
+        config_var_counts[:, position] = remainder % base
+        remainder = remainder // base
+    config_var_counts[:, 2] = total_nodes - config_var_counts[:, 0] - config_var_counts[:, 1]
+    config_var_counts[:, 5] = total_nodes - config_var_counts[:, 3] - config_var_counts[:, 4]
+    config_var_counts[:, 11] = total_nodes - config_var_counts[:, 6:11].sum(axis=1)
+
+    return(config_var_counts)
+
+
+# The patterns first_pattern .. first_pattern + num_patterns - 1 with x1_count ON nodes (in
+#   colexicographic order of their ON nodes)
+def obtain_fixed_count_patterns(total_nodes, x1_count, first_pattern, num_patterns):
+
+    binomials = np.array([[comb(n, k) for k in range(x1_count + 1)] for n in range(total_nodes)], dtype=np.int64)
+    remainder = np.arange(first_pattern, first_pattern + num_patterns, dtype=np.int64)
+    activ = np.zeros((num_patterns, total_nodes), dtype=np.int8)
+    pattern_nums = np.arange(num_patterns)
+    for k in range(x1_count, 0, -1):
+        on_nodes = np.searchsorted(binomials[:, k], remainder, side='right') - 1
+        activ[pattern_nums, on_nodes] = 1
+        remainder = remainder - binomials[on_nodes, k]
+
+    return(activ)
+
+
+def enumerate_config_var_keys_chunk(array_size_list, first_pattern, num_patterns, x1_count=None):
+
+    array_length = array_size_list[0]
+    array_layers = array_size_list[1]
+    total_nodes = array_length*array_layers
+
+# Unpack the bits of each pattern number (least significant bit first) into node activations
+    if x1_count is None:
+        patterns = np.arange(first_pattern, first_pattern + num_patterns, dtype='<i8')
+        activ = np.unpackbits(patterns.view(np.uint8).reshape(num_patterns, 8), axis=1,
+                              count=total_nodes, bitorder='little').view(np.int8)
+    else:
+        activ = obtain_fixed_count_patterns(total_nodes, x1_count, first_pattern, num_patterns)
+
+    triplet_index = obtain_left_triplet_index(activ.reshape(-1, array_layers, array_length))
+    keys = obtain_enumeration_key_table(total_nodes)[triplet_index].reshape(len(activ), total_nodes).sum(axis=1)
+    keys, multiplicities = np.unique(keys, return_counts=True)
+
+    return(keys, multiplicities)
+
+
+def enumerate_config_var_counts(array_size_list, x1_count=None, patterns_per_chunk=1 << 16, max_workers=None):
+
+    total_nodes = array_size_list[0]*array_size_list[1]
+    if total_nodes > 62:
+        raise ValueError('Exact enumeration is limited to grids of at most 62 nodes')
+    if x1_count is None:
+        total_patterns = 1 << total_nodes
+    elif 0 <= x1_count <= total_nodes:
+        total_patterns = comb(total_nodes, x1_count)
+    else:
+        total_patterns = 0
+
+    chunks = ((array_size_list, first_pattern, min(patterns_per_chunk, total_patterns - first_pattern), x1_count)
+              for first_pattern in range(0, total_patterns, patterns_per_chunk))
+
+    key_histogram = dict()
+    def add_chunk(keys, multiplicities):
+        for key, multiplicity in zip(keys.tolist(), multiplicities.tolist()):
+            key_histogram[key] = key_histogram.get(key, 0) + multiplicity
+
+    if max_workers is None or max_workers <= 1:
+        for chunk in chunks:
+            add_chunk(*enumerate_config_var_keys_chunk(*chunk))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for keys, multiplicities in run_bounded_tasks(executor, enumerate_config_var_keys_chunk, chunks,
+                                                          tasks_in_flight_per_worker*max_workers):
+                add_chunk(keys, multiplicities)
+
+    keys = np.array(sorted(key_histogram), dtype=np.int64)
+    multiplicities = np.array([key_histogram[key] for key in keys.tolist()], dtype=np.int64)
+    config_var_counts = decode_enumeration_keys(keys, total_nodes)
+
+    return(config_var_counts, multiplicities)
+
+
+# The exact distribution of the negative entropy: the distinct neg_entropy values
+#   (in increasing order) and the number of patterns with each value.
+#   Values that agree to within "decimals" decimal places are counted as the same value.
+def obtain_neg_entropy_distribution(config_var_counts, multiplicities, total_nodes, decimals=12):
+
+    neg_entropy = compute_neg_entropy_counts_array(config_var_counts, total_nodes)
+    neg_entropy_values, value_num = np.unique(np.round(neg_entropy, decimals), return_inverse=True)
+    value_multiplicities = np.bincount(value_num.ravel(), weights=multiplicities,
+                                       minlength=len(neg_entropy_values)).astype(np.int64)
+
+    return(neg_entropy_values, value_multiplicities)
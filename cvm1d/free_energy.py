@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+# Copyright 2023 Themesis, Inc.; made available under the MIT License (see LICENSE).
+#
+# Code created by: Alianna J. Maren; assigned to Themesis, Inc.
+#
+#===================================================================================================
+#
+# FREE-ENERGY MINIMIZATION: find the equilibrium config vars for each eps1 (and, optionally,
+#   a fixed x1) by minimizing the CVM free energy directly in config-variable space.
+#
+#===================================================================================================
+#
+# The free energy is the one used in the demo programs:
+#   free_energy = enthalpy + neg_entropy
+#   enthalpy    = epsilon1*(z2/2 + z3 + z4 + z5/2)
+#   neg_entropy = -2*sum(y ln y) + 2*sum(z ln z)    (y2 and z2, z5 split into their two orientations)
+# The unknowns are the six triplet fractions per orientation, s = [s1, ..., s6], so that the
+#   config vars are z1 = s1, z2 = 2*s2, z3 = s3, z4 = s4, z5 = 2*s5, z6 = s6, and
+#   y1 = s1 + s2,  y2 = 2*(s2 + s4) = 2*(s3 + s5),  y3 = s5 + s6.
+# The constraints are all linear in s:
+#   normalization:  s1 + 2*s2 + s3 + s4 + 2*s5 + s6 = 1
+#   consistency:    s2 + s4 = s3 + s5     (A-B pairs counted from either end of a triplet agree)
+#   fixed x1:       s1 + 2*s2 + s4 = x1   (only when x1 is given)
+# The neg-entropy is convex on this constraint set (it is minus a conditional entropy), so Newton's
+#   method on the equality-constrained problem (one small KKT system per state point) converges
+#   to the single minimum; a step is shortened only to keep every s positive and to make the free
+#   energy decrease.
+#
+# minimize_free_energy solves a whole array of state points together (whole-curve mode), each
+#   starting from independent nodes or from given starting values;
+#   minimize_free_energy_curve walks along the eps1 values in order instead, starting each
+#   point from the solutions at the two previous eps1 values, extrapolated in log s (warm starts:
+#   2-3 Newton iterations per point instead of 4-8).
+# The results can be checked against cvm1d.transfer_matrix, which is exact for the infinite chain.
+#
+####################################################################################################
+
+import numpy as np
+
+from cvm1d.entropy import compute_neg_entropy_array
+from cvm1d.transfer_matrix import obtain_config_vars_from_triplets
+from cvm1d.transfer_matrix import compute_enthalpy_array
+
+
+# Number of orientations of each triplet class s1, ..., s6 (A-A-B and B-A-A, A-B-B and B-B-A)
+triplet_degeneracy = np.array([1.0, 2.0, 1.0, 1.0, 2.0, 1.0])
+
+# Enthalpy per unit s, so that enthalpy = epsilon1*(triplet_enthalpy_weights . s)
+triplet_enthalpy_weights = np.array([0.0, 1.0, 1.0, 1.0, 1.0, 0.0])
+
+# The y pairs as sums of s: rows give y1, y2/2 (one orientation, averaged over both ends of a
+#   triplet, which keeps the Hessian symmetric) and y3, with their degeneracy
+pair_matrix = np.array([[1.0, 1.0, 0.0, 0.0, 0.0, 0.0],
+                        [0.0, 0.5, 0.5, 0.5, 0.5, 0.0],
+                        [0.0, 0.0, 0.0, 0.0, 1.0, 1.0]])
+pair_degeneracy = np.array([1.0, 2.0, 1.0])
+
+# Constraint rows: normalization, consistency and x1
+constraint_matrix = np.array([[1.0, 2.0, 1.0, 1.0, 2.0, 1.0],
+                              [0.0, 1.0, -1.0, 1.0, -1.0, 0.0],
+                              [1.0, 2.0, 0.0, 1.0, 0.0, 0.0]])
+
+# Position of each triplet (a, b, c), indexed by 4*a + 2*b + c, in s (node value 1 is A)
+triplet_classes = np.array([5, 4, 3, 1, 4, 2, 1, 0])
+
+# Default convergence settings
+newton_tolerance = 1.0e-12
+newton_iterations = 100
+step_to_boundary = 0.99
+
+
+####################################################################################################
+#
+# Enthalpy and free energy of given config vars (n_configs x 12, one config_vars_list per row)
+#   at many eps1 values at once; the results are (n_configs x n_eps) arrays. 
+#   If the neg-entropy values are not given they are computed from the config vars.
+#
+####################################################################################################
+
+def compute_enthalpy_sweep(config_vars_array, epsilon1_array):
+
+    config_vars_array = np.asarray(config_vars_array, dtype=float).reshape(-1, 12)
+    enthalpy = compute_enthalpy_array(config_vars_array[:, None, :],
+                                      np.asarray(epsilon1_array, dtype=float).ravel()[None, :])
+
+    return(enthalpy)
+
+
+def compute_free_energy_sweep(config_vars_array, epsilon1_array, neg_entropy=None):
+
+    config_vars_array = np.asarray(config_vars_array, dtype=float).reshape(-1, 12)
+    if neg_entropy is None:
+        neg_entropy = compute_neg_entropy_array(config_vars_array)
+    enthalpy = compute_enthalpy_sweep(config_vars_array, epsilon1_array)
+    free_energy = enthalpy + np.asarray(neg_entropy, dtype=float).reshape(-1, 1)
+
+    return(enthalpy, free_energy)
+
+
+####################################################################################################
+#
+# Free energy of s, with its gradient and Hessian (all batched over the leading axes)
+#
+####################################################################################################
+
+def compute_free_energy_s(s, epsilon1):
+
+    pairs = s @ pair_matrix.T
+    neg_entropy = 2.0*(np.sum(triplet_degeneracy*s*np.log(s), axis=-1) -
+                       np.sum(pair_degeneracy*pairs*np.log(pairs), axis=-1))
+
+    return(epsilon1*(s @ triplet_enthalpy_weights) + neg_entropy)
+
+
+def obtain_free_energy_derivatives(s, epsilon1):
+
+    pairs = s @ pair_matrix.T
+    gradient = epsilon1[..., None]*triplet_enthalpy_weights + \
+               2.0*(triplet_degeneracy*(np.log(s) + 1.0) - (pair_degeneracy*(np.log(pairs) + 1.0)) @ pair_matrix)
+    hessian = 2.0*(triplet_degeneracy[:, None]*np.eye(6)/s[..., None] -
+                   np.einsum('ji,...j,jk->...ik', pair_matrix, pair_degeneracy/pairs, pair_matrix))
+
+    return(gradient, hessian)
+
+
+####################################################################################################
+#
+# Starting values: independent nodes with the requested x1 (0.5 when x1 is free)
+#
+####################################################################################################
+
+def obtain_independent_s(x1):
+
+    x1 = np.asarray(x1, dtype=float)
+    x2 = 1.0 - x1
+    s = np.stack([x1*x1*x1, x1*x1*x2, x1*x2*x1, x2*x1*x2, x2*x2*x1, x2*x2*x2], axis=-1)
+
+    return(s)
+
+
+####################################################################################################
+#
+# Convert s into the fractional config vars [y1, y2, y3, w1, w2, w3, z1, ..., z6]
+#
+####################################################################################################
+
+def obtain_config_vars_from_s(s):
+
+    return(obtain_config_vars_from_triplets(s[..., triplet_classes]))
+
+
+####################################################################################################
+#
+# Newton iterations for a batch of state points. Starting values need not satisfy the constraints:
+#   a full Newton step satisfies them exactly, and a shortened step reduces the mismatch.
+#   Only the points that have not yet converged are worked on.
+#
+####################################################################################################
+
+def iterate_newton(s, epsilon1, x1, tolerance, max_iterations):
+
+    num_points = s.shape[0]
+    num_constraints = 2 if x1 is None else 3
+    constraints = constraint_matrix[:num_constraints]
+    targets = np.zeros((num_points, num_constraints))
+    targets[:, 0] = 1.0
+    if x1 is not None:
+        targets[:, 2] = x1
+
+    iterations = np.zeros(num_points, dtype=int)
+    converged = np.zeros(num_points, dtype=bool)
+    active = np.arange(num_points)
+    kkt_matrices = np.zeros((num_points, 6 + num_constraints, 6 + num_constraints))
+    kkt_matrices[:, :6, 6:] = constraints.T
+    kkt_matrices[:, 6:, :6] = constraints
+
+    for iteration in range(max_iterations):
+        s_now, eps_now = s[active], epsilon1[active]
+        gradient, hessian = obtain_free_energy_derivatives(s_now, eps_now)
+        residual = targets[active] - s_now @ constraints.T
+
+        kkt_matrix = kkt_matrices[active]
+        kkt_matrix[:, :6, :6] = hessian
+        kkt_rhs = np.concatenate([-gradient, residual], axis=-1)
+        step = np.linalg.solve(kkt_matrix, kkt_rhs[..., None])[..., :6, 0]
+        iterations[active] += 1
+
+    # Newton decrement (twice the predicted decrease of the free energy) and constraint mismatch;
+    #   the final (tiny) step is still taken
+        decrement = np.einsum('...i,...ij,...j->...', step, hessian, step)
+        done = (decrement < tolerance) & (np.max(np.abs(residual), axis=-1) < tolerance)
+
+    # Shorten the step to stay inside s > 0, then backtrack until the free energy decreases
+    #   (the decrease test applies once the constraints hold, i.e. after the first full step)
+        shrinking = step < 0.0
+        ratio = np.where(shrinking, -s_now/np.where(shrinking, step, -1.0), np.inf)
+        fraction = np.minimum(1.0, step_to_boundary*np.min(ratio, axis=-1))
+        free_energy_now = compute_free_energy_s(s_now, eps_now)
+        feasible = np.max(np.abs(residual), axis=-1) < 1.0e-14
+        slope = np.sum(gradient*step, axis=-1)
+        for backtrack in range(30):
+            s_new = s_now + fraction[:, None]*step
+            free_energy_new = compute_free_energy_s(s_new, eps_now)
+            bad = feasible & ~done & (free_energy_new > free_energy_now + 0.25*fraction*slope + 1.0e-15)
+            if not np.any(bad):
+                break
+            fraction = np.where(bad, 0.5*fraction, fraction)
+
+        s[active] = s_new
+        converged[active[done]] = True
+        active = active[~done]
+        if active.size == 0:
+            break
+
+    return(s, iterations, converged)
+
+
+####################################################################################################
+#
+# Whole-curve mode: minimize the free energy at every state point at once
+#
+####################################################################################################
+
+def minimize_free_energy(epsilon1, x1=None, initial_s=None, tolerance=newton_tolerance,
+                         max_iterations=newton_iterations):
+
+    if x1 is None:
+        epsilon1 = np.asarray(epsilon1, dtype=float)
+        shape = epsilon1.shape
+        x1_flat = None
+        pure = np.zeros(shape, dtype=bool)
+    else:
+        epsilon1, x1 = np.broadcast_arrays(np.asarray(epsilon1, dtype=float), np.asarray(x1, dtype=float))
+        shape = epsilon1.shape
+        if np.any((x1 < 0.0) | (x1 > 1.0)):
+            raise ValueError('x1 must be between 0 and 1')
+    # All-A and all-B chains (x1 = 1 or 0) sit on the boundary s = 0; they are filled in directly
+        pure = (x1 <= 0.0) | (x1 >= 1.0)
+        x1_flat = np.where(pure, 0.5, x1).ravel()
+
+    if initial_s is None:
+        s = obtain_independent_s(0.5 if x1_flat is None else x1_flat)
+        s = np.broadcast_to(s, (epsilon1.size, 6)).copy()
+    else:
+        s = np.clip(np.broadcast_to(initial_s, shape + (6,)).reshape(-1, 6), 1.0e-300, 1.0)
+    s, iterations, converged = iterate_newton(s, epsilon1.ravel(), x1_flat, tolerance, max_iterations)
+    s = s.reshape(shape + (6,))
+
+    if np.any(pure):
+        pure_s = (np.arange(6) == np.where(x1 >= 1.0, 0, 5)[..., None]).astype(float)
+        s = np.where(pure[..., None], pure_s, s)
+        iterations = np.where(pure.ravel(), 0, iterations)
+
+    fe_results = obtain_free_energy_results(epsilon1, s, iterations.reshape(shape),
+                                            converged.reshape(shape) | pure)
+
+    return(fe_results)
+
+
+####################################################################################################
+#
+# Warm-start mode: walk along the eps1 values (in increasing order), starting each point from
+#   the straight-line extrapolation of log s through the solutions at the two previous eps1 values
+#   (from the previous solution itself at the second point); the extrapolated s need not meet the
+#   constraints exactly, as the first Newton step restores them
+#
+####################################################################################################
+
+def minimize_free_energy_curve(epsilon1, x1=None, tolerance=newton_tolerance, max_iterations=newton_iterations):
+
+    epsilon1 = np.asarray(epsilon1, dtype=float).ravel()
+    if x1 is not None and np.ndim(x1) != 0:
+        raise ValueError('x1 must be a single value for a curve of eps1 values')
+
+    s = np.zeros((epsilon1.size, 6))
+    iterations = np.zeros(epsilon1.size, dtype=int)
+    converged = np.zeros(epsilon1.size, dtype=bool)
+    initial_s = None
+    previous_points = list()
+    for point in np.argsort(epsilon1, kind='stable'):
+        if len(previous_points) >= 2:
+            (epsilon1_0, log_s0), (epsilon1_1, log_s1) = previous_points[-2:]
+            if epsilon1_1 > epsilon1_0:
+                initial_s = np.exp(log_s1 + (log_s1 - log_s0)*(epsilon1[point] - epsilon1_1)/(epsilon1_1 - epsilon1_0))
+        fe_point = minimize_free_energy(epsilon1[point], x1, initial_s, tolerance, max_iterations)
+        s[point] = fe_point['s']
+        iterations[point] = fe_point['iterations']
+        converged[point] = fe_point['converged']
+        initial_s = None
+        if np.all(fe_point['s'] > 0.0):
+            initial_s = fe_point['s']
+            previous_points.append((epsilon1[point], np.log(fe_point['s'])))
+
+    fe_results = obtain_free_energy_results(epsilon1, s, iterations, converged)
+
+    return(fe_results)
+
+
+####################################################################################################
+#
+# Collect the results in a dictionary, with the config vars in the order of the config_vars_list
+#
+####################################################################################################
+
+def obtain_free_energy_results(epsilon1, s, iterations, converged):
+
+    config_vars = obtain_config_vars_from_s(s)
+    neg_entropy = compute_neg_entropy_array(config_vars)
+    enthalpy = compute_enthalpy_array(config_vars, epsilon1)
+
+    fe_results = {
+        'epsilon1': epsilon1,
+        'x1': s[..., 0] + 2.0*s[..., 1] + s[..., 3],
+        's': s,
+        'config_vars': config_vars,
+        'y': config_vars[..., 0:3],
+        'w': config_vars[..., 3:6],
+        'z': config_vars[..., 6:12],
+        'neg_entropy': neg_entropy,
+        'enthalpy': enthalpy,
+        'free_energy': enthalpy + neg_entropy,
+        'iterations': iterations,
+        'converged': converged,
+    }
+
+    return(fe_results)
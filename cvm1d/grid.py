@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+# Copyright 2023 Themesis, Inc.; made available under the MIT License (see LICENSE).
+#
+# Code created by: Alianna J. Maren; assigned to Themesis, Inc.
+#
+#===================================================================================================
+#
+# GRIDS AND CONFIG VARS: the grid construction and config-var functions of the demo programs,
+#   as pure functions on NumPy activation arrays (no globals, no printing, no input()).
+#
+#===================================================================================================
+#
+# A grid of array_size_list = (array_length, array_layers) is held as an activation array of
+#   array_layers*array_length int8 values (0 or 1; A = 1), in node order x = row*array_length + col
+#   as in the node_list, or as an (array_layers, array_length) array of rows. Leading axes, if any,
+#   hold a batch of grids.
+#
+# The zigzag chain is made up of PAIRS of rows; row 0 (the upper row) and row 1 (the lower row,
+#   offset by half a node to the right). For a node in column j:
+#   - Row 0: the next-nearest-neighbors (w) are at columns j-1 and j+1 on row 0;
+#            the nearest-neighbors (y) are at columns j-1 (yLeft) and j (yRight) on row 1.
+#   - Row 1: the next-nearest-neighbors (w) are at columns j-1 and j+1 on row 1;
+#            the nearest-neighbors (y) are at columns j (yLeft) and j+1 (yRight) on row 0.
+#   All column numbers wrap around (periodic boundary conditions).
+# So every neighbor of every node can be found at once by shifting an entire row by one column
+#   with np.roll, and each code is then obtained from the two (or three) activations directly:
+#   - w and y codes: 3 - (activ + neighbor activ), which is 1 (both "A"), 2 (mixed), or 3 (both "B")
+#   - z codes: z_code_table[4*activ + 2*(yLeft activ) + (wLeft activ)], which gives the same
+#     triplet codes (1 .. 6) as the branch ladder of the per-node loop of the earlier versions.
+# The config var counts [Y1, Y2, Y3, W1, W2, W3, Z1, ..., Z6] count the yLeft, wLeft and zLeft
+#   codes of every node; divided by the number of nodes they are the config_vars_list.
+#
+####################################################################################################
+
+import numpy as np
+
+from cvm1d.entropy import compute_neg_entropy_array
+from cvm1d.free_energy import compute_free_energy_sweep
+
+
+# Default grid dimensions: one zigzag chain of 12 columns (24 nodes)
+default_array_length = 12
+default_array_layers = 2
+
+# z codes, indexed by 4*activ + 2*(activ of the yLeft node) + (activ of the wLeft node)
+z_code_table = np.array([6, 5, 4, 2, 5, 3, 2, 1], dtype=np.int8)
+
+# Enthalpy weight of each config var count (z2 and z5 are divided by two for degeneracy)
+enthalpy_weights = np.array([0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.5, 1.0, 1.0, 0.5, 0.0])
+
+
+####################################################################################################
+#
+# Check the grid dimensions: both must be integers, array_length must be at least 3
+#   (so that the nodes two steps to the left and to the right along a chain are different nodes),
+#   and array_layers must be a positive EVEN number (each pair of rows makes one zigzag chain).
+#
+####################################################################################################
+
+def validate_array_size_list(array_size_list):
+
+    array_length, array_layers = array_size_list
+    if int(array_length) != array_length or int(array_layers) != array_layers:
+        raise ValueError('array_length and array_layers must be integers')
+    array_length = int(array_length)
+    array_layers = int(array_layers)
+    if array_length < 3:
+        raise ValueError('array_length must be at least 3, not ' + str(array_length))
+    if array_layers < 2 or array_layers % 2 != 0:
+        raise ValueError('array_layers must be a positive even number, not ' + str(array_layers))
+
+    return((array_length, array_layers))
+
+
+####################################################################################################
+#
+# Random activations with exactly round(x1*total_nodes) ON nodes (cvm1d/patterns.py makes batches
+#   of these, and of the built-in and other patterns)
+#
+####################################################################################################
+
+def obtain_random_activations(array_size_list, x1, seed=None):
+
+    array_length, array_layers = validate_array_size_list(array_size_list)
+    total_nodes = array_length*array_layers
+    x1_count = int(round(x1*total_nodes))
+
+    rng = np.random.default_rng(seed)
+    activ = np.zeros(total_nodes, dtype=np.int8)
+    activ[rng.permutation(total_nodes)[:x1_count]] = 1
+
+    return(activ)
+
+
+####################################################################################################
+#
+# Local config var codes (wLeft, wRight, yLeft, yRight, zLeft) of every node, for an activation
+#   array of shape (..., array_layers, array_length)
+#
+####################################################################################################
+
+def obtain_local_config_codes(activ_rows):
+
+    array_layers = activ_rows.shape[-2]
+    array_length = activ_rows.shape[-1]
+
+# Separate the grid into its pairs of rows: upper rows (row 0) and lower rows (row 1)
+    pair_shape = activ_rows.shape[:-2] + (array_layers//2, 2, array_length)
+    activ_pairs = activ_rows.astype(np.int8, copy=False).reshape(pair_shape)
+    upper = activ_pairs[..., 0, :]
+    lower = activ_pairs[..., 1, :]
+
+# Periodic shifts: the node one column to the left (j-1) and one column to the right (j+1)
+    upper_left = np.roll(upper, 1, axis=-1)
+    upper_right = np.roll(upper, -1, axis=-1)
+    lower_left = np.roll(lower, 1, axis=-1)
+
+    wLeft = np.empty(pair_shape, dtype=np.int8)
+    wRight = np.empty(pair_shape, dtype=np.int8)
+    yLeft = np.empty(pair_shape, dtype=np.int8)
+    yRight = np.empty(pair_shape, dtype=np.int8)
+    zLeft = np.empty(pair_shape, dtype=np.int8)
+
+    wLeft[..., 0, :] = 3 - upper - upper_left
+    wLeft[..., 1, :] = 3 - lower - lower_left
+    wRight[..., 0, :] = 3 - upper - upper_right
+    wRight[..., 1, :] = 3 - lower - np.roll(lower, -1, axis=-1)
+    yLeft[..., 0, :] = 3 - upper - lower_left
+    yLeft[..., 1, :] = 3 - lower - upper
+    yRight[..., 0, :] = 3 - upper - lower
+    yRight[..., 1, :] = 3 - lower - upper_right
+    zLeft[..., 0, :] = z_code_table[4*upper + 2*lower_left + upper_left]
+    zLeft[..., 1, :] = z_code_table[4*lower + 2*upper + lower_left]
+
+    local_codes = [wLeft, wRight, yLeft, yRight, zLeft]
+    for n in range(len(local_codes)):
+        local_codes[n] = local_codes[n].reshape(activ_rows.shape)
+
+    return(local_codes)
+
+
+# The left-triplet index 4*activ + 2*(yLeft activ) + (wLeft activ) of every node;
+#   it determines all three of the counted codes of a node (yLeft, wLeft and zLeft).
+def obtain_left_triplet_index(activ_rows):
+
+    array_layers = activ_rows.shape[-2]
+    array_length = activ_rows.shape[-1]
+
+    pair_shape = activ_rows.shape[:-2] + (array_layers//2, 2, array_length)
+    activ_pairs = activ_rows.astype(np.int8, copy=False).reshape(pair_shape)
+    upper = activ_pairs[..., 0, :]
+    lower = activ_pairs[..., 1, :]
+
+    triplet_index = np.empty(pair_shape, dtype=np.int8)
+    triplet_index[..., 0, :] = 4*upper + 2*np.roll(lower, 1, axis=-1) + np.roll(upper, 1, axis=-1)
+    triplet_index[..., 1, :] = 4*lower + 2*upper + np.roll(lower, 1, axis=-1)
+
+    return(triplet_index.reshape(activ_rows.shape))
+
+
+# The (8 x 12) table of the config var counts owned by a node, for each of its left-triplet
+#   indices: one y count (yLeft pair), one w count (wLeft pair) and one z count
+def obtain_triplet_count_vectors():
+
+    triplet_count_vectors = np.zeros((8, 12), dtype=np.int64)
+    for triplet_index in range(8):
+        this_activ, l_activtn, ll_activtn = triplet_index >> 2, (triplet_index >> 1) & 1, triplet_index & 1
+        triplet_count_vectors[triplet_index, 2 - this_activ - l_activtn] += 1
+        triplet_count_vectors[triplet_index, 5 - this_activ - ll_activtn] += 1
+        triplet_count_vectors[triplet_index, 5 + z_code_table[triplet_index]] += 1
+
+    return(triplet_count_vectors)
+
+
+triplet_count_vectors = obtain_triplet_count_vectors()
+
+
+####################################################################################################
+#
+# Config var counts (and fractions) for many grids at once.
+#
+# The activations of the grids are given as one array of shape (n_grids, n_nodes), where each
+#   row holds the activations of one grid in node order (x = row*array_length + col).
+# The local config var codes of every grid are computed with obtain_local_config_codes, and
+#   the codes are then counted for all grids at once with a single np.bincount, by giving each
+#   (grid, config var) combination its own bin: grid_num*12 + (position in the config_vars_list).
+# The grids are processed in blocks of grids_per_block, so that the memory used stays bounded.
+#
+####################################################################################################
+
+def obtain_config_var_counts_batch(activ_batch, array_size_list, grids_per_block=8192):
+
+    array_length = array_size_list[0]
+    array_layers = array_size_list[1]
+
+    activ_batch = np.asarray(activ_batch, dtype=np.int8)
+    n_grids = activ_batch.shape[0]
+    config_var_counts = np.zeros((n_grids, 12), dtype=np.int64)
+
+    for first_grid in range(0, n_grids, grids_per_block):
+        activ_rows = activ_batch[first_grid:first_grid + grids_per_block]
+        block_size = activ_rows.shape[0]
+        activ_rows = activ_rows.reshape(block_size, array_layers, array_length)
+        wLeft, wRight, yLeft, yRight, zLeft = obtain_local_config_codes(activ_rows)
+
+    # Bin numbers: y codes go to bins 0 .. 2, w codes to bins 3 .. 5, z codes to bins 6 .. 11
+        bins = np.concatenate((yLeft.reshape(block_size, -1) - 1,
+                               wLeft.reshape(block_size, -1) + 2,
+                               zLeft.reshape(block_size, -1) + 5), axis=1).astype(np.intp)
+        bins += 12*np.arange(block_size, dtype=np.intp)[:, None]
+        block_counts = np.bincount(bins.ravel(), minlength=12*block_size)
+        config_var_counts[first_grid:first_grid + block_size] = block_counts.reshape(block_size, 12)
+
+    return(config_var_counts)
+
+
+def obtain_config_vars_batch(activ_batch, array_size_list, grids_per_block=8192):
+
+    total_nodes = array_size_list[0]*array_size_list[1]
+    config_var_counts = obtain_config_var_counts_batch(activ_batch, array_size_list, grids_per_block)
+    config_vars_array = config_var_counts/total_nodes
+
+    return(config_vars_array)
+
+
+####################################################################################################
+#
+# Evaluate grids: the config vars, neg-entropy, enthalpy and free energy of one grid (an activation
+#   array of total_nodes values) or of a batch of grids (n_grids x total_nodes), at one eps1 value
+#   or at an array of eps1 values; for one grid at one eps1 value the results are scalars
+#
+####################################################################################################
+
+def evaluate_activations(activ, array_size_list, epsilon1=0.0):
+
+    array_size_list = validate_array_size_list(array_size_list)
+    total_nodes = array_size_list[0]*array_size_list[1]
+    activ = np.asarray(activ, dtype=np.int8)
+    single_grid = activ.size == total_nodes
+    single_epsilon1 = np.ndim(epsilon1) == 0
+
+    config_var_counts = obtain_config_var_counts_batch(activ.reshape(-1, total_nodes), array_size_list)
+    config_vars = config_var_counts/float(total_nodes)
+    neg_entropy = compute_neg_entropy_array(config_vars)
+    enthalpy, free_energy = compute_free_energy_sweep(config_vars, np.atleast_1d(epsilon1), neg_entropy)
+    if single_epsilon1:
+        enthalpy, free_energy = enthalpy[:, 0], free_energy[:, 0]
+
+    grid_results = {
+        'epsilon1': epsilon1,
+        'x1': config_vars[:, 0] + 0.5*config_vars[:, 1],
+        'config_var_counts': config_var_counts,
+        'config_vars': config_vars,
+        'neg_entropy': neg_entropy,
+        'enthalpy': enthalpy,
+        'free_energy': free_energy,
+    }
+    if single_grid:
+        for key in ('x1', 'config_var_counts', 'config_vars', 'neg_entropy', 'enthalpy', 'free_energy'):
+            grid_results[key] = grid_results[key][0]
+        for key in ('x1', 'neg_entropy', 'enthalpy', 'free_energy'):
+            if np.ndim(grid_results[key]) == 0:
+                grid_results[key] = float(grid_results[key])
+
+    return(grid_results)
@@ -0,0 +1,430 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+# Copyright 2023 Themesis, Inc.; made available under the MIT License (see LICENSE).
+#
+# Code created by: Alianna J. Maren; assigned to Themesis, Inc.
+#
+#===================================================================================================
+#
+# NODE-SWAP MONTE CARLO: the incremental update of the config var counts for one node swap, and the
+#   Metropolis loop built on it. Plain Monte Carlo (run_swap_monte_carlo, used by the mc and sweep
+#   modes and by each rung of cvm1d/tempering.py), simulated annealing (cvm1d/annealing.py) and the
+#   sequence swaps of the swaps mode all go through these.
+#
+#===================================================================================================
+#
+# A move is the swap of interchange_activations_node_list2: one ON node and one OFF node, picked at
+#   random, exchange activations (so x1 never changes). The free energy is that of
+#   compute_neg_entropy and compute_free_energy:
+#     free_energy = epsilon1*(z2/2 + z3 + z4 + z5/2) + neg_entropy
+#   and a move is accepted with probability min(1, exp(-total_nodes*delta_free_energy/temperature))
+#   (a temperature of 0 accepts only moves that do not raise the free energy).
+#
+# Counting to the left along the chain, each node owns one y pair, one w pair and one triplet
+#   (see cvm1d/swaps.py), and a swap changes only what is owned by the nodes k, k+1 and k+2 of each
+#   swapped node. The swap state keeps the activations and the left-triplet index of every node
+#   (one byte each, in bytearrays) and the 12 config var counts, so a move costs a few list
+#   operations whatever the size of the grid. The chain neighbors k-2 .. k+2 of a swapped node are
+#   found arithmetically in each move (obtain_chain_window), so nothing is kept per node beyond
+#   those two bytes: a grid of 10**6 nodes takes a few MB, not a Python object per node. The ON and
+#   OFF nodes of the Metropolis loop are kept in compact arrays (array.array) for the same reason.
+# The swap tables hold what the moves look up for one grid size (the count changes of each change
+#   of triplet, and the neg-entropy terms from the table of cvm1d/entropy.py, or None for very large
+#   grids, whose terms are computed); they are built once with obtain_swap_tables and can be passed
+#   in to every run on grids of that size.
+# The starting counts of a run come from a ConfigVarCache (cvm1d/symmetry.py) when one is given,
+#   and the counts of the final pattern are stored in it, so that a run which starts where an
+#   earlier one stopped (the next round of a tempering rung, say), or from a symmetric copy of
+#   that pattern, does not count its pattern again.
+#
+####################################################################################################
+
+import time
+from array import array
+from math import log
+
+import numpy as np
+
+from cvm1d.entropy import obtain_neg_entropy_table, neg_entropy_table_limit, compute_neg_entropy_counts_array
+from cvm1d.entropy import neg_entropy_coeffs, neg_entropy_scales
+from cvm1d.grid import validate_array_size_list, obtain_left_triplet_index, obtain_config_var_counts_batch
+from cvm1d.grid import triplet_count_vectors, enthalpy_weights
+from cvm1d.symmetry import obtain_canonical_key
+
+
+# Moves whose random numbers are drawn at once
+moves_per_block = 65536
+
+
+####################################################################################################
+#
+# The swap tables of a grid of array_size_list
+#
+####################################################################################################
+
+def obtain_swap_tables(array_size_list):
+
+    array_size_list = validate_array_size_list(array_size_list)
+    total_nodes = array_size_list[0]*array_size_list[1]
+
+# Per change of triplet index (8*old + new): the (position, change) of the counts that change
+    count_deltas = list()
+    for old_triplet in range(8):
+        for new_triplet in range(8):
+            delta_vector = triplet_count_vectors[new_triplet] - triplet_count_vectors[old_triplet]
+            count_deltas.append(tuple((n, int(delta_vector[n])) for n in np.flatnonzero(delta_vector)))
+
+    if total_nodes <= neg_entropy_table_limit:
+        term_lists = obtain_neg_entropy_table(total_nodes).tolist()
+    else:
+        term_lists = None
+
+    swap_tables = {
+        'array_size_list': array_size_list,
+        'array_length': array_size_list[0],
+        'total_nodes': total_nodes,
+        'count_deltas': count_deltas,
+        'enthalpy_weights': enthalpy_weights.tolist(),
+        'term_lists': term_lists,
+        'term_factors': (neg_entropy_scales/float(total_nodes)).tolist(),
+        'term_coeffs': neg_entropy_coeffs.tolist(),
+    }
+
+    return(swap_tables)
+
+
+# The neg-entropy term of config var n at count (a table lookup, or computed for very large grids)
+def obtain_neg_entropy_term_function(swap_tables):
+
+    term_lists = swap_tables['term_lists']
+    if term_lists is not None:
+
+        def neg_entropy_term(n, count):
+            return(term_lists[n][count])
+    else:
+        term_factors = swap_tables['term_factors']
+        term_coeffs = swap_tables['term_coeffs']
+
+        def neg_entropy_term(n, count):
+            if count == 0:
+                return(0.0)
+            x = term_factors[n]*count
+            return(term_coeffs[n]*x*log(x))
+
+    return(neg_entropy_term)
+
+
+####################################################################################################
+#
+# The swap state of the activations activ (total_nodes values, in node order), and its activations;
+#   the config var counts come from config_var_cache, if one is given
+#
+####################################################################################################
+
+def obtain_swap_state(activ, array_size_list, config_var_cache=None):
+
+    array_length, array_layers = validate_array_size_list(array_size_list)
+    total_nodes = array_length*array_layers
+    activ = np.asarray(activ, dtype=np.int8).ravel()
+    if activ.size != total_nodes:
+        raise ValueError('activ must hold ' + str(total_nodes) + ' activations')
+    if config_var_cache is None:
+        config_var_counts = obtain_config_var_counts_batch(activ[None, :], (array_length, array_layers))[0]
+    else:
+        config_var_counts = config_var_cache.obtain_config_var_counts(activ, (array_length, array_layers))
+
+    swap_state = {
+        'state': bytearray(activ.astype(np.uint8).tobytes()),
+        'triplets': bytearray(obtain_left_triplet_index(activ.reshape(array_layers, array_length))
+                              .astype(np.uint8).tobytes()),
+        'config_var_counts': config_var_counts.tolist(),
+    }
+
+    return(swap_state)
+
+
+def obtain_swap_state_activ(swap_state):
+
+    return(np.frombuffer(bytes(swap_state['state']), dtype=np.uint8).astype(np.int8))
+
+
+####################################################################################################
+#
+# The nodes at chain positions k-2, k-1, k, k+1 and k+2 of node_num (at position k): node
+#   row*array_length + col is at position k = 2*col + (row % 2) of the chain of rows
+#   (2*(row//2), 2*(row//2) + 1), and position p of that chain (taken mod 2*array_length) holds
+#   node pair_start + (p % 2)*array_length + p//2
+#
+####################################################################################################
+
+def obtain_chain_window(node_num, array_length):
+
+    row, col = divmod(node_num, array_length)
+    parity = row & 1
+    pair_start = node_num - col - parity*array_length
+    chain_length = 2*array_length
+    position = 2*col + parity
+    window = list()
+    for offset in (-2, -1, 0, 1, 2):
+        p = (position + offset) % chain_length
+        window.append(pair_start + (p & 1)*array_length + (p >> 1))
+
+    return(window)
+
+
+####################################################################################################
+#
+# The incremental update: exchange the activations of node1_num and node2_num in the swap state,
+#   and find the new triplets of the (distinct) owning nodes, the count changes they make and the
+#   changes in the neg-entropy and in the enthalpy sum (z2/2 + z3 + z4 + z5/2, times total_nodes).
+#   Nothing else in the state changes until apply_swap_changes; undo_swap puts the two
+#   activations back instead.
+#
+####################################################################################################
+
+def obtain_swap_changes(swap_tables, swap_state, node1_num, node2_num, neg_entropy_term):
+
+    array_length = swap_tables['array_length']
+    count_deltas = swap_tables['count_deltas']
+    weights = swap_tables['enthalpy_weights']
+    state = swap_state['state']
+    triplets = swap_state['triplets']
+    config_var_counts = swap_state['config_var_counts']
+
+    state[node1_num], state[node2_num] = state[node2_num], state[node1_num]
+
+# The owners k, k+1 and k+2 of each swapped node, each with the two nodes to its left
+    changed = dict()
+    new_triplets = dict()
+    for node_num in (node1_num, node2_num):
+        window = obtain_chain_window(node_num, array_length)
+        for j in (2, 3, 4):
+            owner = window[j]
+            if owner in new_triplets:
+                continue
+            new_triplet = 4*state[owner] + 2*state[window[j - 1]] + state[window[j - 2]]
+            old_triplet = triplets[owner]
+            if new_triplet == old_triplet:
+                continue
+            new_triplets[owner] = new_triplet
+            for n, delta in count_deltas[8*old_triplet + new_triplet]:
+                changed[n] = changed.get(n, 0) + delta
+
+    delta_neg_entropy = 0.0
+    delta_enthalpy_sum = 0.0
+    for n, delta in changed.items():
+        if delta != 0:
+            count = config_var_counts[n]
+            delta_neg_entropy = delta_neg_entropy + neg_entropy_term(n, count + delta) - neg_entropy_term(n, count)
+            delta_enthalpy_sum = delta_enthalpy_sum + weights[n]*delta
+
+    return(new_triplets, changed, delta_neg_entropy, delta_enthalpy_sum)
+
+
+def apply_swap_changes(swap_state, new_triplets, changed):
+
+    triplets = swap_state['triplets']
+    config_var_counts = swap_state['config_var_counts']
+    for owner, new_triplet in new_triplets.items():
+        triplets[owner] = new_triplet
+    for n, delta in changed.items():
+        config_var_counts[n] = config_var_counts[n] + delta
+
+    return()
+
+
+def undo_swap(swap_state, node1_num, node2_num):
+
+    state = swap_state['state']
+    state[node1_num], state[node2_num] = state[node2_num], state[node1_num]
+
+    return()
+
+
+# Swap two nodes for good; returns the 12 count changes and the change in the neg-entropy
+def swap_config_var_counts(swap_tables, swap_state, node1_num, node2_num, neg_entropy_term=None):
+
+    if neg_entropy_term is None:
+        neg_entropy_term = obtain_neg_entropy_term_function(swap_tables)
+    new_triplets, changed, delta_neg_entropy, delta_enthalpy_sum = obtain_swap_changes(
+        swap_tables, swap_state, node1_num, node2_num, neg_entropy_term)
+    apply_swap_changes(swap_state, new_triplets, changed)
+    delta_counts = [0]*12
+    for n, delta in changed.items():
+        delta_counts[n] = delta
+
+    return(delta_counts, delta_neg_entropy)
+
+
+####################################################################################################
+#
+# The Metropolis loop: moves_per_temperature moves at each of the temperatures, on the swap state
+#   (updated in place), with random numbers from rng. With a recorder (a
+#   cvm1d.trajectory.TrajectoryRecorder), the activations are recorded before the first move and
+#   after every recorder.record_every moves. With track_best, the pattern of lowest free energy seen
+#   is kept too; it is only copied when the run is about to move away from it, so that the many
+#   small improvements at the start cost nothing extra.
+#
+####################################################################################################
+
+def run_metropolis_moves(swap_tables, swap_state, epsilon1, temperatures, moves_per_temperature, rng,
+                         recorder=None, track_best=False):
+
+    total_nodes = swap_tables['total_nodes']
+    weights = swap_tables['enthalpy_weights']
+    neg_entropy_term = obtain_neg_entropy_term_function(swap_tables)
+    state = swap_state['state']
+    config_var_counts = swap_state['config_var_counts']
+
+    activ = np.frombuffer(state, dtype=np.uint8)
+    on_nodes = array('q', np.flatnonzero(activ == 1).astype(np.int64).tobytes())
+    off_nodes = array('q', np.flatnonzero(activ == 0).astype(np.int64).tobytes())
+    del activ
+    if len(on_nodes) == 0 or len(off_nodes) == 0:
+        raise ValueError('The pattern needs at least one ON node and one OFF node to swap')
+
+    neg_entropy = sum(neg_entropy_term(n, count) for n, count in enumerate(config_var_counts))
+    enthalpy_sum = sum(weight*count for weight, count in zip(weights, config_var_counts))
+    free_energy = epsilon1*enthalpy_sum/total_nodes + neg_entropy
+    initial_free_energy = free_energy
+
+    best_free_energy = free_energy
+    best_state = None
+    best_move_num = 0
+    at_best = True
+
+    if recorder is not None:
+        recorder.record(np.frombuffer(bytes(state), dtype=np.uint8), 0)
+        record_every = recorder.record_every
+
+    accepted_moves = 0
+    move_num = 0
+    start_time = time.perf_counter()
+    for temperature in np.atleast_1d(np.asarray(temperatures, dtype=float)).tolist():
+        for first_move in range(0, moves_per_temperature, moves_per_block):
+            block_moves = min(moves_per_block, moves_per_temperature - first_move)
+            on_picks = rng.integers(0, len(on_nodes), block_moves).tolist()
+            off_picks = rng.integers(0, len(off_nodes), block_moves).tolist()
+            log_uniforms = np.log(rng.random(block_moves)).tolist()
+
+            for on_pick, off_pick, log_uniform in zip(on_picks, off_picks, log_uniforms):
+                move_num = move_num + 1
+                node1_num = on_nodes[on_pick]
+                node2_num = off_nodes[off_pick]
+                new_triplets, changed, delta_neg_entropy, delta_enthalpy_sum = obtain_swap_changes(
+                    swap_tables, swap_state, node1_num, node2_num, neg_entropy_term)
+                delta_free_energy = epsilon1*delta_enthalpy_sum/total_nodes + delta_neg_entropy
+
+                if delta_free_energy <= 0.0:
+                    accept = True
+                elif temperature > 0.0:
+                    accept = -total_nodes*delta_free_energy/temperature > log_uniform
+                else:
+                    accept = False
+
+                if not accept:
+                    undo_swap(swap_state, node1_num, node2_num)
+                else:
+                # Moving away from the best pattern seen so far: keep a copy of it first
+                    if track_best and at_best and delta_free_energy > 0.0:
+                        undo_swap(swap_state, node1_num, node2_num)
+                        best_state = bytes(state)
+                        undo_swap(swap_state, node1_num, node2_num)
+                        at_best = False
+
+                    on_nodes[on_pick] = node2_num
+                    off_nodes[off_pick] = node1_num
+                    apply_swap_changes(swap_state, new_triplets, changed)
+                    neg_entropy = neg_entropy + delta_neg_entropy
+                    enthalpy_sum = enthalpy_sum + delta_enthalpy_sum
+                    free_energy = free_energy + delta_free_energy
+                    accepted_moves = accepted_moves + 1
+
+                    if free_energy < best_free_energy - 1.0e-12 or (at_best and free_energy <= best_free_energy):
+                        best_free_energy = free_energy
+                        best_move_num = move_num
+                        at_best = True
+
+                if recorder is not None and move_num % record_every == 0:
+                    recorder.record(np.frombuffer(bytes(state), dtype=np.uint8), move_num)
+    elapsed_time = time.perf_counter() - start_time
+
+    if track_best and at_best:
+        best_state = bytes(state)
+
+    move_results = {
+        'moves': move_num,
+        'accepted_moves': accepted_moves,
+        'elapsed_time': elapsed_time,
+        'initial_free_energy': initial_free_energy,
+        'final_free_energy': free_energy,
+        'best_free_energy': best_free_energy,
+        'best_move_num': best_move_num,
+        'best_state': best_state,
+    }
+
+    return(move_results)
+
+
+####################################################################################################
+#
+# The config vars, neg-entropy, enthalpy and free energy of integer config var counts, found from
+#   scratch (so that no rounding from the running sums is left)
+#
+####################################################################################################
+
+def evaluate_config_var_counts(config_var_counts, total_nodes, epsilon1):
+
+    config_var_counts = np.asarray(config_var_counts, dtype=np.int64)
+    neg_entropy = float(compute_neg_entropy_counts_array(config_var_counts, total_nodes))
+    enthalpy = epsilon1*float(config_var_counts @ enthalpy_weights)/total_nodes
+
+    count_results = {
+        'config_var_counts': config_var_counts,
+        'config_vars': config_var_counts/float(total_nodes),
+        'neg_entropy': neg_entropy,
+        'enthalpy': enthalpy,
+        'free_energy': enthalpy + neg_entropy,
+    }
+
+    return(count_results)
+
+
+####################################################################################################
+#
+# Plain Metropolis Monte Carlo: num_moves moves at one temperature from the activations activ;
+#   returns a dictionary of results for the final pattern, with the move statistics
+#   (moves_per_second counts the moves, accepted or not, per second of wall-clock time)
+#
+####################################################################################################
+
+def run_swap_monte_carlo(activ, array_size_list, epsilon1, temperature, num_moves, seed=None, recorder=None,
+                         swap_tables=None, config_var_cache=None):
+
+    if swap_tables is None:
+        swap_tables = obtain_swap_tables(array_size_list)
+    total_nodes = swap_tables['total_nodes']
+    swap_state = obtain_swap_state(activ, array_size_list, config_var_cache)
+    rng = np.random.default_rng(seed)
+
+    move_results = run_metropolis_moves(swap_tables, swap_state, epsilon1, [temperature], num_moves, rng, recorder)
+    elapsed_time = move_results['elapsed_time']
+    final_activ = obtain_swap_state_activ(swap_state)
+    if config_var_cache is not None:
+        config_var_cache.store(obtain_canonical_key(final_activ, array_size_list), swap_state['config_var_counts'])
+
+    mc_results = {
+        'epsilon1': epsilon1,
+        'temperature': temperature,
+        'moves': num_moves,
+        'accepted_moves': move_results['accepted_moves'],
+        'acceptance_rate': move_results['accepted_moves']/float(num_moves) if num_moves > 0 else 0.0,
+        'elapsed_time': elapsed_time,
+        'moves_per_second': num_moves/elapsed_time if elapsed_time > 0.0 else 0.0,
+        'activ': final_activ,
+    }
+    mc_results.update(evaluate_config_var_counts(swap_state['config_var_counts'], total_nodes, epsilon1))
+
+    return(mc_results)
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+# Copyright 2023 Themesis, Inc.; made available under the MIT License (see LICENSE).
+#
+# Code created by: Alianna J. Maren; assigned to Themesis, Inc.
+#
+#===================================================================================================
+#
+# ARRAY-BACKED GRID: NodeGrid, together with the Node-like view NodeView, and the local config var
+#   codes and config var counts of a NodeGrid.
+#
+#===================================================================================================
+#
+# A NodeGrid holds the whole grid as contiguous NumPy int8 arrays - one array for the activations,
+#   and one array for each of the local config-var codes (wLeft, wRight, yLeft, yRight, zLeft).
+#   Each array is indexed by the node number x = row*array_length + col, just as the node_list is.
+# This costs one byte per node per field, instead of a full Python object per node, so that
+#   grids with millions of nodes can be held in memory. zRight is never computed (it is always 0,
+#   as in the Node objects of the earlier versions), so it is not stored: NodeView.zRight is
+#   always 0.
+#
+# NodeGrid[x] returns a NodeView; reading or writing node_grid[x].activ (etc.) reads or writes
+#   the underlying arrays, so that code written for a node_list also works with a NodeGrid.
+#
+# The codes of every node are found at once by shifting whole rows with np.roll
+#   (obtain_local_config_codes, in cvm1d/grid.py, which also describes the neighbors and codes);
+#   they are the same codes as those of the per-node loop of the earlier versions.
+#
+####################################################################################################
+
+import numpy as np
+
+from cvm1d.bitpack import pack_activation_rows
+from cvm1d.grid import validate_array_size_list, obtain_local_config_codes
+
+
+node_grid_fields = ('activ', 'wLeft', 'wRight', 'yLeft', 'yRight', 'zLeft')
+
+
+class NodeGrid(object):
+    """__init__() functions as the class constructor"""
+
+    def __init__(self, array_length=None, array_layers=None):
+        self.array_length = array_length
+        self.array_layers = array_layers
+        array_size = array_length*array_layers
+        for field in node_grid_fields:
+            setattr(self, field, np.zeros(array_size, dtype=np.int8))
+
+    def __len__(self):
+        return(self.activ.size)
+
+    def __getitem__(self, x):
+        array_size = self.activ.size
+        if x < 0:
+            x = x + array_size
+        if x < 0 or x >= array_size:
+            raise IndexError('NodeGrid index out of range')
+        return(NodeView(self, x))
+
+    def __iter__(self):
+        for x in range(self.activ.size):
+            yield NodeView(self, x)
+
+# The grid as (array_layers, array_length) arrays; these are views, not copies.
+    def rows(self, field='activ'):
+        return(getattr(self, field).reshape(self.array_layers, self.array_length))
+
+# The activations packed 64 nodes to a uint64 word, one row of words per grid row (a copy);
+#   see cvm1d/bitpack.py.
+    def packed_rows(self):
+        return(pack_activation_rows(self.rows('activ')))
+
+    def copy(self):
+        node_grid = NodeGrid(self.array_length, self.array_layers)
+        for field in node_grid_fields:
+            getattr(node_grid, field)[:] = getattr(self, field)
+        return(node_grid)
+
+
+def node_view_field(field):
+
+    def get_field(self):
+        return(int(getattr(self.grid, field)[self.node_num]))
+
+    def set_field(self, value):
+        getattr(self.grid, field)[self.node_num] = value
+
+    return(property(get_field, set_field))
+
+
+class NodeView(object):
+    """__init__() functions as the class constructor"""
+
+    __slots__ = ('grid', 'node_num')
+
+    def __init__(self, grid=None, node_num=None):
+        self.grid = grid
+        self.node_num = node_num
+
+    @property
+    def row(self):
+        return(self.node_num // self.grid.array_length)
+
+    @property
+    def col(self):
+        return(self.node_num % self.grid.array_length)
+
+    activ = node_view_field('activ')
+    wLeft = node_view_field('wLeft')
+    wRight = node_view_field('wRight')
+    yLeft = node_view_field('yLeft')
+    yRight = node_view_field('yRight')
+    zLeft = node_view_field('zLeft')
+
+    @property
+    def zRight(self):
+        return(0)
+
+
+####################################################################################################
+#
+# A NodeGrid of array_size_list, with every node OFF
+#
+####################################################################################################
+
+def obtain_node_grid(array_size_list):
+
+    array_length, array_layers = validate_array_size_list(array_size_list)
+
+    return(NodeGrid(array_length, array_layers))
+
+
+####################################################################################################
+#
+# Fill in the wLeft, wRight, yLeft, yRight and zLeft codes of every node from the activations
+#
+####################################################################################################
+
+def assign_local_config_vars_node_grid(node_grid, array_size_list):
+
+    array_length = array_size_list[0]
+    array_layers = array_size_list[1]
+
+    activ_rows = node_grid.activ.reshape(array_layers, array_length)
+    wLeft, wRight, yLeft, yRight, zLeft = obtain_local_config_codes(activ_rows)
+
+    node_grid.wLeft[:] = wLeft.ravel()
+    node_grid.wRight[:] = wRight.ravel()
+    node_grid.yLeft[:] = yLeft.ravel()
+    node_grid.yRight[:] = yRight.ravel()
+    node_grid.zLeft[:] = zLeft.ravel()
+
+    return(node_grid)
+
+
+####################################################################################################
+#
+# The config var counts of a NodeGrid, from its yLeft, wLeft and zLeft codes
+#
+####################################################################################################
+
+def obtain_config_var_counts_node_grid(node_grid):
+
+    y_counts = np.bincount(node_grid.yLeft, minlength=4)[1:4]
+    w_counts = np.bincount(node_grid.wLeft, minlength=4)[1:4]
+    z_counts = np.bincount(node_grid.zLeft, minlength=7)[1:7]
+    config_var_counts = np.concatenate((y_counts, w_counts, z_counts)).tolist()
+
+    return(config_var_counts)
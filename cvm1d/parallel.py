@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+# Copyright 2023 Themesis, Inc.; made available under the MIT License (see LICENSE).
+#
+# Code created by: Alianna J. Maren; assigned to Themesis, Inc.
+#
+#===================================================================================================
+#
+# BOUNDED TASK SUBMISSION: run a long (or endless) stream of tasks on an executor, keeping only a
+#   few of them submitted at a time.
+#
+#===================================================================================================
+#
+# run_bounded_tasks submits the first max_in_flight tasks; each time some of them complete, as
+#   many new tasks are submitted, and the results of the completed ones are yielded (in the order
+#   in which they complete). So the task arguments are read from their iterator only as they are
+#   needed, and the executor never holds more than max_in_flight futures - a sweep or an
+#   enumeration with millions of tasks does not have to be held in the pool all at once.
+# A common choice is tasks_in_flight_per_worker*max_workers, so that no worker waits for work.
+#
+####################################################################################################
+
+import concurrent.futures
+import itertools
+
+
+tasks_in_flight_per_worker = 4
+
+
+def run_bounded_tasks(executor, task_function, task_arguments, max_in_flight):
+
+    task_arguments = iter(task_arguments)
+    running = set()
+    for arguments in itertools.islice(task_arguments, max_in_flight):
+        running.add(executor.submit(task_function, *arguments))
+    while running:
+        done, running = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+        for arguments in itertools.islice(task_arguments, len(done)):
+            running.add(executor.submit(task_function, *arguments))
+        for future in done:
+            yield future.result()
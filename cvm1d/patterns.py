@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+# Copyright 2023 Themesis, Inc.; made available under the MIT License (see LICENSE).
+#
+# Code created by: Alianna J. Maren; assigned to Themesis, Inc.
+#
+#===================================================================================================
+#
+# PATTERN GENERATORS: batches of activation patterns for a grid of any size - random with exactly
+#   round(x1*total_nodes) ON nodes, periodic blocks, a single cluster (an island of x1 in a sea of
+#   x2), alternating, and user-supplied templates (among them the built-in pattern of
+#   assign_activations_node_list).
+#
+#===================================================================================================
+#
+# Every generator returns an (num_patterns, total_nodes) int8 array of activations, one pattern per
+#   row in node order (x = row*array_length + col), as taken by obtain_config_var_counts_batch and
+#   evaluate_activations.
+#
+# Apart from the random patterns, the patterns are laid out along the SEQUENCE of chain positions:
+#   the zigzag chain of the first pair of rows in chain order (U[0], D[0], U[1], D[1], ..., where U is
+#   the upper row and D the lower row), then the chain of the next pair of rows, and so on; a
+#   block, a cluster or a template is a run of consecutive positions of this sequence. Each pattern
+#   is a cyclic shift of one base sequence (the phase, or the start of the cluster), so a batch is
+#   made by obtain_shifted_patterns from the base sequence alone: split into its upper-row and
+#   lower-row positions, every row of every pattern is one window of array_length positions of one
+#   of the two, and the windows are gathered at once with NumPy (no arithmetic per node).
+#
+####################################################################################################
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from cvm1d.grid import validate_array_size_list
+
+
+# The built-in pattern of assign_activations_node_list, in chain order (U[0], D[0], U[1], D[1], ...):
+#   in row 0 (U), columns 0-2, 4-6 and 8-10 are ON; in row 1 (D), columns 0, 4 and 8
+builtin_pattern_template = np.array([1, 1, 1, 0, 1, 0, 0, 0, 1, 1, 1, 0, 1, 0, 0, 0, 1, 1, 1, 0, 1, 0],
+                                    dtype=np.int8)
+
+# Random patterns drawn per block (bounds the size of the temporary arrays)
+patterns_per_block = 4096
+
+
+####################################################################################################
+#
+# The patterns activ[i, x] = base_sequence[(q(x) + shifts[i]) % total_nodes], where q(x) is the
+#   position of node x in the sequence of chain positions and base_sequence holds total_nodes
+#   activations in that order
+#
+####################################################################################################
+
+def obtain_shifted_patterns(base_sequence, shifts, array_size_list):
+
+    array_length, array_layers = validate_array_size_list(array_size_list)
+    total_nodes = array_length*array_layers
+    base_sequence = np.asarray(base_sequence, dtype=np.int8).ravel()
+    if base_sequence.size != total_nodes:
+        raise ValueError('The base sequence must hold ' + str(total_nodes) + ' activations')
+    shifts = np.asarray(shifts, dtype=np.int64).ravel() % total_nodes
+
+# Two turns of the sequence (so that no window wraps): its U positions, then its D positions
+    sequence = np.resize(base_sequence, 2*total_nodes + 2)
+    num_upper = total_nodes + 1
+    windows = sliding_window_view(np.concatenate((sequence[0::2], sequence[1::2])), array_length)
+
+# Node (chain, row, col) is at sequence position 2*(array_length*chain + col) + row; an even shift
+#   2*t moves each row t columns along its own row, and an odd shift 2*t + 1 also exchanges U and D
+    half_shifts, odd_shifts = np.divmod(shifts, 2)
+    starts = half_shifts[:, None] + array_length*np.arange(array_layers//2)
+    window_nums = np.empty(starts.shape + (2,), dtype=np.int64)
+    window_nums[..., 0] = starts + num_upper*odd_shifts[:, None]
+    window_nums[..., 1] = starts + odd_shifts[:, None] + num_upper*(1 - odd_shifts[:, None])
+
+    return(windows[window_nums].reshape(shifts.size, total_nodes))
+
+
+# Patterns from a group of base sequences: base_keys[i] (an integer) picks the base sequence of
+#   pattern i, made by obtain_base_sequence(key) once per distinct key, and phases[i] moves it that
+#   many positions along the sequence
+def obtain_grouped_patterns(base_keys, phases, obtain_base_sequence, array_size_list):
+
+    array_length, array_layers = validate_array_size_list(array_size_list)
+    total_nodes = array_length*array_layers
+    distinct_keys, key_nums = np.unique(base_keys, return_inverse=True)
+    if distinct_keys.size == 1:
+        return(obtain_shifted_patterns(obtain_base_sequence(int(distinct_keys[0])), -phases, array_size_list))
+
+    activ = np.empty((len(base_keys), total_nodes), dtype=np.int8)
+    for key_num, key in enumerate(distinct_keys.tolist()):
+        members = np.flatnonzero(key_nums.ravel() == key_num)
+        activ[members] = obtain_shifted_patterns(obtain_base_sequence(key), -phases[members], array_size_list)
+
+    return(activ)
+
+
+def obtain_pattern_parameters(num_patterns, *parameters):
+
+    return([np.array(np.broadcast_to(np.asarray(parameter, dtype=np.int64), (num_patterns,)))
+            for parameter in parameters])
+
+
+####################################################################################################
+#
+# Random patterns with exactly round(x1*total_nodes) ON nodes each (x1: one value, or one value
+#   per pattern), every such pattern being equally likely
+#
+####################################################################################################
+
+def obtain_random_patterns(num_patterns, array_size_list, x1, seed=None):
+
+    array_length, array_layers = validate_array_size_list(array_size_list)
+    total_nodes = array_length*array_layers
+    x1_counts = obtain_pattern_parameters(num_patterns, np.rint(np.asarray(x1, dtype=float)*total_nodes))[0]
+    if np.any(x1_counts < 0) or np.any(x1_counts > total_nodes):
+        raise ValueError('x1 must be between 0 and 1')
+    rng = np.random.default_rng(seed)
+
+# The x1_count nodes of lowest random key are ON. The keys are 16-bit, so a few patterns have
+#   more than one node at the key of their x1_count-th node; these are drawn again with 53-bit keys
+    activ = np.zeros((num_patterns, total_nodes), dtype=np.int8)
+    for first_pattern in range(0, num_patterns, patterns_per_block):
+        block_counts = x1_counts[first_pattern:first_pattern + patterns_per_block]
+        keys = rng.integers(0, 1 << 16, (block_counts.size, total_nodes), dtype=np.uint16)
+        for x1_count in np.unique(block_counts).tolist():
+            if x1_count == 0:
+                continue
+            members = first_pattern + np.flatnonzero(block_counts == x1_count)
+            member_keys = keys[members - first_pattern]
+            thresholds = np.partition(member_keys, x1_count - 1, axis=-1)[:, x1_count - 1:x1_count]
+            member_activ = (member_keys <= thresholds).view(np.int8)
+            tied = np.flatnonzero(member_activ.sum(axis=-1, dtype=np.int64) > x1_count)
+            if tied.size > 0:
+                on_nodes = np.argpartition(rng.random((tied.size, total_nodes)), x1_count - 1,
+                                           axis=-1)[:, :x1_count]
+                member_activ[tied] = 0
+                member_activ[tied[:, None], on_nodes] = 1
+            activ[members] = member_activ
+
+    return(activ)
+
+
+####################################################################################################
+#
+# Periodic blocks: on_length ON positions, then off_length OFF positions, repeated along the
+#   sequence and moved phase positions along it; alternating patterns are blocks of one and one
+#   (with the chain order, every upper row ON and every lower row OFF, or the other way round)
+#
+####################################################################################################
+
+def obtain_block_patterns(num_patterns, array_size_list, on_length, off_length, phase=0):
+
+    array_length, array_layers = validate_array_size_list(array_size_list)
+    total_nodes = array_length*array_layers
+    on_lengths, off_lengths, phases = obtain_pattern_parameters(num_patterns, on_length, off_length, phase)
+    if np.any(on_lengths < 0) or np.any(off_lengths < 0) or np.any(on_lengths + off_lengths < 1):
+        raise ValueError('Block lengths must not be negative, and each period needs at least one position')
+
+# Key: on_length*(max_off_length + 1) + off_length
+    key_factor = int(off_lengths.max()) + 1
+
+    def obtain_block_sequence(key):
+        on_length, off_length = divmod(key, key_factor)
+        block = np.concatenate((np.ones(on_length, dtype=np.int8), np.zeros(off_length, dtype=np.int8)))
+        return(np.resize(block, total_nodes))
+
+    return(obtain_grouped_patterns(on_lengths*key_factor + off_lengths, phases, obtain_block_sequence,
+                                   array_size_list))
+
+
+def obtain_alternating_patterns(num_patterns, array_size_list, phase=0):
+
+    return(obtain_block_patterns(num_patterns, array_size_list, 1, 1, phase))
+
+
+####################################################################################################
+#
+# A single cluster: round(x1*total_nodes) consecutive ON positions of the sequence (an island of
+#   x1 in a sea of x2), starting at position start (by default, in the middle of the sequence)
+#
+####################################################################################################
+
+def obtain_cluster_patterns(num_patterns, array_size_list, x1, start=None):
+
+    array_length, array_layers = validate_array_size_list(array_size_list)
+    total_nodes = array_length*array_layers
+    x1_counts = obtain_pattern_parameters(num_patterns, np.rint(np.asarray(x1, dtype=float)*total_nodes))[0]
+    if np.any(x1_counts < 0) or np.any(x1_counts > total_nodes):
+        raise ValueError('x1 must be between 0 and 1')
+    if start is None:
+        starts = (total_nodes - x1_counts)//2
+    else:
+        starts = obtain_pattern_parameters(num_patterns, start)[0]
+
+    def obtain_cluster_sequence(key):
+        return(np.arange(total_nodes) < key)
+
+    return(obtain_grouped_patterns(x1_counts, starts, obtain_cluster_sequence, array_size_list))
+
+
+####################################################################################################
+#
+# Templates: a user-supplied run of activations along the sequence (in chain order), repeated
+#   along the whole sequence (tile=True), or placed once with every other node OFF (tile=False;
+#   a template longer than the sequence is cut off), and moved phase positions along it
+#
+####################################################################################################
+
+def obtain_template_patterns(num_patterns, array_size_list, template, phase=0, tile=True):
+
+    array_length, array_layers = validate_array_size_list(array_size_list)
+    total_nodes = array_length*array_layers
+    template = np.asarray(template, dtype=np.int8).ravel()
+    if template.size == 0 or np.any((template != 0) & (template != 1)):
+        raise ValueError('A template must hold at least one activation, and only 0s and 1s')
+    phases = obtain_pattern_parameters(num_patterns, phase)[0]
+
+    if tile:
+        base_sequence = np.resize(template, total_nodes)
+    else:
+        base_sequence = np.zeros(total_nodes, dtype=np.int8)
+        base_sequence[:min(template.size, total_nodes)] = template[:total_nodes]
+
+    return(obtain_shifted_patterns(base_sequence, -phases, array_size_list))
+
+
+# The built-in pattern of assign_activations_node_list, on any grid (columns past the first 11 OFF)
+def obtain_builtin_activations(array_size_list):
+
+    return(obtain_template_patterns(1, array_size_list, builtin_pattern_template, tile=False)[0])
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+# Copyright 2023 Themesis, Inc.; made available under the MIT License (see LICENSE).
+#
+# Code created by: Alianna J. Maren; assigned to Themesis, Inc.
+#
+#===================================================================================================
+#
+# HEADLESS RENDERING: the before/after grid picture drawn by turtle_grid, rasterized directly into
+#   a NumPy image array (and written as PNG), or written as SVG - no display, no Tk, no clicks.
+#
+#===================================================================================================
+#
+# The picture is the one drawn by turtle_grid from the turtle_grid_list of obtain_turtle_grid_list:
+#   the first array_size entries are the activations of the original grid, and the next array_size
+#   entries are the activations of the revised grid, with the two swapped nodes marked:
+#     0: blue outline, white fill (activation 0)
+#     1: black outline, black fill (activation 1)
+#     2: red outline, white fill (a swapped node that is now 0)
+#     3: red outline, red fill (a swapped node that is now 1)
+#   The revised grid is drawn above the original grid; each box is 40 units wide, drawn with a pen
+#   5 units wide, at a pitch of 50 units, and every odd row is shifted 25 units to the right
+#   (the zigzag). One unit is one pixel at scale = 1.
+#
+# The image is built a whole row at a time, from one small tile per colour code, so a frame costs
+#   a few NumPy copies; PNG files are written with zlib (no imaging library is needed).
+#
+####################################################################################################
+
+import struct
+import zlib
+
+import numpy as np
+
+
+# The colours used (white, blue, black, red), as RGB; images are first drawn as indices into
+#   this palette (which is also the palette of GIF frames), with white as the background
+palette_colours = np.array([[255, 255, 255], [0, 0, 255], [0, 0, 0], [255, 0, 0]], dtype=np.uint8)
+background_index = 0
+
+# (outline, fill) palette indices of each code in the turtle_grid_list, and the same as RGB
+turtle_colour_indices = {0: (1, 0), 1: (2, 2), 2: (3, 0), 3: (3, 3)}
+turtle_colours = dict((code, (tuple(palette_colours[outline].tolist()), tuple(palette_colours[fill].tolist())))
+                      for code, (outline, fill) in turtle_colour_indices.items())
+
+# Picture layout, in turtle units
+box_pitch = 50
+box_size = 40
+pen_size = 5
+picture_margin = 25
+
+
+####################################################################################################
+#
+# One (pitch x pitch) tile per colour code, at the given scale
+#
+####################################################################################################
+
+def obtain_box_tiles(scale=1.0):
+
+    pitch = max(2, int(round(box_pitch*scale)))
+    outer = max(1, int(round((box_size + pen_size)*scale)))
+    pen = max(1, int(round(pen_size*scale)))
+
+    tiles = np.full((len(turtle_colour_indices), pitch, pitch), background_index, dtype=np.uint8)
+    for code, (outline, fill) in turtle_colour_indices.items():
+        tiles[code, :outer, :outer] = outline
+        tiles[code, pen:outer - pen, pen:outer - pen] = fill
+
+    return(tiles)
+
+
+####################################################################################################
+#
+# Rasterize a turtle_grid_list into an (height, width) image of palette indices, 
+#   or into an (height, width, 3) uint8 RGB image
+#
+####################################################################################################
+
+def render_turtle_grid_indexed(turtle_grid_list, array_size_list, scale=1.0, tiles=None):
+
+    array_length, array_layers = array_size_list
+    array_size = array_length*array_layers
+    if tiles is None:
+        tiles = obtain_box_tiles(scale)
+    pitch = tiles.shape[1]
+    shift = pitch//2
+    margin = int(round(picture_margin*scale))
+
+    codes = np.asarray(turtle_grid_list, dtype=np.intp)
+    if codes.size != 2*array_size:
+        raise ValueError('The turtle_grid_list must hold two grids of ' + str(array_size) + ' nodes')
+# The revised grid (second half of the list) goes on top
+    rows = np.concatenate((codes[array_size:], codes[:array_size])).reshape(2*array_layers, array_length)
+
+    height = 2*margin + 2*array_layers*pitch + 2*pitch
+    width = 2*margin + array_length*pitch + shift
+    image = np.full((height, width), background_index, dtype=np.uint8)
+
+    for row_num in range(2*array_layers):
+        top = margin + row_num*pitch + (2*pitch if row_num >= array_layers else 0)
+        left = margin + (shift if row_num % 2 == 1 else 0)
+    # (array_length, pitch, pitch) tiles, laid side by side
+        strip = tiles[rows[row_num]].transpose(1, 0, 2).reshape(pitch, array_length*pitch)
+        image[top:top + pitch, left:left + array_length*pitch] = strip
+
+    return(image)
+
+
+def render_turtle_grid_image(turtle_grid_list, array_size_list, scale=1.0, tiles=None):
+
+    return(palette_colours[render_turtle_grid_indexed(turtle_grid_list, array_size_list, scale, tiles)])
+
+
+####################################################################################################
+#
+# Write an RGB image as a PNG file (8-bit truecolour, no filtering)
+#
+####################################################################################################
+
+def obtain_png_chunk(chunk_type, data):
+
+    return(struct.pack('>I', len(data)) + chunk_type + data +
+           struct.pack('>I', zlib.crc32(chunk_type + data) & 0xFFFFFFFF))
+
+
+def write_png(path, image, compression_level=1):
+
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    write_png_rows(path, image.shape[1], image.shape[0], [image], compression_level)
+
+    return()
+
+
+# Write a PNG file from an iterable of blocks of image rows (each an (n, width, 3) uint8 array),
+#   so that a tall image never has to be held in memory at once; the blocks must add up to
+#   height rows.
+def write_png_rows(path, width, height, row_blocks, compression_level=1):
+
+    compressor = zlib.compressobj(compression_level)
+    rows_written = 0
+    with open(path, 'wb') as png_file:
+        png_file.write(b'\x89PNG\r\n\x1a\n')
+        png_file.write(obtain_png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        for row_block in row_blocks:
+            row_block = np.asarray(row_block, dtype=np.uint8)
+            scanlines = np.zeros((row_block.shape[0], 1 + 3*width), dtype=np.uint8)
+            scanlines[:, 1:] = row_block.reshape(row_block.shape[0], 3*width)
+            rows_written = rows_written + row_block.shape[0]
+            compressed = compressor.compress(scanlines.tobytes())
+            if compressed:
+                png_file.write(obtain_png_chunk(b'IDAT', compressed))
+        png_file.write(obtain_png_chunk(b'IDAT', compressor.flush()))
+        png_file.write(obtain_png_chunk(b'IEND', b''))
+    if rows_written != height:
+        raise ValueError('Wrote ' + str(rows_written) + ' rows to a PNG file of height ' + str(height))
+
+    return()
+
+
+####################################################################################################
+#
+# Write an animated GIF from an iterable of frames of palette indices (all the same size),
+#   one frame at a time, with no imaging library.
+# Each frame is LZW-coded as the GIF format specifies: codes of 4 up to 12 bits (minimum code size
+#   3, an 8-colour table), each new code standing for a known string of pixels plus the next pixel,
+#   and a clear code whenever the code table is full. The pictures are made of long runs of one
+#   colour and of rows repeated down each box, so a frame codes to a few percent of a byte per pixel.
+#
+####################################################################################################
+
+gif_min_code_size = 3
+gif_max_code = 4095
+
+
+# The LZW codes of the pixels of a frame, and the width in bits of each code
+def obtain_gif_lzw_codes(pixels):
+
+    clear_code = 1 << gif_min_code_size
+    end_code = clear_code + 1
+    codes = [clear_code]
+    widths = [gif_min_code_size + 1]
+    width = gif_min_code_size + 1
+    code_table = dict()
+    next_code = end_code + 1
+
+# code_table maps (code of a string) << 8 | (next pixel) to the code of the longer string
+    prefix = pixels[0]
+    for pixel in pixels[1:]:
+        key = (prefix << 8) | pixel
+        code = code_table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+        codes.append(prefix)
+        widths.append(width)
+        if next_code < gif_max_code:
+        # The decoder reads the next code with one more bit once this code number is reached
+            if next_code == (1 << width) and width < 12:
+                width = width + 1
+            code_table[key] = next_code
+            next_code = next_code + 1
+        else:
+            codes.append(clear_code)
+            widths.append(width)
+            code_table = dict()
+            next_code = end_code + 1
+            width = gif_min_code_size + 1
+        prefix = pixel
+    codes.append(prefix)
+    widths.append(width)
+    codes.append(end_code)
+    widths.append(width)
+
+    return(codes, widths)
+
+
+def obtain_gif_image_data(frame):
+
+    pixels = np.asarray(frame, dtype=np.uint8).tobytes()
+    codes, widths = obtain_gif_lzw_codes(pixels)
+
+# Pack the codes, least significant bit first
+    codes = np.array(codes, dtype=np.int64)
+    widths = np.array(widths, dtype=np.int64)
+    bit_nums = np.arange(int(widths.sum())) - np.repeat(np.cumsum(widths) - widths, widths)
+    bits = ((np.repeat(codes, widths) >> bit_nums) & 1).astype(np.uint8)
+    code_bytes = np.packbits(bits, bitorder='little').tobytes()
+
+# Sub-blocks of at most 255 bytes
+    blocks = [bytes([len(code_bytes[start:start + 255])]) + code_bytes[start:start + 255]
+              for start in range(0, len(code_bytes), 255)]
+
+    return(bytes([gif_min_code_size]) + b''.join(blocks) + b'\x00')
+
+
+def write_gif_frames(path, frames, frame_duration=0.1, loop=True):
+
+    colour_table = np.zeros((1 << gif_min_code_size, 3), dtype=np.uint8)
+    colour_table[:len(palette_colours)] = palette_colours
+    delay = int(round(100*frame_duration))
+
+    num_frames = 0
+    with open(path, 'wb') as gif_file:
+        for frame in frames:
+            height, width = frame.shape
+            if num_frames == 0:
+                gif_file.write(b'GIF89a' + struct.pack('<HHBBB', width, height, 0xF0 | (gif_min_code_size - 1), 0, 0))
+                gif_file.write(colour_table.tobytes())
+                if loop:
+                    gif_file.write(b'\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00')
+            gif_file.write(b'\x21\xF9\x04\x00' + struct.pack('<H', delay) + b'\x00\x00')
+            gif_file.write(b'\x2C' + struct.pack('<HHHHB', 0, 0, width, height, 0))
+            gif_file.write(obtain_gif_image_data(frame))
+            num_frames = num_frames + 1
+        gif_file.write(b'\x3B')
+
+    return(num_frames)
+
+
+####################################################################################################
+#
+# Write the same picture as an SVG file (one rect per box, in turtle units times scale)
+#
+####################################################################################################
+
+def write_turtle_grid_svg(path, turtle_grid_list, array_size_list, scale=1.0):
+
+    array_length, array_layers = array_size_list
+    array_size = array_length*array_layers
+    codes = list(turtle_grid_list)
+    rows = [codes[array_size + row_num*array_length:array_size + (row_num + 1)*array_length]
+            for row_num in range(array_layers)]
+    rows = rows + [codes[row_num*array_length:(row_num + 1)*array_length] for row_num in range(array_layers)]
+
+    height = (2*picture_margin + 2*array_layers*box_pitch + 2*box_pitch)*scale
+    width = (2*picture_margin + array_length*box_pitch + box_pitch//2)*scale
+    svg_lines = ['<svg xmlns="http://www.w3.org/2000/svg" width="%g" height="%g" viewBox="0 0 %g %g">'
+                 % (width, height, width/scale, height/scale),
+                 '<rect width="100%" height="100%" fill="rgb(255,255,255)"/>']
+    for row_num, row in enumerate(rows):
+        top = picture_margin + row_num*box_pitch + (2*box_pitch if row_num >= array_layers else 0) + pen_size/2.0
+        left = picture_margin + (box_pitch//2 if row_num % 2 == 1 else 0) + pen_size/2.0
+        for col, code in enumerate(row):
+            outline, fill = turtle_colours[code]
+            svg_lines.append('<rect x="%g" y="%g" width="%d" height="%d" fill="rgb%s" stroke="rgb%s" '
+                             'stroke-width="%d"/>' % (left + col*box_pitch, top, box_size, box_size,
+                                                     str(fill).replace(' ', ''), str(outline).replace(' ', ''),
+                                                     pen_size))
+    svg_lines.append('</svg>')
+
+    with open(path, 'w') as svg_file:
+        svg_file.write('\n'.join(svg_lines) + '\n')
+
+    return()
+
+
+####################################################################################################
+#
+# Render to a PNG or SVG file, chosen by the file extension
+#
+####################################################################################################
+
+def render_turtle_grid_file(path, turtle_grid_list, array_size_list, scale=1.0):
+
+    if str(path).lower().endswith('.svg'):
+        write_turtle_grid_svg(path, turtle_grid_list, array_size_list, scale)
+    else:
+        write_png(path, render_turtle_grid_image(turtle_grid_list, array_size_list, scale))
+
+    return()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+# Copyright 2023 Themesis, Inc.; made available under the MIT License (see LICENSE).
+#
+# Code created by: Alianna J. Maren; assigned to Themesis, Inc.
+#
+#===================================================================================================
+#
+# REPLICA MONTE CARLO: many independent zigzag chains (replicas), each with its own eps1 and
+#   temperature, advanced together - one node-swap proposal per replica per step, with the
+#   acceptance test done for all replicas at once.
+#
+#===================================================================================================
+#
+# The replicas are held as one (R, 2, L) int8 array of activations: R chains of array_length L,
+#   each as the two rows of the demo grid. Within a replica, node_num = row*L + col as in the
+#   node_list, and the position along the zigzag chain is k = 2*col + row.
+#
+# A move is the swap of interchange_activations_node_list2: one ON node and one OFF node, picked at
+#   random, exchange activations (so x1 is fixed in each replica). Counting to the left along the
+#   chain, each node k owns one y pair (k-1, k), one w pair (k-2, k) and one triplet (k-2, k-1, k);
+#   a swap changes only what is owned by the nodes k, k+1 and k+2 of each swapped node (at most six
+#   nodes, fewer when the two swapped nodes are close). The change in the 12 config var counts is
+#   found from these, and the free energy is that of compute_neg_entropy and compute_free_energy:
+#     free_energy = epsilon1*(z2/2 + z3 + z4 + z5/2) + neg_entropy
+# and a move is accepted with probability min(1, exp(-total_nodes*delta_free_energy/temperature))
+#   (a temperature of 0 accepts only moves that do not raise the free energy), as in
+#   run_swap_monte_carlo (cvm1d/monte_carlo.py).
+#
+####################################################################################################
+
+import time
+
+import numpy as np
+
+from cvm1d.bitpack import pack_activation_rows, obtain_config_var_counts_packed
+from cvm1d.entropy import compute_neg_entropy_counts_array
+from cvm1d.grid import enthalpy_weights
+from cvm1d.swaps import obtain_swap_count_deltas
+
+
+####################################################################################################
+#
+# Random starting activations for R replicas, with exactly round(x1*2L) ON nodes in each
+#   (x1 may be one value or one value per replica)
+#
+####################################################################################################
+
+def obtain_random_replica_activations(num_replicas, array_length, x1, seed=None):
+
+    total_nodes = 2*array_length
+    x1_counts = np.rint(np.broadcast_to(np.asarray(x1, dtype=float), (num_replicas,))*total_nodes)
+    rng = np.random.default_rng(seed)
+    ranks = np.argsort(rng.random((num_replicas, total_nodes)), axis=-1)
+    activ = (ranks < x1_counts[:, None]).astype(np.int8)
+
+    return(activ.reshape(num_replicas, 2, array_length))
+
+
+####################################################################################################
+#
+# Run num_steps steps of one swap proposal per replica
+#
+####################################################################################################
+
+def run_replica_monte_carlo(activ, epsilon1, temperature, num_steps, seed=None):
+
+    activ = np.array(activ, dtype=np.int8)
+    num_replicas, array_layers, array_length = activ.shape
+    if array_layers != 2:
+        raise ValueError('each replica must be one zigzag chain, of shape (2, array_length)')
+    total_nodes = 2*array_length
+    epsilon1 = np.broadcast_to(np.asarray(epsilon1, dtype=float), (num_replicas,))
+    temperature = np.broadcast_to(np.asarray(temperature, dtype=float), (num_replicas,))
+    rng = np.random.default_rng(seed)
+
+# Each row of node_order lists the ON nodes of a replica first (the first x1_counts entries),
+#   then the OFF nodes; a swap exchanges one entry from each part.
+    activ_flat = activ.reshape(num_replicas, total_nodes)
+    x1_counts = activ_flat.sum(axis=-1, dtype=np.int64)
+    if np.any(x1_counts == 0) or np.any(x1_counts == total_nodes):
+        raise ValueError('Every replica needs at least one ON node and one OFF node to swap')
+    node_order = np.argsort(1 - activ_flat, axis=-1, kind='stable')
+
+    config_var_counts = obtain_config_var_counts_packed(pack_activation_rows(activ), (array_length, 2))
+    neg_entropy = compute_neg_entropy_counts_array(config_var_counts, total_nodes)
+    replica_nums = np.arange(num_replicas)
+    accepted_moves = np.zeros(num_replicas, dtype=np.int64)
+
+    start_time = time.perf_counter()
+    for step in range(num_steps):
+        on_picks = (rng.random(num_replicas)*x1_counts).astype(np.int64)
+        off_picks = x1_counts + (rng.random(num_replicas)*(total_nodes - x1_counts)).astype(np.int64)
+        node1_nums = node_order[replica_nums, on_picks]
+        node2_nums = node_order[replica_nums, off_picks]
+
+        delta_counts = obtain_swap_count_deltas(activ_flat, node1_nums, node2_nums, (array_length, 2))
+        new_counts = config_var_counts + delta_counts
+        new_neg_entropy = compute_neg_entropy_counts_array(new_counts, total_nodes)
+        delta_free_energy = epsilon1*(delta_counts @ enthalpy_weights)/total_nodes + new_neg_entropy - neg_entropy
+
+    # Metropolis acceptance, for all replicas at once
+        log_uniforms = np.log(rng.random(num_replicas))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            accept = (delta_free_energy <= 0.0) | \
+                     ((temperature > 0.0) & (-total_nodes*delta_free_energy/temperature > log_uniforms))
+
+        activ_flat[accept, node1_nums[accept]] = 0
+        activ_flat[accept, node2_nums[accept]] = 1
+        node_order[accept, on_picks[accept]] = node2_nums[accept]
+        node_order[accept, off_picks[accept]] = node1_nums[accept]
+        config_var_counts[accept] = new_counts[accept]
+        neg_entropy[accept] = new_neg_entropy[accept]
+        accepted_moves += accept
+    elapsed_time = time.perf_counter() - start_time
+
+    config_vars = config_var_counts/float(total_nodes)
+    enthalpy = epsilon1*(config_vars @ enthalpy_weights)
+    total_moves = num_steps*num_replicas
+
+    replica_results = {
+        'epsilon1': epsilon1,
+        'temperature': temperature,
+        'steps': num_steps,
+        'accepted_moves': accepted_moves,
+        'acceptance_rate': accepted_moves/float(max(num_steps, 1)),
+        'elapsed_time': elapsed_time,
+        'moves_per_second': total_moves/elapsed_time if elapsed_time > 0.0 else 0.0,
+        'activ': activ,
+        'config_var_counts': config_var_counts,
+        'config_vars': config_vars,
+        'neg_entropy': neg_entropy,
+        'enthalpy': enthalpy,
+        'free_energy': enthalpy + neg_entropy,
+    }
+
+    return(replica_results)
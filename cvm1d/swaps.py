@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+# Copyright 2023 Themesis, Inc.; made available under the MIT License (see LICENSE).
+#
+# Code created by: Alianna J. Maren; assigned to Themesis, Inc.
+#
+#===================================================================================================
+#
+# SWAP DELTAS: the change in the config var counts and in the negative entropy for many node swaps,
+#   each made against the same base grid, computed for all swaps at once.
+#
+#===================================================================================================
+#
+# The grid is (array_layers, array_length), with node_num = row*array_length + col as in the
+#   node_list; each pair of rows (2p, 2p + 1) is one zigzag chain, along which the position of a
+#   node is k = 2*col + (row % 2).
+# Counting to the left along the chain, each node k owns one y pair (k-1, k), one w pair (k-2, k)
+#   and one triplet (k-2, k-1, k), whose counts are in triplet_count_vectors (cvm1d/grid.py);
+#   a swap changes only what is owned by the nodes k, k+1 and k+2 of each swapped node (a position
+#   listed twice, when the two nodes are close, is counted once); obtain_swap_count_deltas finds
+#   the count changes of many swaps at once, for cvm1d/replicas.py as well as for this module.
+# A swap of two nodes with the same activation changes nothing (see node_difference_test).
+#
+####################################################################################################
+
+import numpy as np
+
+from cvm1d.bitpack import pack_activation_rows, obtain_config_var_counts_packed
+from cvm1d.entropy import compute_neg_entropy_counts_array
+from cvm1d.grid import triplet_count_vectors, enthalpy_weights
+
+
+# Swaps handled per block (bounds the size of the temporary arrays)
+swaps_per_block = 1 << 16
+
+# Chain offsets of the triplets owned by the nodes k, k+1 and k+2 of a swapped node k:
+#   row j holds the owner k + j and the two nodes to its left; their activations (c, b, a) give the
+#   triplet index 4*c + 2*b + a
+owner_triplet_offsets = np.arange(3)[:, None] - np.arange(3)
+triplet_index_weights = np.array([4, 2, 1], dtype=np.int8)
+
+# Of the six owners of a swap, each one is compared with the owners listed before it
+earlier_owner_mask = np.tri(6, k=-1, dtype=bool)
+
+# The count changes of each change of triplet index (8*old + new)
+triplet_change_count_deltas = (triplet_count_vectors[None, :, :] - triplet_count_vectors[:, None, :]).reshape(64, 12)
+
+
+####################################################################################################
+#
+# Node numbers of the chain positions k + offset, for nodes given by node_num
+#
+####################################################################################################
+
+def obtain_chain_neighbor_nums(node_nums, offsets, array_size_list):
+
+    array_length = array_size_list[0]
+    chain_length = 2*array_length
+    row, col = np.divmod(np.asarray(node_nums, dtype=np.int64), array_length)
+    pair_start = (row//2)*chain_length
+    positions = (2*col + row % 2)[..., None] + np.asarray(offsets)
+    positions = positions % chain_length
+
+    return(pair_start[..., None] + (positions % 2)*array_length + positions//2)
+
+
+####################################################################################################
+#
+# Config var count changes for swaps (node1_nums[s], node2_nums[s]): activ is either one flat array
+#   of total_nodes activations that every swap is made against, or one such array per swap
+#   (num_swaps x total_nodes); returns the (num_swaps x 12) count deltas
+#
+####################################################################################################
+
+def obtain_swap_count_deltas(activ, node1_nums, node2_nums, array_size_list):
+
+    node_pairs = np.stack([node1_nums, node2_nums], axis=-1)
+
+# The (up to six) owning nodes k, k+1, k+2 of the two swapped nodes, each with its triplet
+#   (the owner and the nodes one and two steps to its left); an owner listed twice counts once
+    triplet_nodes = obtain_chain_neighbor_nums(node_pairs[..., None], owner_triplet_offsets,
+                                               array_size_list).reshape(-1, 6, 3)
+    owners = triplet_nodes[:, :, 0]
+    counted = ~np.any((owners[:, :, None] == owners[:, None, :]) & earlier_owner_mask, axis=-1)
+
+    if activ.ndim == 1:
+        old_activ = activ[triplet_nodes]
+        pair_activ = activ[node_pairs]
+    else:
+        swap_nums = np.arange(node_pairs.shape[0])
+        old_activ = activ[swap_nums[:, None, None], triplet_nodes]
+        pair_activ = activ[swap_nums[:, None], node_pairs]
+    new_activ = old_activ.copy()
+    for swap_side, other_side in ((0, 1), (1, 0)):
+        swap_node = node_pairs[:, swap_side][:, None, None]
+        new_activ = np.where(triplet_nodes == swap_node, pair_activ[:, other_side][:, None, None], new_activ)
+
+# Change of triplet 8*old + new of each owner (0, no change, for an owner already counted)
+    triplet_changes = 8*(old_activ @ triplet_index_weights) + new_activ @ triplet_index_weights
+    delta_counts = triplet_change_count_deltas[np.where(counted, triplet_changes, 0)].sum(axis=1)
+
+    return(delta_counts)
+
+
+####################################################################################################
+#
+# Deltas for swaps (node1_nums[s], node2_nums[s]), each against the base activations activ
+#   (a flat array of total_nodes activations); returns the (num_swaps x 12) count deltas, the
+#   neg-entropy deltas, and whether each swap changed the grid
+#
+####################################################################################################
+
+def obtain_swap_deltas_base(activ, node1_nums, node2_nums, array_size_list):
+
+    array_length, array_layers = array_size_list
+    total_nodes = array_length*array_layers
+    activ = np.asarray(activ, dtype=np.int8).ravel()
+    node1_nums = np.asarray(node1_nums, dtype=np.int64).ravel()
+    node2_nums = np.asarray(node2_nums, dtype=np.int64).ravel()
+
+    base_counts = obtain_config_var_counts_packed(pack_activation_rows(activ.reshape(array_layers, array_length)),
+                                                  array_size_list)
+    base_neg_entropy = compute_neg_entropy_counts_array(base_counts, total_nodes)
+
+    num_swaps = node1_nums.size
+    delta_counts = np.zeros((num_swaps, 12), dtype=np.int64)
+    delta_neg_entropy = np.zeros(num_swaps)
+    swapped = activ[node1_nums] != activ[node2_nums]
+
+    for first_swap in range(0, num_swaps, swaps_per_block):
+        block = slice(first_swap, first_swap + swaps_per_block)
+        delta_counts[block] = obtain_swap_count_deltas(activ, node1_nums[block], node2_nums[block], array_size_list)
+        delta_neg_entropy[block] = compute_neg_entropy_counts_array(base_counts + delta_counts[block],
+                                                                    total_nodes) - base_neg_entropy
+
+    return(delta_counts, delta_neg_entropy, swapped)
+
+
+####################################################################################################
+#
+# ALL-PAIRS SWAP IMPACT: the change in the neg-entropy and in the free energy for EVERY swap of an
+#   ON node with an OFF node of the grid, found at once.
+#
+# Flipping one node k changes the counts owned by k, k+1 and k+2, and so depends only on the five
+#   activations k-2 .. k+2 along its chain (its flip window, coded as a 5-bit number); the count
+#   change of each of the 32 windows is in flip_count_deltas. Two swapped nodes that are more than
+#   two steps apart along the chain (or on different chains) change disjoint sets of owned counts,
+#   so the count change of the swap is the sum of the two flip changes; the neg-entropy and
+#   enthalpy changes then depend only on the pair of windows, and are found once per pair of
+#   windows (at most 16 x 16) and gathered into the (n_on x n_off) matrix. The few pairs that are
+#   within two steps of each other (at most four per ON node) are found exactly with
+#   obtain_swap_deltas_base and written over their entries.
+#
+####################################################################################################
+
+# Offsets along the chain of the flip window, and the position of the flipped node in it
+flip_window_offsets = np.array([-2, -1, 0, 1, 2])
+
+
+def obtain_flip_count_deltas():
+
+    flip_count_deltas = np.zeros((32, 12), dtype=np.int64)
+    for window_code in range(32):
+        window = [(window_code >> (4 - n)) & 1 for n in range(5)]
+        flipped = list(window)
+        flipped[2] = 1 - flipped[2]
+    # The owned triplets (k-2, k-1, k), (k-1, k, k+1) and (k, k+1, k+2), indexed by 4*c + 2*b + a
+        for a, b, c in ((0, 1, 2), (1, 2, 3), (2, 3, 4)):
+            flip_count_deltas[window_code] += triplet_count_vectors[4*flipped[c] + 2*flipped[b] + flipped[a]] - \
+                                              triplet_count_vectors[4*window[c] + 2*window[b] + window[a]]
+
+    return(flip_count_deltas)
+
+
+flip_count_deltas = obtain_flip_count_deltas()
+
+
+# The flip window code of every node (activ is a flat array of total_nodes activations)
+def obtain_flip_window_codes(activ, array_size_list):
+
+    window_nodes = obtain_chain_neighbor_nums(np.arange(activ.size), flip_window_offsets, array_size_list)
+
+    return(activ[window_nodes].astype(np.int64) @ (1 << np.arange(4, -1, -1)))
+
+
+####################################################################################################
+#
+# The swap impact of the ON nodes on_nodes[rows] with all the OFF nodes: (len(rows) x n_off)
+#   arrays of the neg-entropy and free-energy changes
+#
+####################################################################################################
+
+def obtain_swap_impact_setup(activ, array_size_list, epsilon1):
+
+    total_nodes = array_size_list[0]*array_size_list[1]
+    activ = np.asarray(activ, dtype=np.int8).ravel()
+    on_nodes = np.flatnonzero(activ == 1)
+    off_nodes = np.flatnonzero(activ == 0)
+
+    base_counts = obtain_config_var_counts_packed(pack_activation_rows(activ.reshape(array_size_list[1],
+                                                                                       array_size_list[0])),
+                                                  array_size_list)
+    base_neg_entropy = compute_neg_entropy_counts_array(base_counts, total_nodes)
+
+# Changes for every pair of windows (ON window codes have bit 2 set, OFF ones do not)
+    pair_counts = base_counts + flip_count_deltas[:, None, :] + flip_count_deltas[None, :, :]
+    valid_pairs = np.all((pair_counts >= 0) & (pair_counts <= total_nodes), axis=-1)
+    window_neg_entropy = np.zeros((32, 32))
+    window_neg_entropy[valid_pairs] = compute_neg_entropy_counts_array(pair_counts[valid_pairs],
+                                                                       total_nodes) - base_neg_entropy
+    window_enthalpy = epsilon1*((flip_count_deltas @ enthalpy_weights)[:, None] +
+                                (flip_count_deltas @ enthalpy_weights)[None, :])/total_nodes
+
+# The near pairs (ON node, OFF node within two steps along the chain), found exactly
+    window_codes = obtain_flip_window_codes(activ, array_size_list)
+    near_nodes = obtain_chain_neighbor_nums(on_nodes, np.array([-2, -1, 1, 2]), array_size_list)
+    near_rows, near_cols = np.nonzero(activ[near_nodes] == 0)
+    near_nodes = near_nodes[near_rows, near_cols]
+    delta_counts, near_neg_entropy, swapped = obtain_swap_deltas_base(activ, on_nodes[near_rows], near_nodes,
+                                                                      array_size_list)
+    near_free_energy = epsilon1*(delta_counts @ enthalpy_weights)/total_nodes + near_neg_entropy
+
+    swap_setup = {
+        'on_nodes': on_nodes,
+        'off_nodes': off_nodes,
+        'on_windows': window_codes[on_nodes],
+        'off_windows': window_codes[off_nodes],
+        'window_neg_entropy': window_neg_entropy,
+        'window_free_energy': window_enthalpy + window_neg_entropy,
+        'near_rows': near_rows,
+        'near_cols': np.searchsorted(off_nodes, near_nodes),
+        'near_neg_entropy': near_neg_entropy,
+        'near_free_energy': near_free_energy,
+    }
+
+    return(swap_setup)
+
+
+def obtain_swap_impact_rows(swap_setup, rows):
+
+    on_windows = swap_setup['on_windows'][rows]
+    off_windows = swap_setup['off_windows']
+    delta_neg_entropy = swap_setup['window_neg_entropy'][on_windows][:, off_windows]
+    delta_free_energy = swap_setup['window_free_energy'][on_windows][:, off_windows]
+
+    near = (swap_setup['near_rows'] >= rows.start) & (swap_setup['near_rows'] < rows.stop)
+    near_rows = swap_setup['near_rows'][near] - rows.start
+    near_cols = swap_setup['near_cols'][near]
+    delta_neg_entropy[near_rows, near_cols] = swap_setup['near_neg_entropy'][near]
+    delta_free_energy[near_rows, near_cols] = swap_setup['near_free_energy'][near]
+
+    return(delta_neg_entropy, delta_free_energy)
+
+
+####################################################################################################
+#
+# The full (n_on x n_off) swap impact matrices; row r is ON node on_nodes[r], column c is OFF
+#   node off_nodes[c]
+#
+####################################################################################################
+
+def obtain_swap_impact_matrix(activ, array_size_list, epsilon1=0.0):
+
+    swap_setup = obtain_swap_impact_setup(activ, array_size_list, epsilon1)
+    delta_neg_entropy, delta_free_energy = obtain_swap_impact_rows(swap_setup,
+                                                                   slice(0, swap_setup['on_nodes'].size))
+    swap_impact = {
+        'on_nodes': swap_setup['on_nodes'],
+        'off_nodes': swap_setup['off_nodes'],
+        'delta_neg_entropy': delta_neg_entropy,
+        'delta_free_energy': delta_free_energy,
+    }
+
+    return(swap_impact)
+
+
+####################################################################################################
+#
+# The num_best swaps that lower the free energy (or the neg-entropy, rank_by='neg_entropy') the
+#   most, best first (ties in order of node1, then node2), without building the matrix: all the
+#   far pairs of one pair of windows have the same value, so the pairs of windows are taken in
+#   order of their value, and only as many of their members as are needed; the near pairs are
+#   then merged in
+#
+####################################################################################################
+
+def obtain_best_swaps(activ, array_size_list, epsilon1=0.0, num_best=10, rank_by='free_energy'):
+
+    if rank_by not in ('free_energy', 'neg_entropy'):
+        raise ValueError('rank_by must be free_energy or neg_entropy')
+    swap_setup = obtain_swap_impact_setup(activ, array_size_list, epsilon1)
+    on_nodes = swap_setup['on_nodes']
+    off_nodes = swap_setup['off_nodes']
+    num_off = off_nodes.size
+    near_keys = set((swap_setup['near_rows']*num_off + swap_setup['near_cols']).tolist())
+
+# The ON rows and OFF columns of each window, and the pairs of windows present, in order of value
+    on_members = [np.flatnonzero(swap_setup['on_windows'] == window) for window in range(32)]
+    off_members = [np.flatnonzero(swap_setup['off_windows'] == window) for window in range(32)]
+    window_values = swap_setup['window_' + rank_by]
+    window_pairs = [(window_values[on_window, off_window], on_window, off_window)
+                    for on_window in range(32) for off_window in range(32)
+                    if on_members[on_window].size > 0 and off_members[off_window].size > 0]
+    window_pairs.sort()
+
+    far_rows = list()
+    far_cols = list()
+    num_far = 0
+    cutoff_value = None
+    for value, on_window, off_window in window_pairs:
+        if cutoff_value is not None and value > cutoff_value:
+            break
+        rows = on_members[on_window]
+        cols = off_members[off_window]
+    # Enough rows for num_best pairs, after dropping the near pairs: a row has at most four, so with
+    #   more than four columns each row gives at least cols.size - 4 far pairs; with four or fewer a
+    #   row can give none, but only the (at most 4*cols.size) rows near one of the columns can
+        if cols.size > 4:
+            num_rows = min(rows.size, -(-num_best//(cols.size - 4)))
+        else:
+            num_rows = min(rows.size, -(-num_best//cols.size) + 4*cols.size)
+        pair_rows = np.repeat(rows[:num_rows], cols.size)
+        pair_cols = np.tile(cols, num_rows)
+        far = np.array([key not in near_keys for key in (pair_rows*num_off + pair_cols).tolist()], dtype=bool)
+        far_rows.append(pair_rows[far][:num_best])
+        far_cols.append(pair_cols[far][:num_best])
+        num_far = num_far + far_rows[-1].size
+        if cutoff_value is None and num_far >= num_best:
+            cutoff_value = value
+
+    best_rows = np.concatenate(far_rows + [swap_setup['near_rows']]).astype(np.int64)
+    best_cols = np.concatenate(far_cols + [swap_setup['near_cols']]).astype(np.int64)
+    num_far = best_rows.size - swap_setup['near_rows'].size
+    on_windows = swap_setup['on_windows'][best_rows[:num_far]]
+    off_windows = swap_setup['off_windows'][best_cols[:num_far]]
+    best_neg_entropy = np.concatenate((swap_setup['window_neg_entropy'][on_windows, off_windows],
+                                       swap_setup['near_neg_entropy']))
+    best_free_energy = np.concatenate((swap_setup['window_free_energy'][on_windows, off_windows],
+                                       swap_setup['near_free_energy']))
+
+    rank_values = best_free_energy if rank_by == 'free_energy' else best_neg_entropy
+    order = np.lexsort((best_cols, best_rows, rank_values))[:num_best]
+    best_swaps = {
+        'node1_nums': on_nodes[best_rows[order]],
+        'node2_nums': off_nodes[best_cols[order]],
+        'delta_neg_entropy': best_neg_entropy[order],
+        'delta_free_energy': best_free_energy[order],
+        'num_pairs': on_nodes.size*num_off,
+    }
+
+    return(best_swaps)
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+# Copyright 2023 Themesis, Inc.; made available under the MIT License (see LICENSE).
+#
+# Code created by: Alianna J. Maren; assigned to Themesis, Inc.
+#
+#===================================================================================================
+#
+# SYMMETRY: a canonical form for activation patterns under the symmetries of the zigzag chain,
+#   and a bounded cache of config var counts keyed by that canonical form, so that repeated or
+#   symmetric patterns are only evaluated once.
+#
+#===================================================================================================
+#
+# The config var counts of a grid are found along the zigzag chain of each pair of rows, in chain
+#   order (U[0], D[0], U[1], D[1], ...; U the upper row, D the lower row): each position k counts
+#   its y pair (k-1, k), its w pair (k-2, k) and its triplet (k-2, k-1, k), with periodic wrap-
+#   around. So the counts do not change when
+#   - the chain is moved any number of positions along itself (an odd number of positions also
+#     exchanges the two rows),
+#   - the chain is read backwards (a reflection: the y and w pairs are the same, and each z code
+#     is the same read from either end), or
+#   - the chains of the grid (one per pair of rows) are put in another order.
+#   Exchanging A and B (every activation 0 <-> 1) relabels the counts instead: y1 <-> y3,
+#   w1 <-> w3, z1 <-> z6, z2 <-> z5 and z3 <-> z4 (complement_count_order); the neg-entropy and
+#   the enthalpy (z2/2 + z3 + z4 + z5/2) do not change.
+#
+# The canonical form of each chain is the least of its rotations and of the rotations of its
+#   reflection, found with Booth's least-rotation algorithm (O(chain length)); the canonical
+#   chains are sorted, and the grid is complemented first if that gives fewer ON nodes (if the two
+#   are equal, the lesser of the two forms is kept). The key is the bit-packed canonical form with
+#   the grid dimensions, and records whether the pattern was complemented.
+# Booth's algorithm runs in pure Python, one symbol at a time; chains of least_rotation_vector_length
+#   positions or more use obtain_least_rotation_array instead, which works on 64-position windows
+#   of the chain with NumPy. The starts whose first window is the least are the candidates; two
+#   candidates at most L positions apart that agree on their first L positions can never both be
+#   needed (the rotation from the later one is never the lesser), so the later one is dropped,
+#   which leaves at most chain_length/L candidates. The compared length L then doubles, comparing
+#   the next L positions of each candidate, window by window, until one candidate is left or L
+#   covers the whole chain (the candidates left are then the same rotation). This costs about
+#   5 ms for a chain of 2*10**5 positions, where Booth's algorithm takes about 170 ms.
+#
+# ConfigVarCache holds the counts of up to max_entries canonical forms, dropping the least
+#   recently used one when full, and counts its hits, misses and evictions.
+#   obtain_process_config_var_cache gives the one cache of the calling process (created on first
+#   use), which the worker processes of the sweep and of parallel tempering share across tasks.
+#
+####################################################################################################
+
+from collections import OrderedDict
+import os
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from cvm1d.grid import validate_array_size_list, obtain_config_var_counts_batch
+
+
+# Position of each config var count after exchanging A and B
+complement_count_order = np.array([2, 1, 0, 5, 4, 3, 11, 10, 9, 8, 7, 6])
+
+# Canonical forms kept by a ConfigVarCache unless max_entries is given
+default_cache_entries = 65536
+
+# Shortest chain whose least rotation is found with obtain_least_rotation_array
+least_rotation_vector_length = 256
+
+# Positions in one window of obtain_window_values
+window_positions = 64
+
+# The cache of each process (obtain_process_config_var_cache), by process id
+process_config_var_caches = dict()
+
+
+####################################################################################################
+#
+# Booth's algorithm: the start of the lexicographically least rotation of a sequence of bytes
+#
+####################################################################################################
+
+def obtain_least_rotation(sequence):
+
+    num_positions = len(sequence)
+    doubled = sequence + sequence
+    failure = [-1]*(2*num_positions)
+    least = 0
+    for j in range(1, 2*num_positions):
+        symbol = doubled[j]
+        i = failure[j - least - 1]
+        while i != -1 and symbol != doubled[least + i + 1]:
+            if symbol < doubled[least + i + 1]:
+                least = j - i - 1
+            i = failure[i]
+        if symbol != doubled[least + i + 1]:
+            if symbol < doubled[least]:
+                least = j
+            failure[j - least] = -1
+        else:
+            failure[j - least] = i + 1
+
+    return(least)
+
+
+####################################################################################################
+#
+# The same start, found with NumPy: window_values[i] holds chain positions i, ..., i + 63 (taken
+#   around the chain) as one 64-bit number, so that comparing windows compares 64 positions
+#
+####################################################################################################
+
+def obtain_window_values(chain):
+
+    chain_length = chain.size
+    num_bytes = (chain_length + 7)//8
+    extended = np.resize(chain, 8*num_bytes + window_positions + 8)
+# Row shift of packed holds the chain from position shift on, eight positions to a byte; the
+#   window at 8*q + shift is bytes q, ..., q + 7 of that row
+    packed = np.packbits(sliding_window_view(extended, 8*(num_bytes + 7))[:8], axis=1)
+    windows = np.ascontiguousarray(sliding_window_view(packed, 8, axis=1)[:, :num_bytes])
+    window_values = windows.view('>u8')[:, :, 0].T.ravel()[:chain_length].astype(np.uint64)
+
+    return(window_values)
+
+
+# Drop each candidate start that comes at most compared_length positions after the one before it
+#   (around the chain); if all of them would go, they are all the same rotation, and one is kept
+def drop_close_candidates(candidates, compared_length, chain_length):
+
+    if candidates.size < 2:
+        return(candidates)
+    gaps = np.diff(candidates, append=candidates[0] + chain_length)
+    keep = np.empty(candidates.size, dtype=bool)
+    keep[0] = gaps[-1] > compared_length
+    keep[1:] = gaps[:-1] > compared_length
+    if not keep.any():
+        return(candidates[:1])
+
+    return(candidates[keep])
+
+
+def obtain_least_rotation_array(chain):
+
+    chain_length = chain.size
+    window_values = obtain_window_values(chain)
+    candidates = np.flatnonzero(window_values == window_values.min())
+    compared_length = window_positions
+    candidates = drop_close_candidates(candidates, compared_length, chain_length)
+    while candidates.size > 1 and compared_length < chain_length:
+        window_starts = candidates[:, None] + compared_length + window_positions*np.arange(compared_length//window_positions)
+        next_windows = window_values[window_starts % chain_length]
+        least = next_windows[np.lexsort(next_windows.T[::-1])[0]]
+        candidates = candidates[(next_windows == least).all(axis=1)]
+        compared_length = 2*compared_length
+        candidates = drop_close_candidates(candidates, compared_length, chain_length)
+
+    return(int(candidates[0]))
+
+
+# The canonical form of one chain (0s and 1s, in chain order): the least rotation of the chain or
+#   of its reflection, as bytes
+def obtain_canonical_chain(chain):
+
+    chain = np.ascontiguousarray(chain, dtype=np.uint8)
+    reflected = np.ascontiguousarray(chain[::-1])
+    if chain.size < least_rotation_vector_length:
+        chain = chain.tobytes()
+        reflected = reflected.tobytes()
+        start = obtain_least_rotation(chain)
+        reflected_start = obtain_least_rotation(reflected)
+        return(min(chain[start:] + chain[:start], reflected[reflected_start:] + reflected[:reflected_start]))
+
+    start = obtain_least_rotation_array(chain)
+    reflected_start = obtain_least_rotation_array(reflected)
+
+    return(min(np.roll(chain, -start).tobytes(), np.roll(reflected, -reflected_start).tobytes()))
+
+
+####################################################################################################
+#
+# The canonical key of a pattern (total_nodes activations in node order): (key, complemented), where
+#   key identifies the pattern up to the symmetries above and complemented tells whether A and B
+#   were exchanged to reach the canonical form
+#
+####################################################################################################
+
+def obtain_canonical_key(activ, array_size_list):
+
+    array_length, array_layers = validate_array_size_list(array_size_list)
+    total_nodes = array_length*array_layers
+    activ = np.asarray(activ, dtype=np.uint8).ravel()
+    if activ.size != total_nodes:
+        raise ValueError('activ must hold ' + str(total_nodes) + ' activations')
+
+# The chains in chain order: (num_chains, array_length, 2) -> one row of 2*array_length per chain
+    chains = activ.reshape(array_layers//2, 2, array_length).transpose(0, 2, 1).reshape(array_layers//2, -1)
+    num_on = int(activ.sum())
+
+    canonical_forms = list()
+    for complemented in (False, True):
+        if (complemented and 2*num_on < total_nodes) or (not complemented and 2*num_on > total_nodes):
+            continue
+        pattern_chains = 1 - chains if complemented else chains
+        canonical_chains = sorted(obtain_canonical_chain(chain) for chain in pattern_chains)
+        canonical_forms.append((b''.join(canonical_chains), complemented))
+    canonical_form, complemented = min(canonical_forms)
+
+    key = (array_length, array_layers, np.packbits(np.frombuffer(canonical_form, dtype=np.uint8)).tobytes())
+
+    return((key, complemented))
+
+
+####################################################################################################
+#
+# The cache
+#
+####################################################################################################
+
+class ConfigVarCache(object):
+    """__init__() functions as the class constructor"""
+
+    def __init__(self, max_entries=default_cache_entries):
+        if max_entries < 1:
+            raise ValueError('The cache needs room for at least one entry')
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return(len(self.entries))
+
+# The config var counts of the pattern of canonical_key (from obtain_canonical_key), or None
+    def lookup(self, canonical_key):
+        key, complemented = canonical_key
+        counts = self.entries.get(key)
+        if counts is None:
+            self.misses = self.misses + 1
+            return(None)
+        self.entries.move_to_end(key)
+        self.hits = self.hits + 1
+        counts = np.array(counts, dtype=np.int64)
+        if complemented:
+            counts = counts[complement_count_order]
+        return(counts)
+
+# Keep the config var counts of the pattern of canonical_key
+    def store(self, canonical_key, config_var_counts):
+        key, complemented = canonical_key
+        counts = np.asarray(config_var_counts, dtype=np.int64)
+        if complemented:
+            counts = counts[complement_count_order]
+        self.entries[key] = tuple(counts.tolist())
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions = self.evictions + 1
+        return()
+
+# The config var counts of a pattern, from the cache or (on a miss) counted and kept
+    def obtain_config_var_counts(self, activ, array_size_list):
+        canonical_key = obtain_canonical_key(activ, array_size_list)
+        config_var_counts = self.lookup(canonical_key)
+        if config_var_counts is None:
+            config_var_counts = obtain_config_var_counts_batch(np.asarray(activ).reshape(1, -1), array_size_list)[0]
+            self.store(canonical_key, config_var_counts)
+        return(config_var_counts)
+
+    def obtain_cache_stats(self):
+        lookups = self.hits + self.misses
+        cache_stats = {
+            'process_id': os.getpid(),
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits/float(lookups) if lookups > 0 else 0.0,
+        }
+        return(cache_stats)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        return()
+
+
+# The cache of the calling process, created (with room for max_entries canonical forms) on first use
+def obtain_process_config_var_cache(max_entries=default_cache_entries):
+
+    process_id = os.getpid()
+    if process_id not in process_config_var_caches:
+        process_config_var_caches.clear()
+        process_config_var_caches[process_id] = ConfigVarCache(max_entries)
+
+    return(process_config_var_caches[process_id])
+
+
+# The statistics of the process caches of a pool, from the cache statistics reported by its tasks
+#   (the last one reported by each process holds that process's totals)
+def combine_process_cache_stats(cache_stats_list):
+
+    process_cache_stats = dict()
+    for cache_stats in cache_stats_list:
+        process_cache_stats[cache_stats['process_id']] = cache_stats
+    hits = sum(cache_stats['hits'] for cache_stats in process_cache_stats.values())
+    misses = sum(cache_stats['misses'] for cache_stats in process_cache_stats.values())
+    combined_stats = {
+        'processes': len(process_cache_stats),
+        'entries': sum(cache_stats['entries'] for cache_stats in process_cache_stats.values()),
+        'hits': hits,
+        'misses': misses,
+        'evictions': sum(cache_stats['evictions'] for cache_stats in process_cache_stats.values()),
+        'hit_rate': hits/float(hits + misses) if hits + misses > 0 else 0.0,
+    }
+
+    return(combined_stats)
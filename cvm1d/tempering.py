@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+# Copyright 2023 Themesis, Inc.; made available under the MIT License (see LICENSE).
+#
+# Code created by: Alianna J. Maren; assigned to Themesis, Inc.
+#
+#===================================================================================================
+#
+# PARALLEL TEMPERING (REPLICA EXCHANGE): one node-swap Monte Carlo chain per rung of an
+#   (epsilon1, temperature) ladder, run in parallel worker processes, with configurations
+#   exchanged between neighboring rungs.
+#
+#===================================================================================================
+#
+# Rung r holds one pattern X_r, sampled with the weight exp(-total_nodes*F_r(X)/T_r), where
+#     F_r(X) = epsilon1_r*h(X) + neg_entropy(X),    h = z2/2 + z3 + z4 + z5/2
+#   is the free energy of compute_free_energy (with the neg-entropy of compute_neg_entropy).
+# The run is made of rounds. In each round every rung makes moves_per_round node-swap moves at its
+#   own epsilon1 and temperature (run_swap_monte_carlo of cvm1d/monte_carlo.py, one task per rung
+#   on a ProcessPoolExecutor); then neighboring rungs (r, r + 1) try to exchange their patterns, with
+#   the even pairs (0-1, 2-3, ...) tried in even rounds and the odd pairs (1-2, 3-4, ...) in odd
+#   rounds. An exchange is accepted with probability min(1, exp(log_ratio)), where
+#     log_ratio = total_nodes*((F_r(X_r) - F_r(X_s))/T_r + (F_s(X_s) - F_s(X_r))/T_s),   s = r + 1
+#   so each rung keeps sampling its own distribution. h(X) and neg_entropy(X) come from the
+#   config var counts returned by the workers, so a free energy at any epsilon1 costs nothing.
+#
+# Each worker process keeps one ConfigVarCache (obtain_process_config_var_cache of
+#   cvm1d/symmetry.py, with room for cache_entries patterns) across its tasks: a rung starts each
+#   round from the pattern it ended the last one on (or from its neighbor's, after an exchange),
+#   whose counts the cache already holds if the same process ran it.
+#
+# Every random number comes from the seed (one stream per rung per round, and one for the
+#   exchanges), so a run gives the same results whatever the number of workers.
+#
+####################################################################################################
+
+import concurrent.futures
+import os
+import time
+
+import numpy as np
+
+from cvm1d.entropy import compute_neg_entropy_counts_array
+from cvm1d.grid import validate_array_size_list, enthalpy_weights
+from cvm1d.monte_carlo import run_swap_monte_carlo
+from cvm1d.symmetry import obtain_process_config_var_cache, combine_process_cache_stats
+
+
+# Patterns kept by the config var cache of each worker process
+default_tempering_cache_entries = 256
+
+
+####################################################################################################
+#
+# One round of one rung (run in a worker process)
+#
+####################################################################################################
+
+def run_tempering_task(tempering_task):
+
+    config_var_cache = obtain_process_config_var_cache(tempering_task['cache_entries'])
+    mc_results = run_swap_monte_carlo(tempering_task['activ'], tempering_task['array_size_list'],
+                                      tempering_task['epsilon1'], tempering_task['temperature'],
+                                      tempering_task['num_moves'], tempering_task['seed'],
+                                      config_var_cache=config_var_cache)
+    tempering_result = {
+        'activ': mc_results['activ'],
+        'config_var_counts': mc_results['config_var_counts'],
+        'accepted_moves': mc_results['accepted_moves'],
+        'elapsed_time': mc_results['elapsed_time'],
+        'cache_stats': config_var_cache.obtain_cache_stats(),
+    }
+
+    return(tempering_result)
+
+
+####################################################################################################
+#
+# Run num_rounds rounds on the ladder. activ holds one starting pattern per rung
+#   (num_rungs x total_nodes); epsilon1 and temperature are one value or one value per rung
+#
+####################################################################################################
+
+def run_parallel_tempering(activ, array_size_list, epsilon1, temperature, num_rounds, moves_per_round,
+                           max_workers=None, seed=None, cache_entries=default_tempering_cache_entries):
+
+    array_size_list = validate_array_size_list(array_size_list)
+    total_nodes = array_size_list[0]*array_size_list[1]
+    activ = np.array(activ, dtype=np.int8).reshape(-1, total_nodes)
+    num_rungs = activ.shape[0]
+    epsilon1 = np.array(np.broadcast_to(np.asarray(epsilon1, dtype=float), (num_rungs,)))
+    temperature = np.array(np.broadcast_to(np.asarray(temperature, dtype=float), (num_rungs,)))
+    if np.any(temperature <= 0.0):
+        raise ValueError('Every rung needs a positive temperature')
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    seed_sequence = np.random.SeedSequence(seed)
+    exchange_rng = np.random.default_rng(seed_sequence.spawn(1)[0])
+
+    accepted_moves = np.zeros(num_rungs, dtype=np.int64)
+    compute_time = np.zeros(num_rungs)
+    exchange_attempts = np.zeros(num_rungs - 1, dtype=np.int64)
+    exchanges_accepted = np.zeros(num_rungs - 1, dtype=np.int64)
+    free_energy_sums = np.zeros(num_rungs)
+    config_var_counts = np.zeros((num_rungs, 12), dtype=np.int64)
+    cache_stats_list = list()
+
+    start_time = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for round_num in range(num_rounds):
+            rung_seeds = seed_sequence.spawn(num_rungs)
+            tempering_tasks = [{'activ': activ[rung], 'array_size_list': array_size_list,
+                                'epsilon1': float(epsilon1[rung]), 'temperature': float(temperature[rung]),
+                                'num_moves': moves_per_round, 'seed': rung_seeds[rung],
+                                'cache_entries': cache_entries}
+                               for rung in range(num_rungs)]
+            for rung, tempering_result in enumerate(executor.map(run_tempering_task, tempering_tasks)):
+                activ[rung] = tempering_result['activ']
+                config_var_counts[rung] = tempering_result['config_var_counts']
+                accepted_moves[rung] += tempering_result['accepted_moves']
+                compute_time[rung] += tempering_result['elapsed_time']
+                cache_stats_list.append(tempering_result['cache_stats'])
+
+        # h(X) and neg_entropy(X) of each rung's pattern; free_energies[r, p] = F_r(X_p)
+            enthalpy_sums = config_var_counts @ enthalpy_weights/float(total_nodes)
+            neg_entropy = compute_neg_entropy_counts_array(config_var_counts, total_nodes)
+            free_energies = np.multiply.outer(epsilon1, enthalpy_sums) + neg_entropy
+            free_energy_sums += np.diagonal(free_energies)
+
+            for lower in range(round_num % 2, num_rungs - 1, 2):
+                upper = lower + 1
+                log_ratio = total_nodes*((free_energies[lower, lower] - free_energies[lower, upper])/temperature[lower] +
+                                         (free_energies[upper, upper] - free_energies[upper, lower])/temperature[upper])
+                exchange_attempts[lower] += 1
+                if log_ratio >= 0.0 or np.log(exchange_rng.random()) < log_ratio:
+                    exchanges_accepted[lower] += 1
+                    activ[[lower, upper]] = activ[[upper, lower]]
+                    config_var_counts[[lower, upper]] = config_var_counts[[upper, lower]]
+    elapsed_time = time.perf_counter() - start_time
+
+    config_vars = config_var_counts/float(total_nodes)
+    neg_entropy = compute_neg_entropy_counts_array(config_var_counts, total_nodes)
+    enthalpy = epsilon1*(config_vars @ enthalpy_weights)
+    rung_moves = num_rounds*moves_per_round
+    with np.errstate(divide='ignore', invalid='ignore'):
+        exchange_rate = np.where(exchange_attempts > 0, exchanges_accepted/np.maximum(exchange_attempts, 1), 0.0)
+        rung_moves_per_second = np.where(compute_time > 0.0, rung_moves/compute_time, 0.0)
+
+    tempering_results = {
+        'epsilon1': epsilon1,
+        'temperature': temperature,
+        'rounds': num_rounds,
+        'moves_per_round': moves_per_round,
+        'workers': max_workers,
+        'accepted_moves': accepted_moves,
+        'acceptance_rate': accepted_moves/float(max(rung_moves, 1)),
+        'exchange_attempts': exchange_attempts,
+        'exchanges_accepted': exchanges_accepted,
+        'exchange_rate': exchange_rate,
+        'rung_moves_per_second': rung_moves_per_second,
+        'elapsed_time': elapsed_time,
+        'moves_per_second': num_rungs*rung_moves/elapsed_time if elapsed_time > 0.0 else 0.0,
+        'mean_free_energy': free_energy_sums/max(num_rounds, 1),
+        'cache_stats': combine_process_cache_stats(cache_stats_list),
+        'activ': activ,
+        'config_var_counts': config_var_counts,
+        'config_vars': config_vars,
+        'neg_entropy': neg_entropy,
+        'enthalpy': enthalpy,
+        'free_energy': enthalpy + neg_entropy,
+    }
+
+    return(tempering_results)
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+# Copyright 2023 Themesis, Inc.; made available under the MIT License (see LICENSE).
+#
+# Code created by: Alianna J. Maren; assigned to Themesis, Inc.
+#
+#===================================================================================================
+#
+# TRAJECTORIES: the activations of a grid recorded every record_every moves of a Monte Carlo run
+#   (or of a swap sequence), and the whole history written out as an animated GIF, an MP4 video,
+#   or a space-time PNG image (one row per snapshot).
+#
+#===================================================================================================
+#
+# A TrajectoryRecorder keeps each snapshot bit-packed (cvm1d/bitpack.py: one bit per node), either
+#   - in memory, in a ring buffer of capacity snapshots (when it is full, the oldest snapshot is
+#     dropped), or
+#   - on disk, in a directory of .npz chunks of snapshots_per_chunk snapshots each (every snapshot
+#     is kept, and only one chunk is held in memory at a time).
+# Each snapshot is stored with its move number. iter_snapshots gives them back oldest first.
+#
+# The frames of a GIF or MP4 are the turtle_grid picture (cvm1d/render.py), with the previous
+#   snapshot as the original grid and the current snapshot as the revised grid; the nodes that
+#   changed between the two are marked red, as the swapped nodes are in obtain_turtle_grid_list.
+# The space-time image has one row per snapshot and one column per node, the nodes of each zigzag
+#   chain in chain order (U[0], D[0], U[1], D[1], ...), one chain after the other:
+#     white = OFF, black = ON, red = changed and now ON, blue = changed and now OFF.
+# All three writers stream: one frame (or one block of rows) is built at a time, so memory stays
+#   bounded however long the run.
+#
+####################################################################################################
+
+import os
+import shutil
+import subprocess
+
+import numpy as np
+
+from cvm1d.bitpack import pack_activation_rows, unpack_activation_rows
+from cvm1d.render import palette_colours, obtain_box_tiles, render_turtle_grid_indexed
+from cvm1d.render import write_png_rows, write_gif_frames
+
+
+# Snapshots kept by an in-memory recorder unless a capacity is given
+default_trajectory_capacity = 10000
+
+# Palette indices (cvm1d/render.py) of the space-time image, indexed by 2*changed + activ
+space_time_indices = np.array([0, 2, 1, 3], dtype=np.uint8)
+
+# Snapshots per block of space-time rows
+space_time_rows_per_block = 1024
+
+
+####################################################################################################
+#
+# The recorder
+#
+####################################################################################################
+
+class TrajectoryRecorder(object):
+    """__init__() functions as the class constructor"""
+
+    def __init__(self, array_size_list, record_every=1, capacity=None, directory=None,
+                 snapshots_per_chunk=4096):
+        if record_every < 1:
+            raise ValueError('record_every must be at least 1')
+        self.array_length = array_size_list[0]
+        self.array_layers = array_size_list[1]
+        self.record_every = record_every
+        self.directory = directory
+        if directory is None:
+            self.capacity = default_trajectory_capacity if capacity is None else capacity
+        else:
+            os.makedirs(directory, exist_ok=True)
+            self.capacity = snapshots_per_chunk
+            self.chunk_files = list()
+        if self.capacity < 1:
+            raise ValueError('The recorder needs room for at least one snapshot')
+        num_words = pack_activation_rows(np.zeros((1, self.array_length), dtype=np.int8)).shape[-1]
+        self.snapshots = np.zeros((self.capacity, self.array_layers, num_words), dtype=np.uint64)
+        self.move_nums = np.zeros(self.capacity, dtype=np.int64)
+        self.num_buffered = 0
+        self.next_slot = 0
+        self.num_recorded = 0
+
+    def __len__(self):
+        if self.directory is None:
+            return(self.num_buffered)
+        return(self.num_recorded)
+
+# Record the activations (any array of array_layers*array_length activations) at move move_num
+    def record(self, activ, move_num):
+        self.snapshots[self.next_slot] = pack_activation_rows(
+            np.asarray(activ).reshape(self.array_layers, self.array_length))
+        self.move_nums[self.next_slot] = move_num
+        self.next_slot = (self.next_slot + 1) % self.capacity
+        self.num_buffered = min(self.num_buffered + 1, self.capacity)
+        self.num_recorded = self.num_recorded + 1
+        if self.directory is not None and self.num_buffered == self.capacity:
+            self.flush()
+        return()
+
+# Write the buffered snapshots out as one chunk (on-disk recorders only)
+    def flush(self):
+        if self.directory is None or self.num_buffered == 0:
+            return()
+        chunk_file = os.path.join(self.directory, 'trajectory_%06d.npz' % len(self.chunk_files))
+        np.savez(chunk_file, snapshots=self.snapshots[:self.num_buffered],
+                 move_nums=self.move_nums[:self.num_buffered], array_size=(self.array_length, self.array_layers))
+        self.chunk_files.append(chunk_file)
+        self.num_buffered = 0
+        self.next_slot = 0
+        return()
+
+    def close(self):
+        self.flush()
+        return()
+
+# Blocks of (move_nums, packed snapshots), oldest first
+    def iter_packed_blocks(self):
+        if self.directory is not None:
+            for chunk_file in self.chunk_files:
+                with np.load(chunk_file) as chunk:
+                    yield chunk['move_nums'], chunk['snapshots']
+            if self.num_buffered > 0:
+                yield self.move_nums[:self.num_buffered], self.snapshots[:self.num_buffered]
+        elif self.num_buffered < self.capacity:
+            yield self.move_nums[:self.num_buffered], self.snapshots[:self.num_buffered]
+        else:
+            order = (self.next_slot + np.arange(self.capacity)) % self.capacity
+            yield self.move_nums[order], self.snapshots[order]
+
+# (move_num, activ_rows) of each snapshot, oldest first; activ_rows is (array_layers, array_length)
+    def iter_snapshots(self):
+        for move_nums, snapshots in self.iter_packed_blocks():
+            activ_blocks = unpack_activation_rows(snapshots, self.array_length)
+            for move_num, activ_rows in zip(move_nums.tolist(), activ_blocks):
+                yield move_num, activ_rows
+
+
+####################################################################################################
+#
+# Turtle_grid_lists of the frames: the previous snapshot as the original grid, and the current
+#   snapshot as the revised grid, with the changed nodes coded 2 (now 0) or 3 (now 1); the first
+#   frame shows the first snapshot twice
+#
+####################################################################################################
+
+def iter_trajectory_grid_lists(recorder):
+
+    previous_activ = None
+    for move_num, activ_rows in recorder.iter_snapshots():
+        activ = activ_rows.ravel()
+        if previous_activ is None:
+            previous_activ = activ
+        changed = activ != previous_activ
+        yield move_num, np.concatenate((previous_activ, activ + 2*changed))
+        previous_activ = activ
+
+
+def iter_trajectory_frames(recorder, scale=0.5):
+
+    array_size_list = (recorder.array_length, recorder.array_layers)
+    tiles = obtain_box_tiles(scale)
+    for move_num, turtle_grid_list in iter_trajectory_grid_lists(recorder):
+        yield render_turtle_grid_indexed(turtle_grid_list, array_size_list, scale, tiles)
+
+
+####################################################################################################
+#
+# Animated GIF and MP4 writers
+#
+####################################################################################################
+
+def write_trajectory_gif(recorder, path, scale=0.5, frame_duration=0.1):
+
+    return(write_gif_frames(path, iter_trajectory_frames(recorder, scale), frame_duration))
+
+
+# The MP4 is encoded by ffmpeg (which must be on the PATH), from raw RGB frames sent down a pipe;
+#   the frames are padded to even dimensions, as the H.264 encoder needs
+def write_trajectory_mp4(recorder, path, scale=0.5, frame_rate=10.0):
+
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        raise RuntimeError('Writing MP4 needs ffmpeg on the PATH; write a .gif or .png instead')
+
+    num_frames = 0
+    encoder = None
+    for frame in iter_trajectory_frames(recorder, scale):
+        if encoder is None:
+            height = frame.shape[0] + frame.shape[0] % 2
+            width = frame.shape[1] + frame.shape[1] % 2
+            encoder = subprocess.Popen([ffmpeg, '-loglevel', 'error', '-y', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                                        '-s', '%dx%d' % (width, height), '-r', str(frame_rate), '-i', '-',
+                                        '-pix_fmt', 'yuv420p', '-vcodec', 'libx264', path],
+                                       stdin=subprocess.PIPE)
+            rgb_frame = np.empty((height, width, 3), dtype=np.uint8)
+            rgb_frame[...] = palette_colours[0]
+        rgb_frame[:frame.shape[0], :frame.shape[1]] = palette_colours[frame]
+        encoder.stdin.write(rgb_frame.tobytes())
+        num_frames = num_frames + 1
+    if encoder is not None:
+        encoder.stdin.close()
+        if encoder.wait() != 0:
+            raise RuntimeError('ffmpeg could not write ' + str(path))
+
+    return(num_frames)
+
+
+####################################################################################################
+#
+# Space-time image: one row of pixel_size pixels per snapshot, pixel_size pixels per node
+#
+####################################################################################################
+
+def write_space_time_png(recorder, path, pixel_size=1):
+
+    array_length = recorder.array_length
+    array_layers = recorder.array_layers
+    total_nodes = array_length*array_layers
+    width = total_nodes*pixel_size
+    height = len(recorder)*pixel_size
+
+# The node_num of each column: each pair of rows in chain order, one pair after the other
+    chain_positions = np.arange(2*array_length)
+    chain_nodes = (chain_positions % 2)*array_length + chain_positions//2
+    column_nodes = (2*array_length*np.arange(array_layers//2)[:, None] + chain_nodes).ravel()
+
+    def iter_row_blocks():
+        previous_activ = None
+        for move_nums, snapshots in recorder.iter_packed_blocks():
+            for first_row in range(0, len(move_nums), space_time_rows_per_block):
+                activ = unpack_activation_rows(snapshots[first_row:first_row + space_time_rows_per_block],
+                                               array_length).reshape(-1, total_nodes)[:, column_nodes]
+                if previous_activ is None:
+                    previous_activ = activ[:1]
+                changed = activ != np.concatenate((previous_activ, activ[:-1]))
+                previous_activ = activ[-1:]
+                indices = space_time_indices[2*changed + activ]
+                indices = np.repeat(np.repeat(indices, pixel_size, axis=0), pixel_size, axis=1)
+                yield palette_colours[indices]
+
+    write_png_rows(path, width, height, iter_row_blocks())
+
+    return(len(recorder))
+
+
+####################################################################################################
+#
+# Write a trajectory to a GIF, MP4 or (space-time) PNG file, chosen by the file extension
+#
+####################################################################################################
+
+def write_trajectory_file(recorder, path, scale=0.5, frame_duration=0.1, pixel_size=1):
+
+    recorder.flush()
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension == '.gif':
+        return(write_trajectory_gif(recorder, path, scale, frame_duration))
+    if extension == '.mp4':
+        return(write_trajectory_mp4(recorder, path, scale, 1.0/frame_duration))
+    if extension == '.png':
+        return(write_space_time_png(recorder, path, pixel_size))
+    raise ValueError('Trajectory files must be .gif, .mp4 or .png (space-time image)')
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+# Copyright 2023 Themesis, Inc.; made available under the MIT License (see LICENSE).
+#
+# Code created by: Alianna J. Maren; assigned to Themesis, Inc.
+#
+#===================================================================================================
+#
+# TRANSFER-MATRIX SOLVER: exact thermodynamics of the infinite 1-D zigzag chain.
+#
+#===================================================================================================
+#
+# Along a zigzag chain the nodes alternate between the upper and the lower row, so that
+#   one step along the chain is a nearest-neighbor (y) step, two steps is a next-nearest-neighbor
+#   (w) step, and three consecutive nodes make up a triplet (z).
+# The enthalpy used in the demo programs (compute_free_energy) is a sum over the triplets:
+#   enthalpy = epsilon1*(z2 + z3 + z4 + z5), with z2 and z5 divided by two for degeneracy;
+#   so each ordered triplet (a, b, c) along the chain carries the weight
+#   triplet_enthalpy_weights[4*a + 2*b + c] (0 for A-A-A and B-B-B, 1 for A-B-A and B-A-B,
+#   and 1/2 for the others).
+# The negative entropy of compute_neg_entropy, -2*sum(y ln y) + 2*sum(z ln z), is twice the exact
+#   (per-node) negative entropy of such a chain, so the free energy of the demo programs is
+#     free_energy = 2*[ (epsilon1/2)*sum(weights * triplet fractions) + (exact neg-entropy) ]
+#   and its minimum over all chains is -2*ln(lambda), where lambda is the largest eigenvalue of the
+#   4 x 4 transfer matrix between neighboring pairs of nodes:
+#     T[2a + b, 2b + c] = exp(-(epsilon1/2)*triplet_enthalpy_weights[4a + 2b + c] + field*(a + 2b + c)/4)
+# The field couples to x1 (each node sits in three triplets, as the first, middle and last node,
+#   so it receives the whole field once). It is zero for the unconstrained chain (x1 = 0.5, by A/B
+#   symmetry), and it is solved for (by safeguarded secant steps) when x1 is given, in which case
+#   the minimum free energy is 2*(field*x1 - ln(lambda)).
+#
+# The equilibrium triplet fractions follow from the left (l) and right (r) eigenvectors:
+#   p(a, b, c) = l[ab]*T[ab, bc]*r[bc] / (lambda * l.r)
+#   Since each triplet weight is the same read in either direction, T[ab, bc] = T[cb, ba],
+#   and the left eigenvector is the right eigenvector with each pair reversed: l[ab] = r[ba].
+# The y, w and z fractions are sums of these, in the order of the config_vars_list:
+#   [y1, y2, y3, w1, w2, w3, z1, z2, z3, z4, z5, z6]
+#   so that they can be compared directly with obtain_actual_config_vars_list and compute_neg_entropy.
+#
+# All functions take epsilon1 (and x1) as scalars or as NumPy arrays, which are broadcast together;
+#   all state points are solved at once, with batched 4 x 4 eigen-decompositions.
+#
+####################################################################################################
+
+import numpy as np
+
+from cvm1d.entropy import compute_neg_entropy_array
+
+
+# Enthalpy weight of each ordered triplet (a, b, c) along the chain, indexed by 4*a + 2*b + c
+triplet_enthalpy_weights = np.array([0.0, 0.5, 1.0, 0.5, 0.5, 1.0, 0.5, 0.0])
+
+# Position in the config_vars_list of the z value for each ordered triplet, indexed by 4*a + 2*b + c
+#   (A-A-A is z1, A-A-B and B-A-A are z2, A-B-A is z3, B-A-B is z4, A-B-B and B-B-A are z5, B-B-B is z6)
+triplet_z_positions = np.array([11, 10, 9, 7, 10, 8, 7, 6])
+
+# The range of fields searched when solving for a given x1, and the most iterations allowed
+field_limit = 50.0
+field_iterations = 100
+
+
+####################################################################################################
+#
+# Build the transfer matrices, one 4 x 4 matrix for each state point
+#
+####################################################################################################
+
+def build_transfer_matrices(epsilon1, field):
+
+    epsilon1, field = np.broadcast_arrays(np.asarray(epsilon1, dtype=float), np.asarray(field, dtype=float))
+    transfer_matrices = np.zeros(epsilon1.shape + (4, 4))
+    for triplet_index in range(8):
+        a, b, c = triplet_index >> 2, (triplet_index >> 1) & 1, triplet_index & 1
+        transfer_matrices[..., 2*a + b, 2*b + c] = np.exp(-0.5*epsilon1*triplet_enthalpy_weights[triplet_index]
+                                                          + 0.25*field*(a + 2*b + c))
+
+    return(transfer_matrices)
+
+
+####################################################################################################
+#
+# Largest eigenvalue of each transfer matrix, with its (positive) left and right eigenvectors
+#
+####################################################################################################
+
+def obtain_largest_eigenvectors(transfer_matrices):
+
+    eigenvalues, right_vectors = np.linalg.eig(transfer_matrices)
+    largest = np.argmax(eigenvalues.real, axis=-1)
+    eigenvalue = np.take_along_axis(eigenvalues.real, largest[..., None], axis=-1)[..., 0]
+    right_vector = np.abs(np.take_along_axis(right_vectors.real, largest[..., None, None], axis=-1)[..., 0])
+    left_vector = right_vector[..., [0, 2, 1, 3]]  # l[ab] = r[ba]
+
+    return(eigenvalue, left_vector, right_vector)
+
+
+####################################################################################################
+#
+# Equilibrium triplet fractions p(a, b, c), indexed by 4*a + 2*b + c
+#
+####################################################################################################
+
+def obtain_triplet_fractions(transfer_matrices):
+
+    eigenvalue, left_vector, right_vector = obtain_largest_eigenvectors(transfer_matrices)
+    normalization = eigenvalue*np.sum(left_vector*right_vector, axis=-1)
+
+    triplet_fractions = np.zeros(eigenvalue.shape + (8,))
+    for triplet_index in range(8):
+        a, b, c = triplet_index >> 2, (triplet_index >> 1) & 1, triplet_index & 1
+        triplet_fractions[..., triplet_index] = left_vector[..., 2*a + b] * \
+            transfer_matrices[..., 2*a + b, 2*b + c]*right_vector[..., 2*b + c]/normalization
+
+    return(triplet_fractions, eigenvalue)
+
+
+####################################################################################################
+#
+# Convert triplet fractions into the fractional config vars [y1, y2, y3, w1, w2, w3, z1, ..., z6]
+#
+####################################################################################################
+
+def obtain_config_vars_from_triplets(triplet_fractions):
+
+    config_vars = np.zeros(triplet_fractions.shape[:-1] + (12,))
+    for triplet_index in range(8):
+        a, b, c = triplet_index >> 2, (triplet_index >> 1) & 1, triplet_index & 1
+        fraction = triplet_fractions[..., triplet_index]
+        config_vars[..., 2 - b - c] += fraction  # nearest-neighbor pair (b, c): y1, y2 or y3
+        config_vars[..., 5 - a - c] += fraction  # next-nearest-neighbor pair (a, c): w1, w2 or w3
+        config_vars[..., triplet_z_positions[triplet_index]] += fraction
+
+    return(config_vars)
+
+
+####################################################################################################
+#
+# Enthalpy, in the same form as compute_free_energy (the negative entropy is in cvm1d.entropy)
+#
+####################################################################################################
+
+def compute_enthalpy_array(config_vars, epsilon1):
+
+    config_vars = np.asarray(config_vars)
+    sum_z_enthalpy_terms = 0.5*config_vars[..., 7] + config_vars[..., 8] + config_vars[..., 9] + \
+                           0.5*config_vars[..., 10]
+
+    return(epsilon1*sum_z_enthalpy_terms)
+
+
+####################################################################################################
+#
+# Solve for the field that gives the requested x1 (0 < x1 < 1). x1 increases with the field,
+#   so the root is kept inside a bracket [field_low, field_high]. The steps are secant steps on 
+#   the error in logit(x1) = ln(x1/(1 - x1)), which is close to linear in the field (its slope 
+#   is exactly 1 for independent nodes, epsilon1 = 0); a bisection step is taken whenever the 
+#   secant step would leave the bracket. 
+#
+####################################################################################################
+
+def solve_field_for_x1(epsilon1, x1, tolerance=1.0e-10):
+
+    epsilon1, x1 = np.broadcast_arrays(np.asarray(epsilon1, dtype=float), np.asarray(x1, dtype=float))
+    epsilon1 = epsilon1.ravel()
+    target_logit = np.log(x1/(1.0 - x1)).ravel()
+
+# Starting point: the field for independent nodes (epsilon1 = 0)
+    field = np.clip(target_logit, -field_limit, field_limit)
+    field_low = np.full(field.shape, -field_limit)
+    field_high = np.full(field.shape, field_limit)
+    slope = np.ones(field.shape)
+    last_field = np.full(field.shape, np.nan)
+    last_logit_error = np.zeros(field.shape)
+
+# Only the state points that have not yet converged are worked on
+    active = np.arange(field.size)
+    for iteration in range(field_iterations):
+        triplet_fractions, eigenvalue = obtain_triplet_fractions(build_transfer_matrices(epsilon1[active],
+                                                                                        field[active]))
+        x1_now = np.clip(triplet_fractions[..., 1::2].sum(axis=-1), 1.0e-300, 1.0 - 1.0e-16)
+        logit_error = np.log(x1_now/(1.0 - x1_now)) - target_logit[active]
+        field_low[active] = np.where(logit_error < 0.0, field[active], field_low[active])
+        field_high[active] = np.where(logit_error < 0.0, field_high[active], field[active])
+
+        converged = (np.abs(logit_error) < tolerance) | (field_high[active] - field_low[active] < tolerance)
+        active, logit_error = active[~converged], logit_error[~converged]
+        if active.size == 0:
+            break
+
+        field_step = field[active] - last_field[active]
+        secant_slope = (logit_error - last_logit_error[active])/np.where(field_step != 0.0, field_step, 1.0)
+        slope[active] = np.where((field_step != 0.0) & (secant_slope > 0.0), secant_slope, slope[active])
+        last_field[active] = field[active]
+        last_logit_error[active] = logit_error
+        new_field = field[active] - logit_error/slope[active]
+        inside = (new_field > field_low[active]) & (new_field < field_high[active])
+        field[active] = np.where(inside, new_field, 0.5*(field_low[active] + field_high[active]))
+
+    return(field.reshape(x1.shape))
+
+
+####################################################################################################
+#
+# SOLVER: equilibrium config vars, negative entropy, enthalpy and free energy of the infinite
+#   zigzag chain at each (epsilon1, x1) state point. With x1=None, x1 is free (and is then 0.5).
+#
+####################################################################################################
+
+def solve_transfer_matrix(epsilon1, x1=None):
+
+    if x1 is None:
+        epsilon1 = np.asarray(epsilon1, dtype=float)
+        field = np.zeros(epsilon1.shape)
+        pure = np.zeros(epsilon1.shape, dtype=bool)
+    else:
+        epsilon1, x1 = np.broadcast_arrays(np.asarray(epsilon1, dtype=float), np.asarray(x1, dtype=float))
+        if np.any((x1 < 0.0) | (x1 > 1.0)):
+            raise ValueError('x1 must be between 0 and 1')
+    # All-A and all-B chains (x1 = 1 or 0) need an infinite field; they are filled in directly below
+        pure = (x1 <= 0.0) | (x1 >= 1.0)
+        field = solve_field_for_x1(epsilon1, np.where(pure, 0.5, x1))
+
+    transfer_matrices = build_transfer_matrices(epsilon1, field)
+    triplet_fractions, eigenvalue = obtain_triplet_fractions(transfer_matrices)
+    if np.any(pure):
+        pure_index = np.where(x1 >= 1.0, 7, 0)
+        pure_fractions = (np.arange(8) == pure_index[..., None]).astype(float)
+        triplet_fractions = np.where(pure[..., None], pure_fractions, triplet_fractions)
+        field = np.where(pure, np.where(x1 >= 1.0, np.inf, -np.inf), field)
+
+    config_vars = obtain_config_vars_from_triplets(triplet_fractions)
+    neg_entropy = compute_neg_entropy_array(config_vars)
+    enthalpy = compute_enthalpy_array(config_vars, epsilon1)
+
+    tm_results = {
+        'epsilon1': epsilon1,
+        'x1': triplet_fractions[..., 1::2].sum(axis=-1),
+        'field': field,
+        'largest_eigenvalue': np.where(pure, np.nan, eigenvalue),
+        'config_vars': config_vars,
+        'neg_entropy': neg_entropy,
+        'enthalpy': enthalpy,
+        'free_energy': enthalpy + neg_entropy,
+    }
+
+    return(tm_results)
@@ -0,0 +1,2338 @@
+# -*- coding: utf-8 -*-
+
+####################################################################################################
+#
+#===================================================================================================
+#
+# INTELLECTUAL PROPERTY NOTICE AND LICENSE-TO-USE
+#
+#===================================================================================================
+#
+# Code Created at: Themesis Development Labs, Themesis, Inc.
+#
+# *** MIT License ***
+#
+# Copyright 2023 Themesis, Inc.
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software 
+# and associated documentation files (the “Software”), to deal in the Software without restriction, 
+# including without limitation the rights to use, copy, modify, merge, publish, distribute, 
+# sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is 
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING 
+# BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND 
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, 
+# DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, 
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#        
+##===================================================================================================
+#
+# CODE DEVELOPMENT, UPDATES, AUTHORSHIP
+#
+#===================================================================================================
+#
+# Code created by: Alianna J. Maren; assigned to Themesis, Inc.
+# Initial code creation date: 2023-07-23
+# Code based on earlier object-oriented experiments: July 27, 2018, by AJM
+#
+#
+#===================================================================================================
+#
+# HIGH-LEVEL CODE DESCRIPTION:
+#
+#===================================================================================================
+# 
+# Computing configuration variables for the
+#   and drawing the pattern using Python turtles
+# Tutorial using object-oriented Python to create and populate a
+#   list of nodes for the 1-D Cluster Variation Method (1D CVM),
+#   and then compute the configuration variables for the resulting 1D CVM grid.
+# The 1D CVM grid is printed out within the program, and is separately drawn using
+#   Python turtles.
+#
+#
+##===================================================================================================
+#
+# DETAILED CODE DESCRIPTION:
+#
+#===================================================================================================
+# 
+# This code works with a NodeGrid (cvm1d/node_grid.py), whose nodes make up a 1-D grid described
+#   initially by Kikuchi (1952) as a "single zigzag chain," initially populated with 0-value
+#   activations together with 0-values for the local config vars.
+#
+# Then, it creates a set of pre-defined values for certain nodes, and then
+#   computes the actual local config vars associated with each of these nodes
+#   (obtain_local_config_codes, in cvm1d/grid.py).
+# Then it prints the updated node activations and local config vars.
+#
+##===================================================================================================
+#
+# BUG REPORTS:
+    # 2023/11/26 - Documentation in previous code (v1pt4) referred to the wLeft, wRight values 
+    #              as "nearest-neighbor" when they should have been identified as "next-nearest-neighbor,"
+    #              wLeft, wRight documentation now fixed for this version. 
+    # 2023/11/26 - Duplicate functions removed - earlier (v1pt4) version had duplicate code for 
+    #              computing the wLeft, wRight values for node_list2; those were removed
+    # 2026/10/18 - The yRight wrap-around for the last node in an ODD row pointed to the first node 
+    #              of that same row (i*array_length), rather than to the first node of the row ABOVE
+    #              ((i-1)*array_length). Now fixed. yRight is not used in the config var counts, 
+    #              and the built-in pattern gives the same yRight codes either way. 
+    # 2026/10/18 - compute_neg_entropy called log() on every y and z fraction, and so raised a 
+    #              "math domain error" whenever one of them was zero (e.g., a uniform grid). 
+    #              A zero fraction now contributes zero. 
+    # 2026/10/18 - obtain_new_node_list2 only accepted rows 0 and 1 (whatever the number of layers), 
+    #              crashed (NameError: newTry) on an out-of-range row, and accepted (and offered) 
+    #              a column number equal to array_length. It now checks against the grid dimensions. 
+#
+#===================================================================================================
+# Address bug reports: themesisinc1@gmail.com
+#
+####################################################################################################
+
+# Import the following Python packages
+
+import random
+import itertools
+import argparse
+import concurrent.futures
+import os
+import sys
+import time
+import subprocess
+import json
+import numpy as np
+from math import exp
+from math import log
+# (not sure this is needed, since I'm importing random)
+from random import randrange, uniform
+
+# The drawing packages are NOT imported here: turtle (which loads tkinter) is imported inside
+#   turtle_grid and open_fast_turtle_grid, the only functions that draw. pylab, matplotlib and
+#   pyplot were imported here but never used; importing them cost about 0.5 s at every start,
+#   which is paid again by every worker process of the sweep and enumerate modes.
+# The compute-only start (importing this file without drawing) is checked against
+#   startup_time_budget by the startup mode:  python <this file> startup
+
+from cvm1d.swaps import obtain_swap_deltas_base, obtain_best_swaps
+from cvm1d.render import render_turtle_grid_file
+from cvm1d.trajectory import TrajectoryRecorder, write_trajectory_file
+
+from cvm1d.transfer_matrix import solve_transfer_matrix
+from cvm1d.replicas import obtain_random_replica_activations, run_replica_monte_carlo
+from cvm1d.free_energy import minimize_free_energy, minimize_free_energy_curve
+from cvm1d.free_energy import compute_enthalpy_sweep, compute_free_energy_sweep
+from cvm1d.grid import default_array_length, default_array_layers, validate_array_size_list
+from cvm1d.grid import obtain_random_activations
+from cvm1d.grid import evaluate_activations
+from cvm1d.patterns import obtain_builtin_activations
+from cvm1d.symmetry import obtain_canonical_key, obtain_process_config_var_cache, combine_process_cache_stats
+from cvm1d.annealing import obtain_cooling_schedule, anneal_activations
+from cvm1d.tempering import run_parallel_tempering
+from cvm1d.monte_carlo import run_swap_monte_carlo, obtain_swap_tables, obtain_swap_state, obtain_swap_state_activ
+from cvm1d.monte_carlo import obtain_neg_entropy_term_function, swap_config_var_counts
+from cvm1d.node_grid import obtain_node_grid, assign_local_config_vars_node_grid
+from cvm1d.node_grid import obtain_config_var_counts_node_grid
+from cvm1d.enumeration import enumerate_config_var_counts, obtain_neg_entropy_distribution
+from cvm1d.parallel import run_bounded_tasks, tasks_in_flight_per_worker
+
+
+####################################################################################################
+####################################################################################################
+#
+# Detailed code documentation is JUST ABOVE main(), at the very end of this program.
+#
+####################################################################################################
+####################################################################################################
+#
+# Code Update Log:
+#   07/26/2023: Created base code and GitHub public repository: Simple-1D-CVM-Demos
+#     - Added a new pattern - a single big round of x1 in the middle of an x2 sea.
+#   10/18/2026: Version 1pt6pt0
+#     - Added NodeGrid, an array-backed grid (contiguous NumPy int8 arrays for the activations
+#       and for each local config-var code) that replaces the list of Node objects in __main__.
+#       NodeGrid[x] returns a Node-like view, so the existing print functions are unchanged.
+#       The Node class, obtain_node_list and the per-node loop of assign_local_config_vars_node_list
+#       are gone: every local config var is now found by obtain_local_config_codes (cvm1d/grid.py).
+#     - Added assign_local_config_vars_node_grid, which computes the wLeft, wRight, yLeft, yRight
+#       and zLeft codes for the whole grid with periodic-shift (np.roll) array operations.
+#     - Added swap_config_var_counts (cvm1d/monte_carlo.py), which swaps two nodes and updates the
+#       y/w/z counts and the negative entropy from the (at most six) changed left triplets - those
+#       of each swapped node and of the two nodes after it along the chain - instead of
+#       recomputing the whole grid. The chain neighbors are found arithmetically in each swap, so
+#       nothing is kept per node but its activation and its left triplet (one byte each).
+#     - Added obtain_config_vars_batch (cvm1d/grid.py), which computes the fractional config vars
+#       for a whole batch of grids (an (n_grids, n_nodes) activation array) at once, using bincount.
+#     - Added run_swap_monte_carlo (cvm1d/monte_carlo.py), a non-interactive Metropolis Monte Carlo
+#       driver built on the node-swap move, with acceptance based on the free energy (enthalpy +
+#       negative entropy) computed from incremental deltas. It reports moves per second (50,000
+#       to 60,000 on one core, whatever the grid size). Run it with:
+#         python <this file> mc --eps1 -0.25 --temperature 1.0 --moves 1000000
+#     - Added enumerate_config_var_counts (cvm1d/enumeration.py), which enumerates EVERY activation
+#       pattern of a small grid (optionally only those with a fixed number of x1 nodes) and
+#       returns the histogram of the y/w/z count vectors; obtain_neg_entropy_distribution turns
+#       this into the exact distribution of the negative entropy values.
+#     - Added the cvm1d package, beginning with cvm1d/transfer_matrix.py: solve_transfer_matrix gives
+#       the exact equilibrium config vars, neg-entropy, enthalpy and free energy of the infinite
+#       zigzag chain (free, or at a fixed x1) from a 4 x 4 transfer matrix, for a whole array of
+#       eps1 values at once. Run it with:
+#         python <this file> tm --eps1-min -2.0 --eps1-max 2.0 --num-points 9 --x1 0.35
+#     - Added cvm1d/free_energy.py: minimize_free_energy finds the equilibrium config vars by
+#       Newton's method on the free energy itself (enthalpy + neg-entropy, in the form used by
+#       compute_neg_entropy), under the normalization, consistency and (optional) fixed-x1
+#       constraints, for a whole eps1 curve at once; minimize_free_energy_curve instead steps
+#       along the eps1 values, warm-starting each from the extrapolation of the two previous
+#       solutions (2-3 iterations per point). Both report the iterations.
+#       Run it with:
+#         python <this file> minimize --eps1-min -2.0 --eps1-max 2.0 --num-points 9 --warm-start
+#     - Added compute_free_energy_sweep, which takes any array of eps1 values and many config-var
+#       vectors and returns (n_configs x n_eps) enthalpy and free-energy arrays, without printing.
+#       compute_free_energy now uses it (with the original eps1 values by default) and prints
+#       the results with the new print_free_energy_sweep.
+#     - compute_neg_entropy no longer crashes (math domain error) when a y or z fraction is zero,
+#       e.g. for a uniform grid: a zero fraction now contributes zero (x*log(x) -> 0).
+#     - Added cvm1d/entropy.py, with batched NumPy neg-entropy kernels: compute_neg_entropy_array
+#       for fractional config vars, and compute_neg_entropy_counts_array for integer counts, which
+#       looks the terms up in a precomputed table of (n/N)*log(n/N) values. The incremental
+#       (node-swap) updates and the exact enumeration now use the same table.
+#     - The grid dimensions are no longer globals: obtain_array_size_list (and obtain_array_size_specs)
+#       take array_length and array_layers as parameters (default 12 and 2), check them once with
+#       validate_array_size_list, and array_size_list is passed on to every function that needs it
+#       (including print_initial_array_size_values and print_grid_node_values). The mc and 
+#       enumerate modes take --length and --layers, and the demo mode runs the interactive demo 
+#       on a grid of any size:
+#         python <this file> demo --length 20 --layers 4
+#     - Added cvm1d/bitpack.py, an optional bit-packed form of the activations (64 nodes per uint64
+#       word, one row of words per grid row; NodeGrid.packed_rows() gives it for a NodeGrid). 
+#       obtain_config_var_counts_packed finds the y/w/z counts of packed grids with shifts,
+#       AND/XOR masks and popcount, e.g. W1 = popcount(row & rotate(row)). For a 10^7-node chain
+#       this takes 1/8 of the memory of the int8 activations, and counts about 30x faster.
+#     - Added cvm1d/replicas.py: run_replica_monte_carlo holds R independent zigzag chains as one
+#       (R, 2, L) array, each with its own eps1 and temperature, and makes one node-swap proposal
+#       per replica per step, with the count updates and the Metropolis test done for all replicas
+#       at once (no per-replica Python loop). Run it with:
+#         python <this file> replicas --replicas 200 --eps1-min -2.0 --eps1-max 2.0 --steps 10000
+#     - Added run_parallel_sweep, which fans (epsilon1, x1, seed, array_length) state points out to
+#       a ProcessPoolExecutor (all cores by default). Each task builds its grid from its own seed,
+#       optionally runs node-swap Monte Carlo, and runs the config-var / free-energy pipeline; 
+#       the results are streamed back in the order they complete. Run it with:
+#         python <this file> sweep --num-eps1 21 --x1-min 0.1 --x1-max 0.5 --num-x1 5 --seeds 4 --moves 20000
+#     - Added a non-interactive swap mode: the (node1, node2) swaps are read from a file or stdin 
+#       instead of through input(), applied in sequence or each against the base grid, and the 
+#       per-swap config var count and neg-entropy deltas are written out. Run it with:
+#         python <this file> swaps --input swaps.txt --against base > deltas.txt
+#     - Added cvm1d/render.py, a headless renderer for the turtle_grid picture: the same before/after
+#       grids and colour codes (0-3 from obtain_turtle_grid_list), rasterized straight into a NumPy 
+#       RGB image and written as PNG (zlib only), or written as SVG. No display or Tk is needed,
+#       and about 10,000 PNG frames can be written per minute. Run it with:
+#         python <this file> demo --render swap.png
+#     - Added a fast turtle mode for live demos: open_fast_turtle_grid draws the turtle_grid picture
+#       with tracing off (tracer(0)), one stamped square per box and one screen update per frame;
+#       update_fast_turtle_grid then redraws only the boxes whose colour code changed (e.g. after
+#       a swap). fast_turtle_grid is a drop-in replacement for turtle_grid.
+#     - pylab, matplotlib and pyplot (never used) are no longer imported, and turtle is imported
+#       only inside the functions that draw, so that the compute-only start takes about 0.2 s
+#       instead of 0.7 s. The startup mode measures it in fresh interpreters, and fails if it is
+#       over startup_time_budget (or if a drawing package was loaded):
+#         python <this file> startup --runs 5
+#     - Added cvm1d/grid.py, so that the grid construction and config-var functions can be imported
+#       and called without the demo script (no globals, no printing, no input()): 
+#       validate_array_size_list, obtain_builtin_activations (the pattern of
+#       assign_activations_node_list, for any grid) and obtain_random_activations, the
+#       obtain_local_config_codes kernel, the batched config var counts, and evaluate_activations, 
+#       which gives the config vars, neg-entropy, enthalpy and free energy of one grid or of many.
+#       compute_enthalpy_sweep and compute_free_energy_sweep moved to cvm1d/free_energy.py. 
+#       This script now imports from the cvm1d package only the names that it calls; the
+#       package loads its submodules lazily, so importing one of them does not load the others.
+#     - Added cvm1d/annealing.py: anneal_activations searches for the pattern of lowest free energy
+#       at a given eps1 and fixed x1, starting from any pattern (by default the built-in one), with
+#       node-swap moves under a cooling schedule (obtain_cooling_schedule: geometric or linear, 
+#       or any list of temperatures). Each move updates the y/w/z counts incrementally from the
+#       (at most six) changed triplets, at 40,000 to 50,000 moves per second whatever the chain
+#       length; from a random start, a 10^5-node chain at x1 = 0.35 and eps1 = -1 gets within
+#       10^-7 of the exact (transfer matrix) free energy in 10^6 moves (20 to 25 s). Run it with:
+#         python <this file> anneal --eps1 -1.0 --length 50000 --x1 0.35 --stages 10 --moves-per-stage 100000
+#     - Added cvm1d/tempering.py: run_parallel_tempering runs one node-swap chain per rung of an
+#       (eps1, temperature) ladder, each round on a pool of worker processes, and then exchanges the
+#       patterns of neighboring rungs with the usual replica-exchange test on their free energies 
+#       (neg-entropy + enthalpy). It reports the exchange acceptance rate between each pair of rungs,
+#       the move acceptance rate and moves per second of each rung, and the mean free energy. 
+#       Run it with:
+#         python <this file> tempering --rungs 8 --eps1-min -2.0 --eps1-max 0.0 --length 500 --rounds 200
+#     - Added cvm1d/trajectory.py: a TrajectoryRecorder, passed to run_swap_monte_carlo or to
+#       apply_swaps_sequence, keeps the activations every record_every moves, bit-packed, in an
+#       in-memory ring buffer or in .npz chunks on disk. The history is then written out frame by
+#       frame (bounded memory) as an animated GIF or MP4 (the turtle_grid picture, previous vs
+#       current snapshot) or as a space-time PNG with one row per snapshot. Run it with:
+#         python <this file> mc --eps1 -0.25 --moves 1000000 --record-every 1000 --trajectory mc.png
+#     - Added obtain_swap_impact_matrix and obtain_best_swaps to cvm1d/swaps.py: the change in 
+#       neg-entropy and in free energy of EVERY (ON node, OFF node) swap, each against the same base
+#       grid. Far-apart pairs depend only on the activations around each of the two nodes (one of 32
+#       "windows" each), so they come from a 32 x 32 table; the few pairs within two steps along the
+#       chain are computed exactly. The best swaps are ranked without building the whole matrix
+#       (a 10^4-node grid: about 0.3 s for the matrix, a few ms for the ranking). Run it with:
+#         python <this file> best-swaps --eps1 -0.5 --length 5000 --x1 0.35 --top 10
+#     - Added cvm1d/patterns.py: batches of activation patterns for a grid of any size - random with
+#       exactly round(x1*total_nodes) ON nodes, periodic blocks, a single cluster (the island of x1
+#       in an x2 sea of 07/26/2023), alternating, and user-supplied templates along the chain. 
+#       Each batch is one (num_patterns, total_nodes) array, built from cyclic shifts of one base
+#       sequence with NumPy window gathers (10^5 patterns of 10^3 nodes: about 25 ms; random ones,
+#       which need a random key per node, about 0.6 s). assign_activations_node_list now takes its
+#       pattern from builtin_pattern_template (same pattern as before), and 
+#       obtain_builtin_activations moved from cvm1d/grid.py to cvm1d/patterns.py. 
+#     - Added cvm1d/symmetry.py: obtain_canonical_key gives the canonical form of a pattern under
+#       the symmetries of the zigzag chain (moves along the chain, which include the row exchange;
+#       reflection; reordering of the chains; and A/B exchange, which relabels the counts), with
+#       Booth's least-rotation algorithm. ConfigVarCache keeps the config var counts of up to
+#       max_entries canonical forms (least recently used dropped first) and reports its hits,
+#       misses, hit rate and evictions. The sweep mode keeps one in each worker process, shared
+#       by all the groups of tasks that process runs, so that a grid at many eps1 values (or a
+#       symmetric copy of it) is only evaluated once:
+#         python <this file> sweep --num-eps1 21 --seeds 4 --lengths 1000 --cache-entries 4096
+#     - Added cvm1d/monte_carlo.py, the one node-swap core: obtain_swap_changes (the incremental
+#       update of the counts for one swap, from the changed left triplets) and run_metropolis_moves
+#       (the Metropolis loop over a list of temperatures). run_swap_monte_carlo moved there, and
+#       it, anneal_activations and each rung of run_parallel_tempering now run the same loop;
+#       swap_config_var_counts (used by the sequence swaps) replaces swap_config_var_counts_node_grid.
+#     - NodeGrid (with NodeView, assign_local_config_vars_node_grid and the config var counts of a
+#       NodeGrid) moved to cvm1d/node_grid.py, and the exact enumeration to cvm1d/enumeration.py.
+#       This script keeps no mutable module state: the neg-entropy term table goes with the swap
+#       tables of cvm1d/monte_carlo.py, and the config var cache of each worker process is kept by
+#       cvm1d/symmetry.py (obtain_process_config_var_cache).
+#     - z_code_table, enthalpy_weights and triplet_count_vectors are defined once, in cvm1d/grid.py;
+#       the replicas and the base swaps share one swap-delta function, obtain_swap_count_deltas
+#       (cvm1d/swaps.py).
+#     - enumerate_config_var_counts submits its chunks with the bounded submission of the sweep
+#       (run_bounded_tasks, cvm1d/parallel.py), and with --x1-count makes only the patterns with
+#       that many ON nodes (by rank, in colexicographic order) instead of filtering all 2**N patterns.
+#     - obtain_canonical_key canonicalizes grids of any size: chains of 256 positions or more find
+#       their least rotation with NumPy (obtain_least_rotation_array, about 5 ms for a chain of
+#       2*10**5 nodes against 170 ms for Booth's algorithm in pure Python), so shifted, reflected
+#       and A/B-exchanged copies of large grids hit the cache too. The sweep keeps one bounded cache per
+#       worker process, shared by its groups of tasks (and used by the Monte Carlo tasks as well,
+#       for the counts of their starting grid); run_swap_monte_carlo, anneal_activations and each
+#       rung of run_parallel_tempering look up (and keep) the counts of their patterns in a
+#       ConfigVarCache, and the tempering mode reports the hits of its workers' caches.
+#
+####################################################################################################
+####################################################################################################
+
+
+####################################################################################################
+####################################################################################################
+#
+# Printing procedures
+#
+####################################################################################################
+####################################################################################################
+
+#===================================================================================================
+#
+# WELCOME PRINT: Procedure to welcome the user and identify the code
+#
+#===================================================================================================
+
+def welcome():
+
+    print()
+    print()
+    print()
+    print()
+    print()
+    print()
+    print('******************************************************************************')
+    print()
+    print('Welcome to the 1-D Cluster Variation Method (1D CVM)')
+    print('Version 1.1, 07/26/2023, A.J. Maren for Themesis, Inc.')
+    print('  and updated 07/27/2023, by A.J. Maren for Themesis, Inc.')
+    print()
+    print('INTELLECTUAL PROPERTY DECLARATION:') 
+    print('  This code has been developed under Internal Research and Development (IR&D) funding')
+    print('    at the Development Labs of Themesis, Inc.')
+    print('  Themesis, Inc. makes this code publicly available under the MIT License.')
+    print()
+    print('This version works with a pre-defined 1D array to identify the')
+    print('  configuration variables,and also finds various thermodynamic values.')
+    print('It uses a Python turtle to draw the 1D CVM grid.')
+    print()
+    print()
+    print('For comments, questions, or bug-fixes, contact: themesisinc1@gmail.com')
+    print()
+    print('NOTE: In these calculations, x1 = A (units are at value 1),')
+    print('                         and x2 = B (units are at value 0).')
+    print()
+    print('******************************************************************************')
+    print()
+    return()
+
+
+#===================================================================================================
+#
+# DEBUG PRINT: Procedure to print out debug status of the code. 
+#   Debug status can be changed within __main__
+#
+#===================================================================================================
+
+def print_debug_status(debug_print_off):
+
+    if not debug_print_off:
+        print()
+        print('Debug printing is on')  # debug_print_off false
+    else:
+        print('Debug printing is off')  # debug_print_off true
+    print()
+    print('******************************************************************************')
+    print()
+    return()
+
+
+#===================================================================================================
+#
+# FIRST NODE SELECTION INFO PRINT: 
+#   Procedure to tell user that the coming task is to select a first node.
+#
+#===================================================================================================
+
+def print_first_node_selection_directions():
+
+    print()
+    print("You can select two nodes to swap; these should be one ON node and one OFF node")
+    print()
+    print("  First node:")
+    print()
+    return()
+
+
+#===================================================================================================
+#
+# FIRST NODE SELECTION INFO PRINT: 
+#   Procedure to tell user that the coming task is to select a first node.
+#
+#===================================================================================================
+
+def print_second_node_selection_directions():
+    print()
+    print("You can now select the SECOND of two nodes to swap;")
+    print("  this node should have a different activation (on/off status) from your first node.")
+    print()
+    print("  Second node:")
+    print()        
+    return()    
+
+#===================================================================================================
+#
+#  GRID DIMENSIONS PRINT: Procedure to print out DIMENSIONS of the CVM grid. 
+#
+#===================================================================================================
+
+def print_initial_array_size_values(array_size_list):
+    print()
+    print("This is the grid layout for a (currently 1-D) CVM grid")
+    print("  This grid has dimensions of ", array_size_list[1],
+          "rows and ", array_size_list[0], " columns.")
+    print()
+    print("NOTE: If there are just two rows, then by default")
+    print("  we are creating a single zig-zag chain for the 1-D CVM.")
+    print()
+    print("This print does not show the wrap-arounds.")
+    print()
+    return()
+
+
+#===================================================================================================
+#
+#  PRINT GRID NODE VALUES: Procedure to print out the node activations and config var values for the grid 
+#
+#===================================================================================================
+
+def print_grid_node_values(node_list, array_size_list):
+    array_length = array_size_list[0]
+    array_layers = array_size_list[1]
+    print()
+    print("----------------------------------------------------------------------")
+    print("  *** Node values after assigning certain nodes an activation of 1 ***")
+    print("----------------------------------------------------------------------")
+    x = 0
+    for i in range(array_layers):
+        print()
+        print("Row ", i)
+        print(" Col:   Activation:    wLeft      wRight     yLeft      yRight   zLeft      zRight    nodeNum")
+        for j in range(array_length):
+            thisCol = node_list[x].col
+            thisActiv   = node_list[x].activ
+            thisWLeft   = node_list[x].wLeft
+            thisWRight  = node_list[x].wRight           
+            thisYLeft   = node_list[x].yLeft
+            thisYRight  = node_list[x].yRight
+            thisZLeft   = node_list[x].zLeft
+            thisZRight  = node_list[x].zRight            
+            thisNum     = node_list[x].node_num
+            print("  ", thisCol, "       ", thisActiv, "         ",
+                  thisWLeft, "         ", thisWRight, "       ", 
+                  thisYLeft, "         ", thisYRight, "       ", 
+                  thisZLeft, "         ", thisZRight, "       ", thisNum)
+            x = x+1
+    
+    print()
+    print()
+    print("This is a visual depiction of the grid layout")
+    print("(showing wrap-around of first column to far right)")
+    print()
+    x = 0
+    for i in range(array_layers):
+        if i % 2 == 0:
+            evenNum = True  # Even
+        else:
+            evenNum = False  # Odd
+        print("Row ", i, ":  ", end="")
+        if evenNum == False:
+            print("  ", end="")
+        for j in range(array_length):
+            if node_list[x].activ == 0:
+                print("-  ", end="")
+            else:
+                print("X  ", end="")
+    # Print the wrap-around
+            x = x+1
+        if node_list[x-array_length].activ == 0:
+            print('o  ', end='')
+        else:
+            print('x  ', end='')
+        print('  ')
+    return()
+
+
+#===================================================================================================
+#
+#  PRINT FRACTIONAL CONVIGURATION VARIABLE VALUES: Procedure to print out the fractional config var values 
+#
+#===================================================================================================
+
+def print_frac_config_values(config_vars_list, call_num):
+
+    y1 = config_vars_list[0]
+    y2 = config_vars_list[1]
+    y3 = config_vars_list[2]   
+    w1 = config_vars_list[3]
+    w2 = config_vars_list[4]
+    w3 = config_vars_list[5] 
+    z1 = config_vars_list[6]
+    z2 = config_vars_list[7]
+    z3 = config_vars_list[8]   
+    z4 = config_vars_list[9]
+    z5 = config_vars_list[10]
+    z6 = config_vars_list[11] 
+    sum_y = y1 + y2 + y3
+    sum_w = w1 + w2 + w3
+    sum_z = z1 + z2 + z3 + z4 + z5 + z6
+    
+    print()
+    print()
+    print("----------------------------------------------------------------------")
+    if call_num == 1:
+        print("  *** Fractional Configuration Variable Values for the Original Grid ***")
+    if call_num == 2:
+        print("  *** Fractional Configuration Variable Values for the Revised Grid ***")
+    print("----------------------------------------------------------------------")
+    print()
+    print("     y1       2*y2         y3         w1       2*w2         w3       Sum y      Sum w")
+    print("  ", "%.3f" % y1, "    ", "%.3f" % y2, "    ", "%.3f" % y3,
+          "    ", "%.3f" % w1, "    ", "%.3f" % w2, "    ", "%.3f" % w3, "    ", "%.3f" % sum_y, "    ", "%.3f" % sum_w)
+    print()
+    print("     z1       2*z2         z3         z4       2*z5         z6       Sum z")
+    print("  ", "%.3f" % z1, "    ", "%.3f" % z2, "    ", "%.3f" % z3,
+          "    ", "%.3f" % z4, "    ", "%.3f" % z5, "    ", "%.3f" % z6, "    ", "%.3f" % sum_z)
+    print()
+    return()
+
+
+#===================================================================================================
+#
+#  PRINT FREE ENERGY SWEEP: Procedure to print out the enthalpy and free energy of one grid
+#    at each eps1 value (the values are found by compute_free_energy_sweep)
+#
+#===================================================================================================
+
+def print_free_energy_sweep(epsilon1_array, enthalpy, free_energy):
+
+    for i in range(len(epsilon1_array)):
+        print('  When eps1 = ', "%.3f" % epsilon1_array[i], ' the enthalpy is ', "%.3f" % enthalpy[i],
+              ' the free_energy is ', "%.3f" % free_energy[i])
+
+    return()
+
+
+#===================================================================================================
+#
+#  PRINT MONTE CARLO RESULTS: Procedure to print out the results of a Monte Carlo run 
+#
+#===================================================================================================
+
+def print_monte_carlo_results(mc_results, array_size_list):
+
+    print()
+    print("----------------------------------------------------------------------")
+    print("  *** Monte Carlo (node-swap) results ***")
+    print("----------------------------------------------------------------------")
+    print("  Grid: ", array_size_list[1], "rows and ", array_size_list[0], " columns")
+    print("  eps1 = ", "%.3f" % mc_results['epsilon1'], "  temperature = ", "%.3f" % mc_results['temperature'])
+    print("  Moves: ", mc_results['moves'], "  accepted: ", mc_results['accepted_moves'],
+          "  acceptance rate: ", "%.3f" % mc_results['acceptance_rate'])
+    print("  Moves per second: ", "%.0f" % mc_results['moves_per_second'],
+          "  (elapsed time ", "%.3f" % mc_results['elapsed_time'], " s)")
+    print_frac_config_values(mc_results['config_vars'].tolist(), 2)
+    print('  Neg-Entropy for the final system is: ', "%.3f" % mc_results['neg_entropy'])
+    print('  Enthalpy for the final system is: ', "%.3f" % mc_results['enthalpy'])
+    print('  Free energy for the final system is: ', "%.3f" % mc_results['free_energy'])
+    print()
+    return()
+
+
+#===================================================================================================
+#
+#  PRINT ANNEALING RESULTS: Procedure to print out the best pattern found by simulated annealing
+#
+#===================================================================================================
+
+def print_annealing_results(annealing_results, array_size_list):
+
+    temperatures = annealing_results['temperatures']
+    print()
+    print("----------------------------------------------------------------------")
+    print("  *** Simulated annealing (node-swap) results ***")
+    print("----------------------------------------------------------------------")
+    print("  Grid: ", array_size_list[1], "rows and ", array_size_list[0], " columns")
+    print("  eps1 = ", "%.3f" % annealing_results['epsilon1'], "  x1 = ", "%.3f" % annealing_results['x1'])
+    print("  Temperatures: ", "%.4g" % temperatures[0], " to ", "%.4g" % temperatures[-1], " in ",
+          len(temperatures), " stages of ", annealing_results['moves_per_temperature'], " moves")
+    print("  Moves: ", annealing_results['moves'], "  accepted: ", annealing_results['accepted_moves'],
+          "  acceptance rate: ", "%.3f" % annealing_results['acceptance_rate'])
+    print("  Moves per second: ", "%.0f" % annealing_results['moves_per_second'],
+          "  (elapsed time ", "%.3f" % annealing_results['elapsed_time'], " s)")
+    print("  Free energy: initial ", "%.6f" % annealing_results['initial_free_energy'], "  final ",
+          "%.6f" % annealing_results['final_free_energy'], "  best ", "%.6f" % annealing_results['free_energy'],
+          " (at move ", annealing_results['best_move_num'], ")")
+    print_frac_config_values(annealing_results['config_vars'].tolist(), 2)
+    print('  Neg-Entropy for the best system is: ', "%.6f" % annealing_results['neg_entropy'])
+    print('  Enthalpy for the best system is: ', "%.6f" % annealing_results['enthalpy'])
+    print('  Free energy for the best system is: ', "%.6f" % annealing_results['free_energy'])
+    print()
+    return()
+
+
+#===================================================================================================
+#
+#  PRINT PARALLEL TEMPERING RESULTS: Procedure to print out the results of a parallel tempering
+#    run, one line per rung; the exchange rate on each line is for the exchanges with the next rung
+#
+#===================================================================================================
+
+def print_parallel_tempering_results(tempering_results, array_size_list):
+
+    num_rungs = len(tempering_results['epsilon1'])
+    print()
+    print("----------------------------------------------------------------------")
+    print("  *** Parallel tempering (replica exchange) results ***")
+    print("----------------------------------------------------------------------")
+    print("  Rungs: ", num_rungs, "  each with ", array_size_list[1], "rows and ", array_size_list[0],
+          " columns;  workers: ", tempering_results['workers'])
+    print("  Rounds: ", tempering_results['rounds'], "  of ", tempering_results['moves_per_round'],
+          " moves per rung")
+    print("  Moves per second (all rungs): ", "%.0f" % tempering_results['moves_per_second'],
+          "  (elapsed time ", "%.3f" % tempering_results['elapsed_time'], " s)")
+    print()
+    print("  Rung     eps1    temperature   acceptance   exchange   moves/s    Mean F     Free Energy")
+    for rung in range(num_rungs):
+        if rung < num_rungs - 1:
+            exchange_rate = "%.3f" % tempering_results['exchange_rate'][rung]
+        else:
+            exchange_rate = "  -  "
+        print("  ", "%3d" % rung, "  ", "%7.3f" % tempering_results['epsilon1'][rung],
+              "   ", "%7.3f" % tempering_results['temperature'][rung],
+              "     ", "%.3f" % tempering_results['acceptance_rate'][rung],
+              "    ", exchange_rate,
+              "  ", "%8.0f" % tempering_results['rung_moves_per_second'][rung],
+              "  ", "%8.4f" % tempering_results['mean_free_energy'][rung],
+              "  ", "%8.4f" % tempering_results['free_energy'][rung])
+    print()
+    print_config_var_cache_stats(tempering_results['cache_stats'])
+    print()
+    return()
+
+
+#===================================================================================================
+#
+#  PRINT BEST SWAPS: Procedure to print out the swaps that lower the free energy the most,
+#    each against the same base grid
+#
+#===================================================================================================
+
+def print_best_swaps(best_swaps, grid_results, array_size_list):
+
+    print()
+    print("----------------------------------------------------------------------")
+    print("  *** Best single swaps (each against the base grid) ***")
+    print("----------------------------------------------------------------------")
+    print("  Grid: ", array_size_list[1], "rows and ", array_size_list[0], " columns;  x1 = ",
+          "%.4f" % grid_results['x1'], ";  eps1 = ", grid_results['epsilon1'])
+    print("  Base grid: neg-entropy ", "%.6f" % grid_results['neg_entropy'],
+          "  free energy ", "%.6f" % grid_results['free_energy'])
+    print("  Swaps ranked: ", best_swaps['num_pairs'])
+    print()
+    print("  Rank   node1   node2    delta negS      delta F")
+    for rank in range(len(best_swaps['node1_nums'])):
+        print("  ", "%4d" % (rank + 1), "%7d" % best_swaps['node1_nums'][rank],
+              "%7d" % best_swaps['node2_nums'][rank],
+              "  ", "%11.3e" % best_swaps['delta_neg_entropy'][rank],
+              "  ", "%11.3e" % best_swaps['delta_free_energy'][rank])
+    print()
+    return()
+
+
+#===================================================================================================
+#
+#  PRINT REPLICA MONTE CARLO RESULTS: Procedure to print out the results of a replica Monte Carlo
+#    run, one line per replica
+#
+#===================================================================================================
+
+def print_replica_monte_carlo_results(replica_results, array_size_list):
+
+    print()
+    print("----------------------------------------------------------------------")
+    print("  *** Replica Monte Carlo (node-swap) results ***")
+    print("----------------------------------------------------------------------")
+    print("  Replicas: ", len(replica_results['epsilon1']), "  each with ", array_size_list[1], "rows and ",
+          array_size_list[0], " columns;  steps: ", replica_results['steps'])
+    print("  Moves per second (all replicas): ", "%.0f" % replica_results['moves_per_second'],
+          "  (elapsed time ", "%.3f" % replica_results['elapsed_time'], " s)")
+    print()
+    print("  Replica     eps1    temperature   acceptance   Neg-Entropy   Enthalpy   Free Energy")
+    for replica in range(len(replica_results['epsilon1'])):
+        print("  ", "%5d" % replica, "  ", "%7.3f" % replica_results['epsilon1'][replica],
+              "   ", "%7.3f" % replica_results['temperature'][replica],
+              "     ", "%.3f" % replica_results['acceptance_rate'][replica],
+              "    ", "%8.3f" % replica_results['neg_entropy'][replica],
+              "  ", "%8.3f" % replica_results['enthalpy'][replica],
+              "  ", "%8.3f" % replica_results['free_energy'][replica])
+    print()
+    return()
+
+
+#===================================================================================================
+#
+#  PRINT SWEEP RESULTS: Procedures to print out the results of a parallel sweep, one line per
+#    state point, as each result arrives
+#
+#===================================================================================================
+
+def print_sweep_result_header(num_tasks):
+
+    print()
+    print("----------------------------------------------------------------------")
+    print("  *** Parallel sweep: ", num_tasks, " state points (in order of completion) ***")
+    print("----------------------------------------------------------------------")
+    print("   Task     eps1       x1     seed    length   Neg-Entropy   Enthalpy   Free Energy")
+    return()
+
+
+def print_sweep_result(sweep_result):
+
+    print("  ", "%5d" % sweep_result['task_num'], "%7.3f" % sweep_result['epsilon1'], "  ",
+          "%.3f" % sweep_result['x1'], "  ", "%5d" % sweep_result['seed'], "  ", "%6d" % sweep_result['array_length'],
+          "   ", "%8.3f" % sweep_result['neg_entropy'], "  ", "%8.3f" % sweep_result['enthalpy'],
+          "  ", "%8.3f" % sweep_result['free_energy'])
+    return()
+
+
+# The config var cache statistics, summed over the worker processes (combine_process_cache_stats)
+def print_config_var_cache_stats(cache_stats):
+
+    print("   Config var cache (", cache_stats['processes'], " processes):  hits ", cache_stats['hits'],
+          "  misses ", cache_stats['misses'], "  hit rate ", "%.3f" % cache_stats['hit_rate'],
+          "  evictions ", cache_stats['evictions'], "  entries ", cache_stats['entries'])
+    return()
+
+
+#===================================================================================================
+#
+#  PRINT TRANSFER-MATRIX RESULTS: Procedure to print out the exact (infinite chain) thermodynamic
+#    values found by the transfer-matrix solver, one line per eps1 value
+#
+#===================================================================================================
+
+def print_transfer_matrix_results(tm_results):
+
+    print()
+    print("----------------------------------------------------------------------")
+    print("  *** Transfer-matrix (infinite chain) results ***")
+    print("----------------------------------------------------------------------")
+    print("     eps1        x1      field   Neg-Entropy   Enthalpy   Free Energy")
+    for point in range(len(tm_results['epsilon1'])):
+        print("  ", "%7.3f" % tm_results['epsilon1'][point], "  ", "%.3f" % tm_results['x1'][point],
+              "  ", "%7.3f" % tm_results['field'][point], "  ", "%8.3f" % tm_results['neg_entropy'][point],
+              "  ", "%8.3f" % tm_results['enthalpy'][point], "  ", "%8.3f" % tm_results['free_energy'][point])
+    print()
+    return()
+
+
+#===================================================================================================
+#
+#  PRINT FREE-ENERGY MINIMIZATION RESULTS: Procedure to print out the equilibrium values found by
+#    minimizing the free energy, one line per eps1 value, with the Newton iterations used
+#
+#===================================================================================================
+
+def print_free_energy_minimization_results(fe_results):
+
+    print()
+    print("----------------------------------------------------------------------")
+    print("  *** Free-energy minimization results ***")
+    print("----------------------------------------------------------------------")
+    print("     eps1        x1     Neg-Entropy   Enthalpy   Free Energy   Iterations")
+    for point in range(len(fe_results['epsilon1'])):
+        print("  ", "%7.3f" % fe_results['epsilon1'][point], "  ", "%.3f" % fe_results['x1'][point],
+              "  ", "%8.3f" % fe_results['neg_entropy'][point], "  ", "%8.3f" % fe_results['enthalpy'][point],
+              "  ", "%8.3f" % fe_results['free_energy'][point], "    ", "%4d" % fe_results['iterations'][point])
+    if not np.all(fe_results['converged']):
+        print("  Warning: ", np.sum(~fe_results['converged']), " state points did not converge")
+    print()
+    return()
+
+
+#===================================================================================================
+#
+#  PRINT STARTUP RESULTS: Procedure to print out the measured compute-only startup time,
+#    against the startup time budget
+#
+#===================================================================================================
+
+def print_startup_results(startup_results):
+
+    print()
+    print("----------------------------------------------------------------------")
+    print("  *** Startup time (fresh interpreter + import, nothing drawn) ***")
+    print("----------------------------------------------------------------------")
+    print("  Runs: ", startup_results['runs'])
+    print("  Median startup time: ", "%.3f" % startup_results['median_startup_time'], " s   (budget ",
+          "%.3f" % startup_results['budget'], " s)")
+    print("  Fastest / slowest:   ", "%.3f" % min(startup_results['startup_times']), " s / ",
+          "%.3f" % max(startup_results['startup_times']), " s")
+    if len(startup_results['drawing_packages']) > 0:
+        print("  Drawing packages loaded: ", ", ".join(startup_results['drawing_packages']))
+    if startup_results['within_budget']:
+        print("  Within budget.")
+    else:
+        print("  Warning: OVER BUDGET")
+    print()
+    return()
+
+
+#===================================================================================================
+#
+#  PRINT NEG-ENTROPY DISTRIBUTION: Procedure to print out the exact distribution of the  
+#    negative entropy values found by enumerating all activation patterns
+#
+#===================================================================================================
+
+def print_neg_entropy_distribution(neg_entropy_values, value_multiplicities, num_count_vectors, elapsed_time):
+
+    print()
+    print("----------------------------------------------------------------------")
+    print("  *** Exact distribution of the Neg-Entropy over all patterns ***")
+    print("----------------------------------------------------------------------")
+    print("  Patterns: ", value_multiplicities.sum(), "  distinct y/w/z count vectors: ", num_count_vectors,
+          "  (elapsed time ", "%.3f" % elapsed_time, " s)")
+    print()
+    print("   Neg-Entropy      Patterns")
+    for neg_entropy, multiplicity in zip(neg_entropy_values, value_multiplicities):
+        print("    ", "%.6f" % neg_entropy, "    ", multiplicity)
+    print()
+    return()
+    
+
+
+ ####################################################################################################
+ ####################################################################################################
+ #
+ # Function to obtain the specifications for a turtleGridList
+ #
+ # Note: The code is ONLY set up to work with a grid consisting of an EVEN number of rows
+ #
+ ####################################################################################################
+ ####################################################################################################
+
+def obtain_turtle_grid_list(turtle_grid_list, array_size_list, node_list, node_list2, node1_num, node2_num):
+
+   
+#    print('In obtain_turtle_grid_list: The turtle_grid_list is', turtle_grid_list[0], turtle_grid_list[1]) 
+
+    array_length = array_size_list[0]
+    array_layers = array_size_list[1]  
+    array_size = array_length*array_layers
+ 
+# Create the initial node_list populated with position counts 
+#   and zero-value fields for activation and config var counts
+
+# Put the activations of the first node list (node_list) into the turtle_grid_list
+    x=0
+    for i in range(array_layers):
+        for j in range(array_length):
+            turtle_grid_list.append(node_list[x].activ)
+            x = x+1
+
+# Put the activations of the second node list (node_list2) into the turtle_grid_list
+    x=0
+    for i in range(array_layers):
+        for j in range(array_length):
+            turtle_grid_list.append(node_list2[x].activ)
+            x = x+1            
+
+# Change the activations in the turtle_grid_list nodes corresponding to the nodes 
+#   whose activations were changed
+    if node_list[node1_num].activ == 0:
+        turtle_grid_list[array_size + node1_num] = 3          
+    else:    
+        turtle_grid_list[array_size + node1_num] = 2           
+    if node_list[node2_num].activ == 0:
+        turtle_grid_list[array_size + node2_num] = 3      
+    else:    
+        turtle_grid_list[array_size + node2_num] = 2  
+        
+    return (turtle_grid_list)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Procedure to print turtle boxes depicting the 1D CVM grid
+#
+####################################################################################################
+####################################################################################################
+
+def turtle_grid(turtle_grid_list, array_length, array_size):
+
+    import turtle
+    
+    window = turtle.Screen()
+    turtle.speed(5)
+    turtle.pensize(5)
+
+    # draw the outline of a series of squares corresponding to the 1D CVM grid
+    turtle.penup()
+
+
+# draw the two rows of grids for the first grid (node_list)
+    turtle.goto(-100, 100)
+    initHorizStart = -350
+    vertstart = 250
+    for j in range(array_length):
+        horizstart = j*50 + initHorizStart
+        turtle.goto(horizstart, 50)
+        turtle.pendown()
+        if turtle_grid_list[j] == 0:
+            turtle.color("blue", "white")
+        if turtle_grid_list[j] == 1:
+            turtle.color("black", "black")
+        turtle.begin_fill()
+        for i in range(4):
+            turtle.forward(40)
+            turtle.left(90)
+        turtle.end_fill()
+        turtle.penup()
+
+    turtle.goto(-100, 100)
+    initHorizStart = -325
+    vertstart = 250
+    for j in range(array_length):
+        horizstart = j*50 + initHorizStart
+        turtle.goto(horizstart, 0)
+        turtle.pendown()
+        if turtle_grid_list[j + array_length] == 0:
+            turtle.color("blue", "white")
+        if turtle_grid_list[j + array_length] == 1:
+            turtle.color("black", "black")
+        turtle.begin_fill()
+        for i in range(4):
+            turtle.forward(40)
+            turtle.left(90)
+        turtle.end_fill()
+        turtle.penup()
+
+# draw the two rows of grids for the second grid (node_list2)  
+
+# starting position for the activations in node_list2
+
+    turtle.goto(-100, 100)
+    initHorizStart = -350
+    vertstart = 250
+    for j in range(array_length):
+        horizstart = j*50 + initHorizStart
+        turtle.goto(horizstart, 250)
+        turtle.pendown()
+        if turtle_grid_list[array_size + j] == 0:
+            turtle.color("blue", "white")
+        if turtle_grid_list[array_size + j] == 1:
+            turtle.color("black", "black")
+        if turtle_grid_list[array_size + j] == 2:
+            turtle.color("red", "white")  
+        if turtle_grid_list[array_size + j] == 3:
+            turtle.color("red", "red")            
+        turtle.begin_fill()
+        for i in range(4):
+            turtle.forward(40)
+            turtle.left(90)
+        turtle.end_fill()
+        turtle.penup()
+         
+    turtle.goto(-100, 100)
+    initHorizStart = -325
+    vertstart = 250
+    for j in range(array_length):
+        horizstart = j*50 + initHorizStart
+        turtle.goto(horizstart, 200)
+        turtle.pendown()
+        if turtle_grid_list[array_size + j + array_length] == 0:
+            turtle.color("blue", "white")
+        if turtle_grid_list[array_size + j + array_length] == 1:
+            turtle.color("black", "black")
+        if turtle_grid_list[array_size + j + array_length] == 2:
+            turtle.color("red", "white")  
+        if turtle_grid_list[array_size + j + array_length] == 3:
+            turtle.color("red", "red")    
+        turtle.begin_fill()
+        for i in range(4):
+            turtle.forward(40)
+            turtle.left(90)
+        turtle.end_fill()
+        turtle.penup()         
+
+    turtle.exitonclick()
+
+    return()
+
+
+####################################################################################################
+####################################################################################################
+#
+# FAST TURTLE MODE: the same picture as turtle_grid, for live (interactive) use with large grids.
+#
+# Tracing is turned off (tracer(0)), each box is ONE stamp of a square shape (outline and fill
+#   colours as in turtle_grid) instead of four pen strokes, and the screen is updated once per 
+#   frame. The stamp of every box is remembered, so that after a swap only the boxes whose colour
+#   code changed are cleared and stamped again (update_fast_turtle_grid).
+# The layout is that of turtle_grid (the revised grid above the original, 40-unit boxes at a
+#   50-unit pitch, odd rows shifted by 25 units), for any number of layers; the world coordinates
+#   are set so that the whole picture fits the window, and the square shape is sized to match.
+#
+####################################################################################################
+####################################################################################################
+
+fast_turtle_colours = {0: ("blue", "white"), 1: ("black", "black"), 2: ("red", "white"), 3: ("red", "red")}
+
+
+# Center (in turtle units) of box x of the turtle_grid_list 
+def obtain_fast_turtle_box_center(x, array_size_list):
+
+    array_length = array_size_list[0]
+    array_layers = array_size_list[1]
+    array_size = array_length*array_layers
+    grid_num, node_num = divmod(x, array_size)
+    row, col = divmod(node_num, array_length)
+# The original grid (grid_num 0) has its row 0 at y = 50; the revised grid is above it
+    box_y = 50 - 50*row + grid_num*(50*array_layers + 100)
+    box_x = -350 + 50*col + 25*(row % 2)
+
+    return(box_x + 20, box_y + 20)
+
+
+def open_fast_turtle_grid(turtle_grid_list, array_size_list, window_size=(1200, 600)):
+
+    import turtle
+
+    array_length = array_size_list[0]
+    array_layers = array_size_list[1]
+
+    window = turtle.Screen()
+    window.setup(window_size[0], window_size[1])
+    window.tracer(0)
+
+# World coordinates: the whole picture, with a 25-unit margin
+    left, right = -350 - 25, -350 + 50*array_length + 25 + 25
+    bottom = 50 - 50*(array_layers - 1) - 25
+    top = 50 + (50*array_layers + 100) + 40 + 25
+    units_per_pixel = max((right - left)/float(window_size[0]), (top - bottom)/float(window_size[1]))
+    center_x, center_y = 0.5*(left + right), 0.5*(bottom + top)
+    window.setworldcoordinates(center_x - 0.5*window_size[0]*units_per_pixel,
+                               center_y - 0.5*window_size[1]*units_per_pixel,
+                               center_x + 0.5*window_size[0]*units_per_pixel,
+                               center_y + 0.5*window_size[1]*units_per_pixel)
+
+# One square stamp per box: the built-in square is 20 pixels on a side
+    stamper = turtle.Turtle(visible=False)
+    stamper.penup()
+    stamper.shape("square")
+    box_pixels = 40/units_per_pixel
+    stamper.shapesize(box_pixels/20.0, box_pixels/20.0, max(1, int(round(5/units_per_pixel))))
+
+    turtle_view = {
+        'window': window,
+        'stamper': stamper,
+        'array_size_list': array_size_list,
+        'codes': [None]*len(turtle_grid_list),
+        'stamp_ids': [None]*len(turtle_grid_list),
+    }
+    update_fast_turtle_grid(turtle_view, turtle_grid_list)
+
+    return(turtle_view)
+
+
+# Redraw only the boxes whose colour code changed, then update the screen once
+def update_fast_turtle_grid(turtle_view, turtle_grid_list):
+
+    stamper = turtle_view['stamper']
+    codes = turtle_view['codes']
+    stamp_ids = turtle_view['stamp_ids']
+    num_redrawn = 0
+    for x, code in enumerate(turtle_grid_list):
+        if code == codes[x]:
+            continue
+        if stamp_ids[x] is not None:
+            stamper.clearstamp(stamp_ids[x])
+        stamper.color(*fast_turtle_colours[code])
+        stamper.goto(obtain_fast_turtle_box_center(x, turtle_view['array_size_list']))
+        stamp_ids[x] = stamper.stamp()
+        codes[x] = code
+        num_redrawn = num_redrawn + 1
+    turtle_view['window'].update()
+
+    return(num_redrawn)
+
+
+# The fast equivalent of turtle_grid: draw the picture in one frame, and wait for a click
+def fast_turtle_grid(turtle_grid_list, array_size_list):
+
+    turtle_view = open_fast_turtle_grid(turtle_grid_list, array_size_list)
+    turtle_view['window'].exitonclick()
+
+    return()
+
+
+####################################################################################################
+####################################################################################################
+#
+# GRID DIMENSIONS VERSION 1: Function to obtain the array size specifications. 
+#   Grid dimensions default to the 1D CVM grid; other dimensions are passed in as parameters.
+#
+#   NOTE: The code is ONLY set up to work with a grid consisting of an EVEN number of rows.
+#   NOTE: THIS is the function currently in use in the 1D CVM code version. 
+#
+####################################################################################################
+####################################################################################################
+
+def obtain_array_size_list(array_length=default_array_length, array_layers=default_array_layers):    
+
+# The grid dimensions default to a 1D CVM grid of 12 columns and 2 rows (one zigzag chain of 24 nodes),
+#   but any length and any EVEN number of layers can be given.
+# The dimensions are encased in a list (a tuple) and passed back to the __main__ program, and from 
+#   there to every function that needs them; they are checked once, here (validate_array_size_list,
+#   in cvm1d/grid.py: array_length must be at least 3, and array_layers a positive EVEN number). 
+    array_size_list = validate_array_size_list((array_length, array_layers))
+    return (array_size_list)     
+
+
+
+
+####################################################################################################
+####################################################################################################
+#
+# GRID DIMENSIONS VERSION 2: Function to obtain the array size specifications.
+#   This is a more general function, which can be used when defining the 2D CVM grid. 
+#   Grid dimensions can be user-defined when this function is used. 
+#   In the current 1D CVM code version, the grid dimensions default to 12 columns and 2 rows,
+#   and other dimensions are passed in as parameters (not read from the user).
+#
+#   NOTE: The code is ONLY set up to work with a grid consisting of an EVEN number of rows.
+#
+####################################################################################################
+####################################################################################################
+
+def obtain_array_size_specs(array_length=default_array_length, array_layers=default_array_layers):
+
+    #    x = input('Enter array_length: ')
+    #    array_length = int(x)
+    #    print 'array_length is', array_length
+
+    #    x = input('Enter layers: ')
+    #    layers = int(x)
+    #    print 'layers is', layers
+
+    #   NOTE: The system is designed to work with an even number of rows, e.g. layers must be an even number
+
+# TEST to ensure that the number of array_layers is even (validate_array_size_list raises a 
+#   ValueError if it is not). 
+    array_size_list = validate_array_size_list((array_length, array_layers))
+
+# The following function is not defined for this version of the code. 
+#    print_grid_size_specs () # Used when debugging
+
+    return(array_size_list)
+    
+
+
+####################################################################################################
+####################################################################################################
+#
+# Function to obtain a list of the configuration variables; 
+#   variable values initially assigned as 0. 
+#
+####################################################################################################
+####################################################################################################
+
+def obtain_config_vars_list():
+    y1 = float(0.00)
+    y2 = float(0.00)
+    y3 = float(0.00)
+    w1 = float(0.00)
+    w2 = float(0.00)
+    w3 = float(0.00) 
+    z1 = float(0.00)
+    z2 = float(0.00)
+    z3 = float(0.00)
+    z4 = float(0.00)
+    z5 = float(0.00)
+    z6 = float(0.00)       
+    config_vars_list = [y1, y2, y3, w1, w2, w3, z1, z2, z3, z4, z5, z6]
+    
+    return(config_vars_list)    
+      
+####################################################################################################
+####################################################################################################
+#
+# Function to obtain SPECIFIC activation values for the nodes in the grid,
+# Returns the list of node objects (including their local config vars to) __main__
+#
+####################################################################################################
+####################################################################################################
+ 
+def assign_activations_node_list(node_list, array_size_list):        
+
+    # This assigns activations of '1' to certain nodes: in Row 0, nodes 0 .. 2, 4 .. 6 and 8 .. 10;
+    #   in Row 1, nodes 0, 4 and 8 (builtin_pattern_template, in cvm1d/patterns.py)
+    activ = obtain_builtin_activations(array_size_list)
+    for x in np.flatnonzero(activ).tolist():
+        node_list[x].activ = 1
+    return(node_list)
+
+
+
+####################################################################################################
+####################################################################################################
+#
+# Function to obtain RANDOM activation values for the nodes in the grid, 
+#   with exactly round(x1*total_nodes) nodes at an activation of "1" (x1 = A) 
+# Returns the NodeGrid (with its activations assigned) to __main__
+#
+####################################################################################################
+####################################################################################################
+
+def assign_random_activations_node_grid(node_grid, array_size_list, x1, seed=None):
+
+    node_grid.activ[:] = obtain_random_activations(array_size_list, x1, seed)
+
+    return(node_grid)
+
+
+####################################################################################################
+####################################################################################################
+#
+# USER INTERACTION: 
+# Procedure to obtain user's first selection of a node to switch (in node_list2),
+#   we will obtain the node activation here, and update the node config-vars in a 
+#   different procedure.the selected node, as well as its activation, to __main__.
+#
+####################################################################################################
+####################################################################################################
+ 
+# --------------------------------------------------------------------
+# User Interaction 1
+# --------------------------------------------------------------------    
+
+def obtain_new_node_list2 (array_length, array_layers):
+
+    total_rows = array_layers
+    total_columns = array_length
+
+    # User picks a new row
+    print("Select a row number between 0 and ", total_rows-1, "inclusive" )
+    user_row = int(input("Please enter a row number: "))
+    success = True
+    if user_row>total_rows-1:
+        success = False
+    if user_row<0:
+        success = False   
+    if success == True:
+        print("Successful row pick")
+        print()
+    if success == False:
+        new_try = 0
+        while new_try < 3:
+            new_try = new_try + 1
+            user_row = int(input("Please select a row number that is within range: "))
+            if user_row < total_rows:
+                if user_row > -1:
+                    success = True
+                    print("Successful row pick on new try: ", new_try, "with row number: ", user_row)
+                    print()
+                    break
+                print("New try number: ", new_try)
+    if success == False: 
+        print("Oops! Looks like you're out of tries to select a row.")  
+    
+    # User picks a new column
+    print("Select a column number between 0 and ", total_columns-1, "inclusive" )    
+    user_col = int(input("Please enter a column number: "))
+    success = True
+    if user_col>total_columns-1:
+        success = False
+    if user_col<0:
+        success = False   
+    if success == True:
+        print("Successful column pick")
+        print()    
+    if success == False:
+        new_try = 0
+        while new_try < 3:
+            new_try = new_try + 1
+            user_col = int(input("Please select a column number that is within range: "))
+            if user_col < total_columns:
+                if user_col > -1:
+                    success = True
+                    print("Successful column pick on new try: ", new_try, "with column number: ", user_col)
+                    print()
+                    break
+                print("New try number: ", new_try)
+    if success == False: 
+        print("Oops! Looks like you're out of tries to select a column.")  
+       
+    print()
+    print("Your node selection is at row ", user_row, " and column ", user_col)
+    node1_num = user_row*total_columns + user_col
+    print()
+    
+    return(node1_num)
+
+
+# --------------------------------------------------------------------
+# Test the user-selected nodes to be sure they are different
+# --------------------------------------------------------------------  
+
+def node_difference_test(node1_num, node2_num, nodes_different, node_list):
+
+    node1_activ = node_list[node1_num].activ 
+    node2_activ = node_list[node2_num].activ  
+    print ('Node 1 activation is', node1_activ, 'and node 2 activation is', node2_activ)
+    if node1_activ != node2_activ :
+        nodes_different = True
+        print ('The two nodes have different activations.')
+    else:
+        print ('The two nodes do NOT have different activations; program closing.')    
+    return (nodes_different)
+
+
+
+# --------------------------------------------------------------------
+# Identify and update the new (swapped) node activations 
+# --------------------------------------------------------------------    
+
+def interchange_activations_node_list2(node1_num, node2_num, node_list, node_list2):
+      
+    node1_old_activ = node_list[node1_num].activ
+    node2_old_activ = node_list[node2_num].activ
+# Swap the activations
+    node_list2[node1_num].activ = node2_old_activ
+    node_list2[node2_num].activ = node1_old_activ
+
+    print ('For the initial grid, node 1 activation is', node1_old_activ, 'and node 2 activation is', node2_old_activ)
+    print ('For the new grid,     node 1 activation is', node_list2[node1_num].activ, 'and node 2 activation is', node_list2[node2_num].activ) 
+    return(node_list2)
+
+
+
+# --------------------------------------------------------------------
+# Compute the actual fractional configuration variables 
+# --------------------------------------------------------------------    
+
+def obtain_actual_config_vars_list(config_vars_list, node_list, array_length, array_layers):
+      
+    Y1 = config_vars_list[0]
+    Y2 = config_vars_list[1]
+    Y3 = config_vars_list[2]
+    W1 = config_vars_list[3]
+    W2 = config_vars_list[4]
+    W3 = config_vars_list[5]    
+    Z1 = config_vars_list[6]
+    Z2 = config_vars_list[7]
+    Z3 = config_vars_list[8]
+    Z4 = config_vars_list[9]
+    Z5 = config_vars_list[10]
+    Z6 = config_vars_list[11]       
+ 
+    x = 0
+    for i in range(array_layers):
+        for j in range(array_length):
+            if node_list[x].yLeft == 1: Y1 = Y1 + 1
+            if node_list[x].yLeft == 2: Y2 = Y2 + 1
+            if node_list[x].yLeft == 3: Y3 = Y3 + 1            
+            if node_list[x].wLeft == 1: W1 = W1 + 1
+            if node_list[x].wLeft == 2: W2 = W2 + 1
+            if node_list[x].wLeft == 3: W3 = W3 + 1  
+            if node_list[x].zLeft == 1: Z1 = Z1 + 1
+            if node_list[x].zLeft == 2: Z2 = Z2 + 1
+            if node_list[x].zLeft == 3: Z3 = Z3 + 1            
+            if node_list[x].zLeft == 4: Z4 = Z4 + 1
+            if node_list[x].zLeft == 5: Z5 = Z5 + 1
+            if node_list[x].zLeft == 6: Z6 = Z6 + 1  
+            x = x + 1
+ 
+ # Obtain the total number of nodes in the grid
+#    array_length = array_size_list[0]
+#    array_layers = array_size_list[1]
+    total_nodes = array_length * array_layers
+    
+ # Obtain the fractional values for the configuration variables   
+
+    y1 = Y1/total_nodes
+    y2 = Y2/total_nodes
+    y3 = Y3/total_nodes
+    w1 = W1/total_nodes
+    w2 = W2/total_nodes
+    w3 = W3/total_nodes
+    z1 = Z1/total_nodes
+    z2 = Z2/total_nodes
+    z3 = Z3/total_nodes
+    z4 = Z4/total_nodes
+    z5 = Z5/total_nodes
+    z6 = Z6/total_nodes
+    
+ 
+    config_vars_list[0] = y1
+    config_vars_list[1] = y2
+    config_vars_list[2] = y3
+    config_vars_list[3] = w1
+    config_vars_list[4] = w2
+    config_vars_list[5] = w3   
+    config_vars_list[6] = z1
+    config_vars_list[7] = z2
+    config_vars_list[8] = z3
+    config_vars_list[9] = z4
+    config_vars_list[10] = z5
+    config_vars_list[11] = z6   
+    
+    return(config_vars_list)
+
+
+# --------------------------------------------------------------------
+# Compute the system entropy 
+# --------------------------------------------------------------------    
+
+def x_log_x(x):
+
+    if x <= 0.0:
+        return(0.0)
+
+    return(x*log(x))
+
+
+def compute_neg_entropy(config_vars_list):
+
+    neg_entropy = 0
+
+    y1 = config_vars_list[0]
+    y2 = config_vars_list[1]*0.5 # Divide by two to account for degeneracy in counting originally
+    y3 = config_vars_list[2]
+    w1 = config_vars_list[3]
+    w2 = config_vars_list[4]*0.5 # Divide by two to account for degeneracy in counting originally
+    w3 = config_vars_list[5]    
+    z1 = config_vars_list[6]
+    z2 = config_vars_list[7]*0.5 # Divide by two to account for degeneracy in counting originally
+    z3 = config_vars_list[8]
+    z4 = config_vars_list[9]
+    z5 = config_vars_list[10]*0.5 # Divide by two to account for degeneracy in counting originally
+    z6 = config_vars_list[11]       
+ 
+# A config var of zero contributes zero (x*log(x) -> 0 as x -> 0); see x_log_x
+    neg_entropy_y = x_log_x(y1) + 2.0*x_log_x(y2) + x_log_x(y3) 
+    neg_entropy_z = x_log_x(z1) + 2.0*x_log_x(z2) + x_log_x(z3) + \
+                x_log_x(z4) + 2.0*x_log_x(z5) + x_log_x(z6)   
+                
+    neg_entropy = -2.0*neg_entropy_y + 2.0*neg_entropy_z
+
+    return(neg_entropy)
+
+# --------------------------------------------------------------------
+# Compute the system free energy 
+#   By default this is the original sweep, eps1 = 0.00, -0.01, ..., -0.49;
+#   the values come from compute_free_energy_sweep and are printed by print_free_energy_sweep. 
+# --------------------------------------------------------------------    
+
+def compute_free_energy(config_vars_list, neg_entropy, epsilon1_array=None):
+
+    enthalpy_range = 50
+    enthalpy_incr = 0.01
+
+    if epsilon1_array is None:
+        epsilon1_array = -(np.arange(enthalpy_range)*enthalpy_incr)
+    enthalpy, free_energy = compute_free_energy_sweep([config_vars_list], epsilon1_array, [neg_entropy])
+    print_free_energy_sweep(epsilon1_array, enthalpy[0], free_energy[0])
+
+    return()
+
+
+####################################################################################################
+####################################################################################################
+#
+# CONFIG VAR COUNTS: the fractional config vars and the enthalpy found from the config var counts
+#   (of a NodeGrid, from obtain_config_var_counts_node_grid in cvm1d/node_grid.py).
+#
+# The config var counts are kept as a list of 12 integer counts, in the same order as the 
+#   config_vars_list: [Y1, Y2, Y3, W1, W2, W3, Z1, Z2, Z3, Z4, Z5, Z6]
+#   Dividing the counts by the total number of nodes gives the fractional config vars. 
+#
+# After a node swap the counts are updated incrementally, without recomputing the whole grid, by
+#   the node-swap core of cvm1d/monte_carlo.py (swap_config_var_counts, and the Metropolis loop 
+#   of run_swap_monte_carlo and anneal_activations): a swap changes the counted codes of at most
+#   six nodes, those one and two steps to the right along the chain of each swapped node. 
+#
+####################################################################################################
+####################################################################################################
+
+# --------------------------------------------------------------------
+# Convert config var counts into the fractional config vars list
+# --------------------------------------------------------------------    
+
+def obtain_config_vars_list_from_counts(config_var_counts, total_nodes):
+
+    config_vars_list = [float(count)/total_nodes for count in config_var_counts]
+
+    return(config_vars_list)
+
+
+
+
+
+
+####################################################################################################
+####################################################################################################
+#
+# PARALLEL SWEEP: run many state points (epsilon1, x1, seed, array_length) on a pool of worker
+#   processes, for eps1 / x1 phase diagrams.
+#
+# Each task builds a random grid (two rows, array_length columns) with exactly round(x1*total_nodes)
+#   ON nodes, optionally runs num_moves node-swap Monte Carlo moves at the given temperature, and
+#   then runs the config-var and free-energy pipeline: the local config vars of the grid, the
+#   fractional config vars, the neg-entropy and the free energy at epsilon1.
+# The random numbers of a task come only from its own seed, so a task gives the same result
+#   whichever worker runs it and in whatever order; tasks that differ only in epsilon1 start from
+#   the same grid. The grid and the Monte Carlo moves draw from two independent child seeds of
+#   the task seed (np.random.SeedSequence(seed).spawn(2)), not from two copies of the same stream.
+# The tasks are run in groups: the consecutive tasks on the same grid (array_length, x1, seed), 
+#   which differ only in epsilon1, go to one worker together. run_parallel_sweep yields the results
+#   in the order in which the groups are completed (each result carries its task_num); at most 
+#   tasks_in_flight_per_worker groups per worker are submitted at a time, so that very long task
+#   lists do not have to be held in the pool all at once (run_bounded_tasks, cvm1d/parallel.py). 
+# The tasks look up the config var counts of their grid in the ConfigVarCache (cvm1d/symmetry.py)
+#   passed to run_sweep_task: each worker process keeps one cache of cache_entries canonical forms
+#   (obtain_process_config_var_cache), shared by all the groups it runs. A task without Monte Carlo
+#   moves whose grid is already in the cache (the same grid at another epsilon1, or a shifted,
+#   reflected or A/B-exchanged copy of one) skips the local config vars entirely; a task with moves
+#   takes the counts of its starting grid from the cache, and keeps those of its final grid there.
+#   Each result carries the cache statistics of its worker process.
+# A task may also give its grid outright, as 'activ' (total_nodes activations in node order),
+#   instead of drawing it from its seed.
+#
+####################################################################################################
+####################################################################################################
+
+default_sweep_cache_entries = 4096
+
+
+# All combinations of the given values, as a list of task dictionaries numbered in order
+def obtain_sweep_tasks(epsilon1_values, x1_values, seeds, array_lengths, num_moves=0, temperature=1.0,
+                       cache_entries=default_sweep_cache_entries):
+
+    sweep_tasks = list()
+    for task_num, (array_length, x1, seed, epsilon1) in enumerate(
+            itertools.product(array_lengths, x1_values, seeds, epsilon1_values)):
+        sweep_tasks.append({'task_num': task_num, 'epsilon1': float(epsilon1), 'x1': float(x1),
+                            'seed': int(seed), 'array_length': int(array_length),
+                            'num_moves': int(num_moves), 'temperature': float(temperature),
+                            'cache_entries': int(cache_entries)})
+
+    return(sweep_tasks)
+
+
+# Run one task (in a worker process), with the config var cache of its group (or without a cache)
+def run_sweep_task(sweep_task, config_var_cache=None):
+
+    start_time = time.perf_counter()
+    array_size_list = obtain_array_size_list(sweep_task['array_length'], 2)
+    total_nodes = array_size_list[0]*array_size_list[1]
+    epsilon1 = sweep_task['epsilon1']
+
+    grid_seed, move_seed = np.random.SeedSequence(sweep_task['seed']).spawn(2)
+    node_grid = obtain_node_grid(array_size_list)
+    if sweep_task.get('activ') is None:
+        node_grid = assign_random_activations_node_grid(node_grid, array_size_list, sweep_task['x1'], grid_seed)
+    else:
+        node_grid.activ[:] = np.asarray(sweep_task['activ'], dtype=np.int8).ravel()
+
+    accepted_moves = 0
+    if sweep_task['num_moves'] > 0:
+        mc_results = run_swap_monte_carlo(node_grid.activ, array_size_list, epsilon1, sweep_task['temperature'],
+                                          sweep_task['num_moves'], move_seed, config_var_cache=config_var_cache)
+        accepted_moves = mc_results['accepted_moves']
+        config_var_counts = mc_results['config_var_counts'].tolist()
+    elif config_var_cache is None:
+        node_grid = assign_local_config_vars_node_grid(node_grid, array_size_list)
+        config_var_counts = obtain_config_var_counts_node_grid(node_grid)
+    else:
+        canonical_key = obtain_canonical_key(node_grid.activ, array_size_list)
+        config_var_counts = config_var_cache.lookup(canonical_key)
+        if config_var_counts is None:
+            node_grid = assign_local_config_vars_node_grid(node_grid, array_size_list)
+            config_var_counts = obtain_config_var_counts_node_grid(node_grid)
+            config_var_cache.store(canonical_key, config_var_counts)
+        config_var_counts = list(config_var_counts)
+    config_vars_list = obtain_config_vars_list_from_counts(config_var_counts, total_nodes)
+    neg_entropy = compute_neg_entropy(config_vars_list)
+    enthalpy = float(compute_enthalpy_sweep(config_vars_list, epsilon1)[0, 0])
+
+    sweep_result = dict(sweep_task)
+    sweep_result.update({
+        'accepted_moves': accepted_moves,
+        'config_vars_list': config_vars_list,
+        'neg_entropy': neg_entropy,
+        'enthalpy': enthalpy,
+        'free_energy': enthalpy + neg_entropy,
+        'elapsed_time': time.perf_counter() - start_time,
+        'group_num': sweep_task.get('group_num', sweep_task['task_num']),
+        'cache_stats': None if config_var_cache is None else config_var_cache.obtain_cache_stats(),
+    })
+
+    return(sweep_result)
+
+
+# The tasks in groups of consecutive tasks on the same grid; each group is numbered by its first task
+def obtain_sweep_task_groups(sweep_tasks):
+
+    for grid_key, sweep_task_group in itertools.groupby(
+            sweep_tasks, key=lambda sweep_task: (sweep_task['array_length'], sweep_task['x1'], sweep_task['seed'],
+                                                 sweep_task.get('activ'))):
+        sweep_task_group = list(sweep_task_group)
+        group_num = sweep_task_group[0]['task_num']
+        yield [dict(sweep_task, group_num=group_num) for sweep_task in sweep_task_group]
+
+
+# Run one group of tasks (in a worker process), with the config var cache of that process
+def run_sweep_task_group(sweep_task_group):
+
+    config_var_cache = obtain_process_config_var_cache(sweep_task_group[0].get('cache_entries',
+                                                                               default_sweep_cache_entries))
+    sweep_results = [run_sweep_task(sweep_task, config_var_cache) for sweep_task in sweep_task_group]
+
+    return(sweep_results)
+
+
+# Run all the tasks on max_workers processes (default: all cores), yielding results as they complete
+def run_parallel_sweep(sweep_tasks, max_workers=None):
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    group_arguments = ((sweep_task_group,) for sweep_task_group in obtain_sweep_task_groups(sweep_tasks))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for sweep_results in run_bounded_tasks(executor, run_sweep_task_group, group_arguments,
+                                               tasks_in_flight_per_worker*max_workers):
+            yield from sweep_results
+
+
+####################################################################################################
+####################################################################################################
+#
+# BATCH SWAPS: apply a list of (node1, node2) swaps, read from a file or from stdin instead of
+#   being picked with obtain_new_node_list2, and find the change in the config var counts and in 
+#   the negative entropy for each swap.
+#
+# The swaps are read as pairs of node numbers (node_num = row*array_length + col), two per line,
+#   separated by spaces or commas; anything after a '#' on a line is ignored. 
+# In "sequence" mode the swaps are applied one after the other, and each delta is relative to
+#   the grid just before that swap (using swap_config_var_counts of cvm1d/monte_carlo.py). 
+#   In "base" mode each swap is made against the original grid, and all the deltas are found 
+#   at once (cvm1d/swaps.py). A swap of two nodes with the same activation changes nothing (as in 
+#   node_difference_test) and is reported with swapped = 0.
+#
+####################################################################################################
+####################################################################################################
+
+def read_swap_pairs(swap_stream, array_size_list):
+
+    total_nodes = array_size_list[0]*array_size_list[1]
+    swap_text = swap_stream.read()
+    if '#' in swap_text:
+        swap_text = '\n'.join(line.split('#', 1)[0] for line in swap_text.splitlines())
+    swap_values = np.array(swap_text.replace(',', ' ').split(), dtype=np.int64)
+    if swap_values.size % 2 != 0:
+        raise ValueError('The swap list must hold pairs of node numbers')
+    if np.any(swap_values < 0) or np.any(swap_values >= total_nodes):
+        raise ValueError('Node numbers must be between 0 and ' + str(total_nodes - 1))
+    swap_pairs = swap_values.reshape(-1, 2)
+
+    return(swap_pairs[:, 0], swap_pairs[:, 1])
+
+
+def apply_swaps_sequence(node_grid, array_size_list, node1_nums, node2_nums, recorder=None):
+
+    num_swaps = len(node1_nums)
+    delta_counts = np.zeros((num_swaps, 12), dtype=np.int64)
+    delta_neg_entropy = np.zeros(num_swaps)
+    swapped = np.zeros(num_swaps, dtype=bool)
+
+    swap_tables = obtain_swap_tables(array_size_list)
+    swap_state = obtain_swap_state(node_grid.activ, array_size_list)
+    state = swap_state['state']
+    neg_entropy_term = obtain_neg_entropy_term_function(swap_tables)
+    if recorder is not None:
+        recorder.record(node_grid.activ, 0)
+    for swap_num, (node1_num, node2_num) in enumerate(zip(node1_nums.tolist(), node2_nums.tolist())):
+        if state[node1_num] != state[node2_num]:
+            delta_counts[swap_num], delta_neg_entropy[swap_num] = swap_config_var_counts(
+                swap_tables, swap_state, node1_num, node2_num, neg_entropy_term)
+            swapped[swap_num] = True
+        if recorder is not None and (swap_num + 1) % recorder.record_every == 0:
+            recorder.record(np.frombuffer(bytes(state), dtype=np.uint8), swap_num + 1)
+
+    node_grid.activ[:] = obtain_swap_state_activ(swap_state)
+    node_grid = assign_local_config_vars_node_grid(node_grid, array_size_list)
+
+    return(delta_counts, delta_neg_entropy, swapped)
+
+
+# One line per swap: swap number, the two nodes, swapped (1 or 0), the 12 count deltas
+#   (divide by total_nodes for the fractional config var deltas) and the neg-entropy delta
+def write_swap_deltas(output_stream, node1_nums, node2_nums, swapped, delta_counts, delta_neg_entropy,
+                      total_nodes, swaps_per_block=65536):
+
+    output_stream.write('# total_nodes ' + str(total_nodes) + '\n')
+    output_stream.write('# swap node1 node2 swapped dY1 dY2 dY3 dW1 dW2 dW3 dZ1 dZ2 dZ3 dZ4 dZ5 dZ6 dNegEntropy\n')
+    line_format = ' '.join(['%d']*16) + ' %.12g\n'
+    for first_swap in range(0, len(node1_nums), swaps_per_block):
+        block = slice(first_swap, first_swap + swaps_per_block)
+        swap_nums = np.arange(first_swap, first_swap + len(node1_nums[block]))
+        int_columns = np.column_stack((swap_nums, node1_nums[block], node2_nums[block], swapped[block],
+                                       delta_counts[block])).tolist()
+        output_stream.write(''.join(line_format % (*row, delta) for row, delta in
+                                    zip(int_columns, delta_neg_entropy[block].tolist())))
+
+    return()
+
+
+####################################################################################################
+####################################################################################################
+#
+# STARTUP TIME: the wall-clock time for a fresh Python interpreter to start and import this file
+#   (the compute-only path: nothing is drawn, so no drawing package should be loaded).
+#
+# Each run is a new interpreter (as a worker process would be), which imports this file as a
+#   module, and reports the time from its own start to the end of the import, together with any
+#   drawing packages (drawing_package_names) found in sys.modules. The median of the runs is
+#   checked against startup_time_budget.
+#
+####################################################################################################
+####################################################################################################
+
+startup_time_budget = 0.5
+drawing_package_names = ('pylab', 'matplotlib', 'turtle', 'tkinter')
+
+startup_probe_code = '''
+import time
+start_time = time.perf_counter()
+import importlib.util, json, sys
+sys.path.insert(0, sys.argv[2])
+spec = importlib.util.spec_from_file_location('cvm1d_startup_probe', sys.argv[1])
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+import_time = time.perf_counter() - start_time
+drawing_packages = sorted(name for name in sys.modules if name.split('.')[0] in sys.argv[3].split(','))
+print(json.dumps({'import_time': import_time, 'drawing_packages': drawing_packages}))
+'''
+
+
+def measure_startup_time(num_runs=5):
+
+    script_path = os.path.abspath(__file__)
+    startup_times = list()
+    drawing_packages = set()
+    for run_num in range(num_runs):
+        start_time = time.perf_counter()
+        probe_output = subprocess.run([sys.executable, '-c', startup_probe_code, script_path,
+                                       os.path.dirname(script_path), ','.join(drawing_package_names)],
+                                      check=True, capture_output=True, text=True).stdout
+        startup_times.append(time.perf_counter() - start_time)
+        drawing_packages.update(json.loads(probe_output.splitlines()[-1])['drawing_packages'])
+
+    startup_results = {
+        'runs': num_runs,
+        'startup_times': startup_times,
+        'median_startup_time': float(np.median(startup_times)),
+        'budget': startup_time_budget,
+        'drawing_packages': sorted(drawing_packages),
+    }
+    startup_results['within_budget'] = (startup_results['median_startup_time'] <= startup_time_budget and
+                                        len(drawing_packages) == 0)
+
+    return(startup_results)
+
+
+####################################################################################################
+####################################################################################################
+#
+# NON-INTERACTIVE (BATCH) MODES: These are run with command-line arguments instead of main(),
+#   e.g.:  python <this file> mc --eps1 -0.25 --temperature 1.0 --moves 1000000
+#
+####################################################################################################
+####################################################################################################
+
+# A TrajectoryRecorder for the --trajectory option (None if no trajectory was asked for)
+def obtain_trajectory_recorder(args, array_size_list):
+
+    if args.trajectory is None:
+        return(None)
+
+    return(TrajectoryRecorder(array_size_list, args.record_every, args.capacity, args.trajectory_dir))
+
+
+def write_trajectory(args, recorder):
+
+    if recorder is not None:
+        num_snapshots = write_trajectory_file(recorder, args.trajectory, args.scale, args.frame_duration)
+        print('Wrote', num_snapshots, 'snapshots to', args.trajectory, file=sys.stderr)
+
+    return()
+
+
+def add_trajectory_arguments(subparser):
+
+    subparser.add_argument('--trajectory', default=None,
+                           help='write the history to this .gif / .mp4 (animation) or .png (space-time) file')
+    subparser.add_argument('--record-every', type=int, default=1, help='record the grid every this many moves')
+    subparser.add_argument('--capacity', type=int, default=None,
+                           help='snapshots kept in memory (the oldest are dropped first)')
+    subparser.add_argument('--trajectory-dir', default=None,
+                           help='keep every snapshot, in chunks in this directory, instead of in memory')
+    subparser.add_argument('--scale', type=float, default=0.5, help='size of the animation frames')
+    subparser.add_argument('--frame-duration', type=float, default=0.1, help='seconds per animation frame')
+
+    return()
+
+
+def main_demo(args):
+
+    main(args.length, args.layers, args.render)
+
+    return()
+
+
+def main_monte_carlo(args):
+
+    array_size_list = obtain_array_size_list(args.length, args.layers)
+
+    node_grid = obtain_node_grid(array_size_list)
+    if args.x1 is None:
+        node_grid = assign_activations_node_list(node_grid, array_size_list)
+    else:
+        node_grid = assign_random_activations_node_grid(node_grid, array_size_list, args.x1, args.seed)
+
+    recorder = obtain_trajectory_recorder(args, array_size_list)
+    mc_results = run_swap_monte_carlo(node_grid.activ, array_size_list, args.eps1, args.temperature,
+                                      args.moves, args.seed, recorder=recorder)
+    node_grid.activ[:] = mc_results['activ']
+    node_grid = assign_local_config_vars_node_grid(node_grid, array_size_list)
+    print_monte_carlo_results(mc_results, array_size_list)
+    write_trajectory(args, recorder)
+
+    return()
+
+
+def main_anneal(args):
+
+    array_size_list = obtain_array_size_list(args.length, args.layers)
+    if args.x1 is None:
+        activ = obtain_builtin_activations(array_size_list)
+    else:
+        activ = obtain_random_activations(array_size_list, args.x1, args.seed)
+
+    temperatures = obtain_cooling_schedule(args.t_initial, args.t_final, args.stages, args.schedule)
+    annealing_results = anneal_activations(activ, array_size_list, args.eps1, temperatures,
+                                           args.moves_per_stage, args.seed)
+    print_annealing_results(annealing_results, array_size_list)
+    if args.output is not None:
+        np.savetxt(args.output, annealing_results['activ'].reshape(array_size_list[1], array_size_list[0]), fmt='%d')
+
+    return()
+
+
+def main_replicas(args):
+
+    array_size_list = obtain_array_size_list(args.length, 2)
+
+    epsilon1 = np.linspace(args.eps1_min, args.eps1_max, args.replicas)
+    activ = obtain_random_replica_activations(args.replicas, array_size_list[0], args.x1, args.seed)
+    replica_results = run_replica_monte_carlo(activ, epsilon1, args.temperature, args.steps, args.seed)
+    print_replica_monte_carlo_results(replica_results, array_size_list)
+
+    return()
+
+
+def main_tempering(args):
+
+    array_size_list = obtain_array_size_list(args.length, args.layers)
+
+    epsilon1 = np.linspace(args.eps1_min, args.eps1_max, args.rungs)
+    if args.t_min == args.t_max:
+        temperature = np.full(args.rungs, args.t_min)
+    else:
+        temperature = np.geomspace(args.t_min, args.t_max, args.rungs)
+    activ = np.stack([obtain_random_activations(array_size_list, args.x1, None if args.seed is None else args.seed + rung)
+                      for rung in range(args.rungs)])
+    tempering_results = run_parallel_tempering(activ, array_size_list, epsilon1, temperature, args.rounds,
+                                               args.moves_per_round, args.workers, args.seed)
+    print_parallel_tempering_results(tempering_results, array_size_list)
+
+    return()
+
+
+def main_sweep(args):
+
+    epsilon1_values = np.linspace(args.eps1_min, args.eps1_max, args.num_eps1)
+    x1_values = np.linspace(args.x1_min, args.x1_max, args.num_x1)
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    sweep_tasks = obtain_sweep_tasks(epsilon1_values, x1_values, seeds, args.lengths, args.moves, args.temperature,
+                                     args.cache_entries)
+
+    start_time = time.perf_counter()
+    print_sweep_result_header(len(sweep_tasks))
+    cache_stats_list = list()
+    for sweep_result in run_parallel_sweep(sweep_tasks, args.workers):
+        print_sweep_result(sweep_result)
+        if sweep_result['cache_stats'] is not None:
+            cache_stats_list.append(sweep_result['cache_stats'])
+    elapsed_time = time.perf_counter() - start_time
+    print()
+    print("  ", len(sweep_tasks), " state points in ", "%.3f" % elapsed_time, " s")
+    if cache_stats_list:
+        print_config_var_cache_stats(combine_process_cache_stats(cache_stats_list))
+    print()
+
+    return()
+
+
+def main_swaps(args):
+
+    array_size_list = obtain_array_size_list(args.length, args.layers)
+    total_nodes = array_size_list[0]*array_size_list[1]
+
+    node_grid = obtain_node_grid(array_size_list)
+    if args.x1 is None:
+        node_grid = assign_activations_node_list(node_grid, array_size_list)
+    else:
+        node_grid = assign_random_activations_node_grid(node_grid, array_size_list, args.x1, args.seed)
+    node_grid = assign_local_config_vars_node_grid(node_grid, array_size_list)
+
+    if args.input == '-':
+        node1_nums, node2_nums = read_swap_pairs(sys.stdin, array_size_list)
+    else:
+        with open(args.input) as swap_stream:
+            node1_nums, node2_nums = read_swap_pairs(swap_stream, array_size_list)
+
+    if args.against == 'base':
+        delta_counts, delta_neg_entropy, swapped = obtain_swap_deltas_base(node_grid.activ, node1_nums,
+                                                                           node2_nums, array_size_list)
+    else:
+        recorder = obtain_trajectory_recorder(args, array_size_list)
+        delta_counts, delta_neg_entropy, swapped = apply_swaps_sequence(node_grid, array_size_list,
+                                                                        node1_nums, node2_nums, recorder)
+        write_trajectory(args, recorder)
+
+    if args.output == '-':
+        write_swap_deltas(sys.stdout, node1_nums, node2_nums, swapped, delta_counts, delta_neg_entropy, total_nodes)
+    else:
+        with open(args.output, 'w') as output_stream:
+            write_swap_deltas(output_stream, node1_nums, node2_nums, swapped, delta_counts, delta_neg_entropy,
+                              total_nodes)
+
+    return()
+
+
+def main_best_swaps(args):
+
+    array_size_list = obtain_array_size_list(args.length, args.layers)
+    if args.x1 is None:
+        activ = obtain_builtin_activations(array_size_list)
+    else:
+        activ = obtain_random_activations(array_size_list, args.x1, args.seed)
+
+    grid_results = evaluate_activations(activ, array_size_list, args.eps1)
+    best_swaps = obtain_best_swaps(activ, array_size_list, args.eps1, args.top, args.rank_by)
+    print_best_swaps(best_swaps, grid_results, array_size_list)
+
+    return()
+
+
+def main_enumerate(args):
+
+    array_size_list = obtain_array_size_list(args.length, args.layers)
+    total_nodes = array_size_list[0]*array_size_list[1]
+
+    start_time = time.perf_counter()
+    config_var_counts, multiplicities = enumerate_config_var_counts(array_size_list, args.x1_count,
+                                                                    max_workers=args.workers)
+    neg_entropy_values, value_multiplicities = obtain_neg_entropy_distribution(config_var_counts,
+                                                                               multiplicities, total_nodes)
+    elapsed_time = time.perf_counter() - start_time
+
+    print_neg_entropy_distribution(neg_entropy_values, value_multiplicities, len(config_var_counts), elapsed_time)
+
+    return()
+
+
+def main_transfer_matrix(args):
+
+    epsilon1 = np.linspace(args.eps1_min, args.eps1_max, args.num_points)
+    tm_results = solve_transfer_matrix(epsilon1, args.x1)
+    print_transfer_matrix_results(tm_results)
+
+    return()
+
+
+def main_minimize(args):
+
+    epsilon1 = np.linspace(args.eps1_min, args.eps1_max, args.num_points)
+    if args.warm_start:
+        fe_results = minimize_free_energy_curve(epsilon1, args.x1)
+    else:
+        fe_results = minimize_free_energy(epsilon1, args.x1)
+    print_free_energy_minimization_results(fe_results)
+
+    return()
+
+
+def main_startup(args):
+
+    startup_results = measure_startup_time(args.runs)
+    print_startup_results(startup_results)
+    if not startup_results['within_budget']:
+        sys.exit(1)
+
+    return()
+
+
+def main_batch(argv):
+
+    parser = argparse.ArgumentParser(description='Non-interactive modes of the 1D CVM code')
+    subparsers = parser.add_subparsers(dest='mode', required=True)
+
+    demo_parser = subparsers.add_parser('demo', help='the interactive node-swap demo, on a grid of any size')
+    demo_parser.add_argument('--length', type=int, default=default_array_length, help='array_length (columns)')
+    demo_parser.add_argument('--layers', type=int, default=default_array_layers, help='array_layers (rows, even)')
+    demo_parser.add_argument('--render', default=None,
+                             help='save the before/after grid picture to this PNG or SVG file (no display needed)')
+    demo_parser.set_defaults(run_mode=main_demo)
+
+    mc_parser = subparsers.add_parser('mc', help='Metropolis Monte Carlo with node-swap moves')
+    mc_parser.add_argument('--eps1', type=float, required=True, help='interaction enthalpy epsilon1')
+    mc_parser.add_argument('--temperature', type=float, default=1.0)
+    mc_parser.add_argument('--moves', type=int, default=1000000)
+    mc_parser.add_argument('--length', type=int, default=default_array_length, help='array_length (columns)')
+    mc_parser.add_argument('--layers', type=int, default=default_array_layers, help='array_layers (rows, even)')
+    mc_parser.add_argument('--x1', type=float, default=None,
+                           help='fraction of ON nodes in a random start (default: the built-in pattern)')
+    mc_parser.add_argument('--seed', type=int, default=None)
+    add_trajectory_arguments(mc_parser)
+    mc_parser.set_defaults(run_mode=main_monte_carlo)
+
+    anneal_parser = subparsers.add_parser('anneal', help='simulated annealing for the lowest free energy at fixed x1')
+    anneal_parser.add_argument('--eps1', type=float, required=True, help='interaction enthalpy epsilon1')
+    anneal_parser.add_argument('--t-initial', type=float, default=1.0, help='first temperature of the schedule')
+    anneal_parser.add_argument('--t-final', type=float, default=0.01, help='last temperature of the schedule')
+    anneal_parser.add_argument('--stages', type=int, default=20, help='number of temperatures')
+    anneal_parser.add_argument('--schedule', choices=('geometric', 'linear'), default='geometric')
+    anneal_parser.add_argument('--moves-per-stage', type=int, default=100000)
+    anneal_parser.add_argument('--length', type=int, default=default_array_length, help='array_length (columns)')
+    anneal_parser.add_argument('--layers', type=int, default=default_array_layers, help='array_layers (rows, even)')
+    anneal_parser.add_argument('--x1', type=float, default=None,
+                               help='fraction of ON nodes in a random start (default: the built-in pattern)')
+    anneal_parser.add_argument('--seed', type=int, default=None)
+    anneal_parser.add_argument('--output', default=None, help='save the best pattern (one grid row per line)')
+    anneal_parser.set_defaults(run_mode=main_anneal)
+
+    replica_parser = subparsers.add_parser('replicas', help='many independent node-swap Monte Carlo chains at once')
+    replica_parser.add_argument('--replicas', type=int, default=100)
+    replica_parser.add_argument('--eps1-min', type=float, default=-2.0, help='eps1 of the first replica')
+    replica_parser.add_argument('--eps1-max', type=float, default=2.0, help='eps1 of the last replica')
+    replica_parser.add_argument('--temperature', type=float, default=1.0)
+    replica_parser.add_argument('--steps', type=int, default=10000, help='swap proposals per replica')
+    replica_parser.add_argument('--length', type=int, default=default_array_length, help='array_length (columns)')
+    replica_parser.add_argument('--x1', type=float, default=0.5, help='fraction of ON nodes in each replica')
+    replica_parser.add_argument('--seed', type=int, default=None)
+    replica_parser.set_defaults(run_mode=main_replicas)
+
+    tempering_parser = subparsers.add_parser('tempering', help='parallel tempering (replica exchange) on an eps1 ladder')
+    tempering_parser.add_argument('--rungs', type=int, default=8)
+    tempering_parser.add_argument('--eps1-min', type=float, default=-2.0, help='eps1 of the first rung')
+    tempering_parser.add_argument('--eps1-max', type=float, default=0.0, help='eps1 of the last rung')
+    tempering_parser.add_argument('--t-min', type=float, default=1.0, help='temperature of the first rung')
+    tempering_parser.add_argument('--t-max', type=float, default=1.0,
+                                  help='temperature of the last rung (geometric in between)')
+    tempering_parser.add_argument('--rounds', type=int, default=100, help='exchange rounds')
+    tempering_parser.add_argument('--moves-per-round', type=int, default=10000, help='swap moves per rung per round')
+    tempering_parser.add_argument('--length', type=int, default=default_array_length, help='array_length (columns)')
+    tempering_parser.add_argument('--layers', type=int, default=default_array_layers, help='array_layers (rows, even)')
+    tempering_parser.add_argument('--x1', type=float, default=0.5, help='fraction of ON nodes in each rung')
+    tempering_parser.add_argument('--seed', type=int, default=None)
+    tempering_parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: all cores)')
+    tempering_parser.set_defaults(run_mode=main_tempering)
+
+    sweep_parser = subparsers.add_parser('sweep', help='eps1 / x1 sweep on a pool of worker processes')
+    sweep_parser.add_argument('--eps1-min', type=float, default=-2.0)
+    sweep_parser.add_argument('--eps1-max', type=float, default=2.0)
+    sweep_parser.add_argument('--num-eps1', type=int, default=9)
+    sweep_parser.add_argument('--x1-min', type=float, default=0.5)
+    sweep_parser.add_argument('--x1-max', type=float, default=0.5)
+    sweep_parser.add_argument('--num-x1', type=int, default=1)
+    sweep_parser.add_argument('--seeds', type=int, default=1, help='number of seeds per state point')
+    sweep_parser.add_argument('--first-seed', type=int, default=0)
+    sweep_parser.add_argument('--lengths', type=int, nargs='+', default=[default_array_length],
+                              help='array_length (columns) values')
+    sweep_parser.add_argument('--moves', type=int, default=0, help='Monte Carlo moves per task before evaluating')
+    sweep_parser.add_argument('--temperature', type=float, default=1.0)
+    sweep_parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: all cores)')
+    sweep_parser.add_argument('--cache-entries', type=int, default=default_sweep_cache_entries,
+                              help='canonical grids kept in the config var cache of each worker process')
+    sweep_parser.set_defaults(run_mode=main_sweep)
+
+    swap_parser = subparsers.add_parser('swaps', help='apply (node1, node2) swaps read from a file or stdin')
+    swap_parser.add_argument('--input', default='-', help='file of node1 node2 pairs (default: stdin)')
+    swap_parser.add_argument('--output', default='-', help='file for the per-swap deltas (default: stdout)')
+    swap_parser.add_argument('--against', choices=('sequence', 'base'), default='sequence',
+                             help='apply the swaps in sequence, or each against the base grid')
+    swap_parser.add_argument('--length', type=int, default=default_array_length, help='array_length (columns)')
+    swap_parser.add_argument('--layers', type=int, default=default_array_layers, help='array_layers (rows, even)')
+    swap_parser.add_argument('--x1', type=float, default=None,
+                             help='fraction of ON nodes in a random base grid (default: the built-in pattern)')
+    swap_parser.add_argument('--seed', type=int, default=None)
+    add_trajectory_arguments(swap_parser)
+    swap_parser.set_defaults(run_mode=main_swaps)
+
+    best_parser = subparsers.add_parser('best-swaps', help='rank every single swap against the base grid')
+    best_parser.add_argument('--eps1', type=float, default=0.0)
+    best_parser.add_argument('--top', type=int, default=10, help='number of swaps to list')
+    best_parser.add_argument('--rank-by', choices=('free_energy', 'neg_entropy'), default='free_energy')
+    best_parser.add_argument('--length', type=int, default=default_array_length, help='array_length (columns)')
+    best_parser.add_argument('--layers', type=int, default=default_array_layers, help='array_layers (rows, even)')
+    best_parser.add_argument('--x1', type=float, default=None,
+                             help='fraction of ON nodes in a random base grid (default: the built-in pattern)')
+    best_parser.add_argument('--seed', type=int, default=None)
+    best_parser.set_defaults(run_mode=main_best_swaps)
+
+    enum_parser = subparsers.add_parser('enumerate', help='exact enumeration of all activation patterns')
+    enum_parser.add_argument('--length', type=int, default=default_array_length, help='array_length (columns)')
+    enum_parser.add_argument('--layers', type=int, default=default_array_layers, help='array_layers (rows, even)')
+    enum_parser.add_argument('--x1-count', type=int, default=None, help='only patterns with this many ON nodes')
+    enum_parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    enum_parser.set_defaults(run_mode=main_enumerate)
+
+    tm_parser = subparsers.add_parser('tm', help='exact infinite-chain values from the transfer matrix')
+    tm_parser.add_argument('--eps1-min', type=float, default=-2.0)
+    tm_parser.add_argument('--eps1-max', type=float, default=2.0)
+    tm_parser.add_argument('--num-points', type=int, default=9)
+    tm_parser.add_argument('--x1', type=float, default=None, help='fixed fraction of ON nodes (default: free)')
+    tm_parser.set_defaults(run_mode=main_transfer_matrix)
+
+    min_parser = subparsers.add_parser('minimize', help='equilibrium values by free-energy minimization')
+    min_parser.add_argument('--eps1-min', type=float, default=-2.0)
+    min_parser.add_argument('--eps1-max', type=float, default=2.0)
+    min_parser.add_argument('--num-points', type=int, default=9)
+    min_parser.add_argument('--x1', type=float, default=None, help='fixed fraction of ON nodes (default: free)')
+    min_parser.add_argument('--warm-start', action='store_true',
+                            help='step along eps1, starting each point from its neighbor')
+    min_parser.set_defaults(run_mode=main_minimize)
+
+    startup_parser = subparsers.add_parser('startup', help='measure the compute-only startup time')
+    startup_parser.add_argument('--runs', type=int, default=5, help='number of fresh interpreters to time')
+    startup_parser.set_defaults(run_mode=main_startup)
+
+    args = parser.parse_args(argv)
+    args.run_mode(args)
+
+    return()
+
+
+####################################################################################################
+####################################################################################################
+
+def main(array_length=default_array_length, array_layers=default_array_layers, render_path=None):
+
+ ####################################################################################################
+ # Obtain unit array size in terms of array_length (M) and layers (N)
+ #   These are parameters of main (the default is the 12 x 2 grid); they are NOT global, 
+ #   and are passed on to every function that needs them inside array_size_list.
+ ####################################################################################################
+
+# Define global print parameters
+    global blnkspc
+
+# Define global debug parameters
+    global debug_print_off
+    global detailed_debug_print_off
+    global z_debug_print_off
+    global show_progress_adjust_matrix_off
+    global explanation_thermodynamic_plot_off
+
+# Define a Boolean value for whether the two user-selected nodes are different
+    nodes_different = False    
+
+# Define a blank space value for printing
+    blnkspc = ' '
+
+# Define Boolean values for the global debug variables
+#   Not all of these are used in the simple 1D CVM program(s) 
+    debug_print_off = True
+    detailed_debug_print_off = True
+    z_debug_print_off = True
+    show_progress_adjust_matrix_off = True
+    explanation_thermodynamic_plot_off = True
+    perform_analytics = True
+
+# This is a local variable; it will be passed to compute_config_variables
+# It will determine whether we print the contents of the x-array at the
+#   beginning and end of the adjust-matrix step.
+    beforeAndAfterAdjustedMatrixPrintOff = True
+    
+
+
+####################################################################################################
+# The actual __main__ program starts here with function and procedure calls
+####################################################################################################
+
+# Start the welcome sequence
+    welcome()
+    print_debug_status(debug_print_off)
+
+# Function call to get the actual dimensions of the 2D CVM grid
+# This is kept in the 1D CVM code for consistency
+    array_size_list = list()  # empty list
+    array_size_list = obtain_array_size_list(array_length, array_layers)
+    array_length = array_size_list[0]
+    array_layers = array_size_list[1]  
+
+# Print the dimensions of the grid we will create
+    print_initial_array_size_values(array_size_list)    
+
+# Populate the grid with initial values
+    node_list = obtain_node_grid(array_size_list)
+    node_list = assign_activations_node_list(node_list, array_size_list)
+    node_list = assign_local_config_vars_node_grid(node_list, array_size_list) 
+    
+    print_grid_node_values(node_list, array_size_list)
+
+# Function call to create the initial configuration variables list
+    config_vars_list1 = list()  
+    config_vars_list1 = obtain_config_vars_list()
+    
+# Function call to create the second configuration variables list
+    config_vars_list2 = list()  
+    config_vars_list2 = obtain_config_vars_list()    
+  
+#===================================================================================================     
+# USER INTERACTION: Interchange two nodes.
+#   These two nodes must have different activation values. 
+
+# Populate a second grid to be identical to the first; 
+#   This grid is what the user will modify.
+    node_list2 = obtain_node_grid(array_size_list)
+    node_list2 = assign_activations_node_list(node_list2, array_size_list) 
+    node_list2 = assign_local_config_vars_node_grid(node_list2, array_size_list)
+    
+# There is no need to print this grid right now; 
+#   it is currently identical to the first.  
+    
+# USER INTERACTION: Inform the user that the next task is to select a first node.    
+    print_first_node_selection_directions()
+
+# USER INTERACTION: Obtain the first node that the user wishes to swap.
+    node1_num = obtain_new_node_list2 (array_length, array_layers) 
+
+# USER INTERACTION: Inform the user that the next task is to select a second node.  
+    print_second_node_selection_directions() 
+
+# USER INTERACTION: Obtain the second node that the user wishes to swap.
+    node2_num = obtain_new_node_list2 (array_length, array_layers) 
+    
+# Test to be sure the two nodes have different activations
+    nodes_different = node_difference_test(node1_num, node2_num, nodes_different, node_list) 
+    if nodes_different:
+        node_list2 = interchange_activations_node_list2(node1_num, node2_num, node_list, node_list2)
+        node_list2 = assign_local_config_vars_node_grid(node_list2, array_size_list)
+
+        print_grid_node_values(node_list2, array_size_list)  
+       
+    config_vars_list1 = obtain_actual_config_vars_list(config_vars_list1, node_list, array_length, array_layers)
+    config_vars_list2 = obtain_actual_config_vars_list(config_vars_list2, node_list2, array_length, array_layers)
+    
+    call_num = 1
+    print_frac_config_values(config_vars_list1, call_num)
+    call_num = 2
+    print_frac_config_values(config_vars_list2, call_num)   
+    
+    neg_entropy1 = compute_neg_entropy(config_vars_list1)
+    neg_entropy2 = compute_neg_entropy(config_vars_list2)
+    
+    print('  Neg-Entropy for the original system is: ', "%.3f" % neg_entropy1)   
+    print('  Neg-Entropy for the revised system is: ', "%.3f" % neg_entropy2)  
+    
+#    print()
+#    print('  The free energy for the original system is ',  "%.3f" % neg_entropy1, ' where the enthalpy is 0.')
+#   compute_free_energy(config_vars_list2, neg_entropy2)
+    
+#===================================================================================================
+
+
+# Create a turtle_grid_list where the values are the activations of the nodes, in simple list order. 
+    array_size = array_length*array_layers
+    turtle_grid_list = list()
+    turtle_grid_list = obtain_turtle_grid_list(turtle_grid_list, array_size_list, node_list, node_list2, 
+                                               node1_num, node2_num)  
+
+# Print the turtle grid. 
+#    turtle_grid(turtle_grid_list, array_length, array_size)
+#   or, much faster for large grids (one stamp per box, one screen update):
+#    fast_turtle_grid(turtle_grid_list, array_size_list)
+
+# Or save the same picture (PNG or SVG), without a display
+    if render_path is not None:
+        render_turtle_grid_file(render_path, turtle_grid_list, array_size_list)
+        print('  The before/after grid picture is saved in ', render_path)
+    
+####################################################################################################
+# Conclude specification of the MAIN procedure
+####################################################################################################
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main_batch(sys.argv[1:])
+    else:
+        main()
+
+####################################################################################################
+# End program
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+# The tests import the cvm1d package from the top of the repository
+import importlib.util
+import os
+import sys
+
+import pytest
+
+repository_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repository_path)
+
+demo_script_name = 'simple-1D-CVM-w-turtle-1pt6pt0-2026-10-18.py'
+
+
+# The demo script, imported as a module (registered in sys.modules, so that the worker processes of
+#   its process pools can find the functions they are sent)
+@pytest.fixture(scope='session')
+def demo_script():
+
+    spec = importlib.util.spec_from_file_location('cvm1d_demo_script', os.path.join(repository_path,
+                                                                                     demo_script_name))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+
+    return(module)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+
+import numpy as np
+import pytest
+
+from cvm1d.annealing import obtain_cooling_schedule, anneal_activations
+from cvm1d.grid import obtain_config_var_counts_batch, obtain_random_activations
+from cvm1d.monte_carlo import evaluate_config_var_counts
+
+
+def test_cooling_schedules():
+
+    geometric = obtain_cooling_schedule(2.0, 0.02, 5)
+    assert np.allclose(geometric, [2.0, 0.632455532, 0.2, 0.0632455532, 0.02], rtol=1.0e-9, atol=0.0)
+    assert np.allclose(obtain_cooling_schedule(1.0, 0.0, 5, 'linear'), [1.0, 0.75, 0.5, 0.25, 0.0])
+    assert np.array_equal(obtain_cooling_schedule(0.5, 0.1, 1), [0.5])
+    for schedule_args in ((1.0, 0.0, 5), (-1.0, 0.1, 5), (1.0, 0.1, 0), (1.0, 0.1, 5, 'cubic')):
+        with pytest.raises(ValueError):
+            obtain_cooling_schedule(*schedule_args)
+
+
+# The best pattern keeps x1, is never worse than the start or the end of the run, and its counts
+#   (and those of the final pattern) are exact
+def test_annealing_keeps_x1_and_returns_the_best_pattern():
+
+    array_size_list = (60, 4)
+    activ = obtain_random_activations(array_size_list, 0.3, 8)
+    temperatures = obtain_cooling_schedule(1.0, 0.01, 8)
+    for epsilon1 in (-1.0, 0.5):
+        annealing_results = anneal_activations(activ, array_size_list, epsilon1, temperatures, 3000, seed=2)
+        assert annealing_results['moves'] == 8*3000
+        assert annealing_results['activ'].sum() == activ.sum() == annealing_results['final_activ'].sum()
+
+        counts = obtain_config_var_counts_batch(np.stack([activ, annealing_results['activ'],
+                                                          annealing_results['final_activ']]), array_size_list)
+        assert np.array_equal(counts[2], annealing_results['final_config_var_counts'])
+        assert np.array_equal(counts[1], annealing_results['config_var_counts'])
+        free_energies = [evaluate_config_var_counts(counts_row, 240, epsilon1)['free_energy'] for counts_row in counts]
+        assert abs(free_energies[0] - annealing_results['initial_free_energy']) < 1.0e-9
+        assert abs(free_energies[2] - annealing_results['final_free_energy']) < 1.0e-9
+        assert annealing_results['free_energy'] == free_energies[1]
+        assert annealing_results['free_energy'] <= min(free_energies[0], free_energies[2]) + 1.0e-12
+        assert 0 <= annealing_results['best_move_num'] <= annealing_results['moves']
+
+        repeat_results = anneal_activations(activ, array_size_list, epsilon1, temperatures, 3000, seed=2)
+        assert np.array_equal(repeat_results['activ'], annealing_results['activ'])
+
+
+# On a 6 x 2 chain with four ON nodes every pattern can be counted, so the minimum is known
+def test_annealing_finds_the_minimum_of_a_small_chain():
+
+    array_size_list = (6, 2)
+    patterns = np.array([pattern for pattern in itertools.product((0, 1), repeat=12) if sum(pattern) == 4],
+                        dtype=np.int8)
+    pattern_counts = obtain_config_var_counts_batch(patterns, array_size_list)
+    temperatures = obtain_cooling_schedule(1.0, 0.005, 12)
+    for epsilon1 in (-1.0, 0.0, 1.0):
+        minimum = min(evaluate_config_var_counts(counts, 12, epsilon1)['free_energy'] for counts in pattern_counts)
+        annealing_results = anneal_activations(patterns[0], array_size_list, epsilon1, temperatures, 500, seed=3)
+        assert abs(annealing_results['free_energy'] - minimum) < 1.0e-12
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from cvm1d.bitpack import pack_activation_rows, unpack_activation_rows, obtain_config_var_counts_packed
+from cvm1d.bitpack import obtain_packed_activation, swap_packed_activations
+from cvm1d.grid import obtain_config_var_counts_batch
+
+
+# Lengths on both sides of the word boundaries, so that the rotation carries bits between words
+array_lengths = (3, 5, 63, 64, 65, 127, 128, 129, 200)
+
+
+def test_packed_counts_match_bincount_counts():
+
+    rng = np.random.default_rng(7)
+    for array_length in array_lengths:
+        for array_layers in (2, 4):
+            array_size_list = (array_length, array_layers)
+            activ_batch = (rng.random((20, array_layers*array_length)) < rng.random((20, 1))).astype(np.int8)
+            packed_rows = pack_activation_rows(activ_batch.reshape(20, array_layers, array_length))
+            assert np.array_equal(obtain_config_var_counts_packed(packed_rows, array_size_list),
+                                  obtain_config_var_counts_batch(activ_batch, array_size_list))
+
+
+def test_pack_and_unpack_round_trip():
+
+    rng = np.random.default_rng(8)
+    for array_length in array_lengths:
+        activ_rows = rng.integers(0, 2, (4, array_length), dtype=np.int8)
+        packed_rows = pack_activation_rows(activ_rows)
+        assert np.array_equal(unpack_activation_rows(packed_rows, array_length), activ_rows)
+    # The unused bits at the top of the last word are 0
+        if array_length % 64 != 0:
+            assert np.all(packed_rows[:, -1] >> np.uint64(array_length % 64) == 0)
+
+
+def test_packed_swaps_match_bincount_counts():
+
+    rng = np.random.default_rng(9)
+    array_size_list = (65, 2)
+    activ = rng.integers(0, 2, 130, dtype=np.int8)
+    packed_rows = pack_activation_rows(activ.reshape(2, 65))
+    for node1_num, node2_num in rng.integers(0, 130, (50, 2)).tolist():
+        swap_packed_activations(packed_rows, node1_num, node2_num, 65)
+        activ[node1_num], activ[node2_num] = activ[node2_num], activ[node1_num]
+        assert obtain_packed_activation(packed_rows, node1_num, 65) == activ[node1_num]
+        assert np.array_equal(obtain_config_var_counts_packed(packed_rows, array_size_list),
+                              obtain_config_var_counts_batch(activ[None, :], array_size_list)[0])
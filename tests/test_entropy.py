@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from cvm1d.entropy import compute_neg_entropy_array, compute_neg_entropy_counts_array
+from cvm1d.entropy import obtain_neg_entropy_table, neg_entropy_tables_kept, neg_entropy_table_limit
+from cvm1d.grid import obtain_config_var_counts_batch
+
+
+# Uniform, alternating and random grids: the first two have several config vars of exactly zero
+def obtain_test_counts():
+
+    rng = np.random.default_rng(9)
+    activ_batch = np.concatenate((np.zeros((1, 40), dtype=np.int8), np.ones((1, 40), dtype=np.int8),
+                                  np.tile(np.array([1, 0], dtype=np.int8), (1, 20)),
+                                  (rng.random((20, 40)) < rng.random((20, 1))).astype(np.int8)))
+
+    return(obtain_config_var_counts_batch(activ_batch, (20, 2)))
+
+
+def test_zero_fractions_match_scalar_neg_entropy(demo_script):
+
+    config_var_counts = obtain_test_counts()
+    assert np.any(config_var_counts == 0)
+    config_vars = config_var_counts/40.0
+    neg_entropy = compute_neg_entropy_array(config_vars)
+    assert np.all(np.isfinite(neg_entropy))
+    for config_vars_list, value in zip(config_vars.tolist(), neg_entropy.tolist()):
+        assert abs(value - demo_script.compute_neg_entropy(config_vars_list)) < 1.0e-13
+    assert neg_entropy[0] == 0.0 and neg_entropy[1] == 0.0
+
+
+def test_counts_table_matches_fractions():
+
+    config_var_counts = obtain_test_counts()
+    counts_neg_entropy = compute_neg_entropy_counts_array(config_var_counts, 40)
+    assert np.allclose(counts_neg_entropy, compute_neg_entropy_array(config_var_counts/40.0), rtol=0.0, atol=1.0e-13)
+
+    scale = neg_entropy_table_limit//10
+    large_total_nodes = 40*scale
+    large_counts = config_var_counts*scale
+    assert np.allclose(compute_neg_entropy_counts_array(large_counts, large_total_nodes), counts_neg_entropy,
+                       rtol=0.0, atol=1.0e-13)
+
+    with pytest.raises(ValueError):
+        compute_neg_entropy_counts_array(config_var_counts + 41, 40)
+
+
+def test_neg_entropy_tables_are_bounded_and_read_only():
+
+    for total_nodes in range(100, 100 + 3*neg_entropy_tables_kept):
+        compute_neg_entropy_counts_array(np.zeros(12, dtype=np.int64), total_nodes)
+    assert obtain_neg_entropy_table.cache_info().currsize <= neg_entropy_tables_kept
+
+    table = obtain_neg_entropy_table(40)
+    assert table is obtain_neg_entropy_table(40)
+    with pytest.raises(ValueError):
+        table[0, 1] = 0.0
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+from math import comb
+
+import numpy as np
+
+from cvm1d.enumeration import enumerate_config_var_counts, obtain_fixed_count_patterns
+from cvm1d.grid import obtain_config_var_counts_batch
+
+
+def obtain_direct_histogram(array_size_list, x1_count=None):
+
+    total_nodes = array_size_list[0]*array_size_list[1]
+    patterns = np.array(list(itertools.product((0, 1), repeat=total_nodes)), dtype=np.int8)
+    if x1_count is not None:
+        patterns = patterns[patterns.sum(axis=1) == x1_count]
+    counts = obtain_config_var_counts_batch(patterns, array_size_list)
+    config_var_counts, multiplicities = np.unique(counts, axis=0, return_counts=True)
+
+    return(config_var_counts, multiplicities)
+
+
+def test_enumeration_matches_direct_counts():
+
+    for array_size_list in ((4, 2), (5, 2), (3, 4)):
+        total_nodes = array_size_list[0]*array_size_list[1]
+        for x1_count in [None] + list(range(total_nodes + 1)):
+            config_var_counts, multiplicities = enumerate_config_var_counts(array_size_list, x1_count,
+                                                                            patterns_per_chunk=37)
+            order = np.lexsort(config_var_counts.T[::-1])
+            direct_counts, direct_multiplicities = obtain_direct_histogram(array_size_list, x1_count)
+            assert np.array_equal(config_var_counts[order], direct_counts)
+            assert np.array_equal(multiplicities[order], direct_multiplicities)
+
+
+def test_enumeration_with_workers_matches_one_process():
+
+    for x1_count in (None, 5):
+        config_var_counts, multiplicities = enumerate_config_var_counts((6, 2), x1_count, patterns_per_chunk=50,
+                                                                        max_workers=2)
+        one_process_counts, one_process_multiplicities = enumerate_config_var_counts((6, 2), x1_count)
+        assert np.array_equal(config_var_counts, one_process_counts)
+        assert np.array_equal(multiplicities, one_process_multiplicities)
+
+
+def test_fixed_count_patterns_are_every_combination_once():
+
+    total_nodes = 9
+    for x1_count in range(total_nodes + 1):
+        num_patterns = comb(total_nodes, x1_count)
+        activ = np.concatenate([obtain_fixed_count_patterns(total_nodes, x1_count, first_pattern,
+                                                            min(10, num_patterns - first_pattern))
+                                for first_pattern in range(0, num_patterns, 10)])
+        assert activ.shape == (num_patterns, total_nodes)
+        assert np.all(activ.sum(axis=1) == x1_count)
+        assert len(np.unique(activ, axis=0)) == num_patterns
+
+
+def test_out_of_range_x1_count_has_no_patterns():
+
+    config_var_counts, multiplicities = enumerate_config_var_counts((4, 2), 9)
+    assert config_var_counts.shape == (0, 12)
+    assert multiplicities.size == 0
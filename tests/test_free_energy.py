@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from cvm1d.free_energy import minimize_free_energy, minimize_free_energy_curve
+from cvm1d.free_energy import compute_enthalpy_sweep, compute_free_energy_sweep
+from cvm1d.grid import obtain_config_vars_batch
+from cvm1d.transfer_matrix import solve_transfer_matrix
+
+
+epsilon1_values = np.linspace(-2.0, 2.0, 21)
+
+
+def test_newton_matches_transfer_matrix():
+
+    for x1 in (None, 0.1, 0.35, 0.5):
+        fe_results = minimize_free_energy(epsilon1_values, x1)
+        tm_results = solve_transfer_matrix(epsilon1_values, x1)
+        assert np.all(fe_results['converged'])
+        assert np.allclose(fe_results['free_energy'], tm_results['free_energy'], rtol=0.0, atol=1.0e-9)
+        assert np.allclose(fe_results['config_vars'], tm_results['config_vars'], rtol=0.0, atol=1.0e-6)
+
+
+def test_warm_started_curve_matches_cold_starts():
+
+    for x1 in (None, 0.2):
+        epsilon1 = np.random.default_rng(3).permutation(epsilon1_values)
+        curve_results = minimize_free_energy_curve(epsilon1, x1)
+        fe_results = minimize_free_energy(epsilon1, x1)
+        assert np.all(curve_results['converged'])
+        assert np.allclose(curve_results['free_energy'], fe_results['free_energy'], rtol=0.0, atol=1.0e-10)
+        assert np.sum(curve_results['iterations']) <= np.sum(fe_results['iterations'])
+
+
+def test_pure_chains():
+
+    fe_results = minimize_free_energy(epsilon1_values, 1.0)
+    assert np.all(fe_results['converged'])
+    assert np.allclose(fe_results['free_energy'], 0.0)
+    assert np.allclose(fe_results['x1'], 1.0)
+
+
+# The sweep arrays against the loop of the original compute_free_energy, one eps1 at a time
+def test_free_energy_sweep_matches_scalar_loop(demo_script):
+
+    activ_batch = (np.random.default_rng(6).random((30, 24)) < 0.4).astype(np.int8)
+    config_vars_array = obtain_config_vars_batch(activ_batch, (12, 2))
+    epsilon1_array = np.linspace(-1.5, 1.0, 11)
+    enthalpy, free_energy = compute_free_energy_sweep(config_vars_array, epsilon1_array)
+    assert enthalpy.shape == free_energy.shape == (30, 11)
+    assert np.array_equal(compute_enthalpy_sweep(config_vars_array, epsilon1_array), enthalpy)
+
+    for config_num, config_vars_list in enumerate(config_vars_array.tolist()):
+        neg_entropy = demo_script.compute_neg_entropy(config_vars_list)
+        sum_z_enthalpy_terms = (config_vars_list[7]*0.5 + config_vars_list[8] + config_vars_list[9] +
+                                config_vars_list[10]*0.5)
+        for eps_num, epsilon1 in enumerate(epsilon1_array.tolist()):
+            assert abs(enthalpy[config_num, eps_num] - epsilon1*sum_z_enthalpy_terms) < 1.0e-14
+            assert abs(free_energy[config_num, eps_num] - (epsilon1*sum_z_enthalpy_terms + neg_entropy)) < 1.0e-14
+
+
+def test_compute_free_energy_prints_the_original_sweep(demo_script, capsys):
+
+    config_vars_list = obtain_config_vars_batch(demo_script.obtain_builtin_activations((12, 2))[None, :], (12, 2))[0]
+    neg_entropy = demo_script.compute_neg_entropy(list(config_vars_list))
+    demo_script.compute_free_energy(list(config_vars_list), neg_entropy)
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 50
+    assert lines[0].startswith('  When eps1 =  -0.000 ')
+    assert lines[49].startswith('  When eps1 =  -0.490 ')
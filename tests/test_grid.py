@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from cvm1d.grid import obtain_config_var_counts_batch, obtain_config_vars_batch, evaluate_activations
+from cvm1d.grid import validate_array_size_list
+from cvm1d.node_grid import obtain_node_grid, assign_local_config_vars_node_grid, obtain_config_var_counts_node_grid
+from cvm1d.patterns import obtain_builtin_activations
+
+
+# z number of each triplet read along the chain, with A = ON: AAA, AAB/BAA, ABA, BAB, ABB/BBA, BBB
+triplet_z_numbers = {'AAA': 1, 'AAB': 2, 'BAA': 2, 'ABA': 3, 'BAB': 4, 'ABB': 5, 'BBA': 5, 'BBB': 6}
+
+
+# The config var counts of one grid, walking each zigzag chain position by position
+def obtain_chain_walk_counts(activ, array_size_list):
+
+    array_length, array_layers = array_size_list
+    rows = np.asarray(activ).reshape(array_layers, array_length)
+    counts = np.zeros(12, dtype=np.int64)
+    for pair_num in range(array_layers//2):
+        chain = rows[2*pair_num:2*pair_num + 2].T.ravel().tolist()
+        for k in range(len(chain)):
+            this_activ, left_activ, left_left_activ = chain[k], chain[k - 1], chain[k - 2]
+            counts[2 - this_activ - left_activ] += 1
+            counts[5 - this_activ - left_left_activ] += 1
+            triplet = ''.join('A' if activ_value else 'B' for activ_value in (left_left_activ, left_activ, this_activ))
+            counts[5 + triplet_z_numbers[triplet]] += 1
+
+    return(counts)
+
+
+def test_batch_counts_match_chain_walk():
+
+    rng = np.random.default_rng(11)
+    for array_size_list in ((3, 2), (5, 2), (8, 4), (13, 6)):
+        total_nodes = array_size_list[0]*array_size_list[1]
+        activ_batch = (rng.random((40, total_nodes)) < rng.random((40, 1))).astype(np.int8)
+        batch_counts = obtain_config_var_counts_batch(activ_batch, array_size_list)
+        for activ, counts in zip(activ_batch, batch_counts):
+            assert np.array_equal(counts, obtain_chain_walk_counts(activ, array_size_list))
+
+
+def test_batch_blocks_do_not_change_counts():
+
+    array_size_list = (10, 2)
+    activ_batch = (np.random.default_rng(2).random((3000, 20)) < 0.4).astype(np.int8)
+    counts = obtain_config_var_counts_batch(activ_batch, array_size_list)
+    assert np.array_equal(obtain_config_var_counts_batch(activ_batch, array_size_list, grids_per_block=7), counts)
+    assert np.array_equal(counts.sum(axis=1), np.full(3000, 3*20))
+
+    config_vars = obtain_config_vars_batch(activ_batch, array_size_list, grids_per_block=64)
+    assert np.allclose(config_vars, counts/20.0, rtol=0.0, atol=1.0e-15)
+
+
+def test_evaluate_batch_matches_single_grids():
+
+    array_size_list = (9, 4)
+    activ_batch = (np.random.default_rng(4).random((25, 36)) < 0.5).astype(np.int8)
+    epsilon1 = np.array([-1.0, 0.0, 0.5])
+    batch_results = evaluate_activations(activ_batch, array_size_list, epsilon1)
+    assert batch_results['free_energy'].shape == (25, 3)
+    for grid_num, activ in enumerate(activ_batch):
+        single_results = evaluate_activations(activ, array_size_list, 0.5)
+        assert abs(single_results['free_energy'] - batch_results['free_energy'][grid_num, 2]) < 1.0e-14
+        assert abs(single_results['x1'] - activ.mean()) < 1.0e-15
+
+
+def test_grid_dimensions_are_checked():
+
+    assert validate_array_size_list((3, 2)) == (3, 2)
+    assert validate_array_size_list((np.int64(31), 8.0)) == (31, 8)
+    for array_size_list in ((2, 2), (12, 3), (12, 0), (12, -2), (12.5, 2)):
+        with pytest.raises(ValueError):
+            validate_array_size_list(array_size_list)
+
+
+def test_node_grid_of_any_size_matches_batch_counts(demo_script):
+
+    rng = np.random.default_rng(13)
+    for array_length, array_layers in ((3, 2), (7, 6), (31, 4)):
+        array_size_list = demo_script.obtain_array_size_list(array_length, array_layers)
+        node_grid = obtain_node_grid(array_size_list)
+        node_grid.activ[:] = (rng.random(array_length*array_layers) < 0.45).astype(np.int8)
+        node_grid = assign_local_config_vars_node_grid(node_grid, array_size_list)
+        assert np.array_equal(obtain_config_var_counts_node_grid(node_grid),
+                              obtain_chain_walk_counts(node_grid.activ, array_size_list))
+
+
+# The interactive demo on a 20 x 4 grid, driven through stdin as in a terminal session
+def test_demo_mode_runs_on_a_larger_grid():
+
+    demo_script_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    'simple-1D-CVM-w-turtle-1pt6pt0-2026-10-18.py')
+    completed = subprocess.run([sys.executable, demo_script_path, 'demo', '--length', '20', '--layers', '4'],
+                               input='0\n0\n1\n5\n', capture_output=True, text=True, timeout=120)
+    assert completed.returncode == 0
+    assert 'This grid has dimensions of  4 rows and  20  columns.' in completed.stdout
+    neg_entropy = evaluate_activations(obtain_builtin_activations((20, 4)), (20, 4))['neg_entropy']
+    assert ('Neg-Entropy for the original system is:  ' + '%.3f' % neg_entropy) in completed.stdout
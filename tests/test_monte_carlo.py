@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+
+import numpy as np
+
+from cvm1d.entropy import compute_neg_entropy_counts_array
+from cvm1d.grid import obtain_config_var_counts_batch, obtain_left_triplet_index
+from cvm1d.monte_carlo import obtain_swap_tables, obtain_swap_state, obtain_swap_state_activ
+from cvm1d.monte_carlo import swap_config_var_counts, run_swap_monte_carlo, evaluate_config_var_counts
+from cvm1d.annealing import anneal_activations
+from cvm1d.symmetry import ConfigVarCache
+from cvm1d.trajectory import TrajectoryRecorder
+
+
+def test_incremental_swap_matches_full_recount():
+
+    rng = np.random.default_rng(5)
+    for array_size_list in ((3, 2), (4, 2), (7, 4), (16, 6)):
+        array_length, array_layers = array_size_list
+        total_nodes = array_length*array_layers
+        activ = (rng.random(total_nodes) < 0.4).astype(np.int8)
+        swap_tables = obtain_swap_tables(array_size_list)
+        swap_state = obtain_swap_state(activ, array_size_list)
+        counts = obtain_config_var_counts_batch(activ[None, :], array_size_list)[0]
+
+    # Random pairs, including nodes with the same activation and a node swapped with itself
+        for node1_num, node2_num in rng.integers(0, total_nodes, (300, 2)).tolist():
+            delta_counts, delta_neg_entropy = swap_config_var_counts(swap_tables, swap_state, node1_num, node2_num)
+            activ[node1_num], activ[node2_num] = activ[node2_num], activ[node1_num]
+            new_counts = obtain_config_var_counts_batch(activ[None, :], array_size_list)[0]
+
+            assert np.array_equal(obtain_swap_state_activ(swap_state), activ)
+            assert swap_state['config_var_counts'] == new_counts.tolist()
+            assert delta_counts == (new_counts - counts).tolist()
+            assert list(swap_state['triplets']) == obtain_left_triplet_index(
+                activ.reshape(array_layers, array_length)).ravel().tolist()
+            assert np.isclose(delta_neg_entropy, compute_neg_entropy_counts_array(new_counts, total_nodes)
+                              - compute_neg_entropy_counts_array(counts, total_nodes), rtol=0.0, atol=1.0e-12)
+            counts = new_counts
+
+
+# On a grid this small every pair of nodes is close, so that their owning nodes overlap
+def test_every_swap_of_small_grid_matches_full_recount():
+
+    array_size_list = (4, 2)
+    swap_tables = obtain_swap_tables(array_size_list)
+    for pattern in range(1 << 8):
+        activ = ((pattern >> np.arange(8)) & 1).astype(np.int8)
+        for node1_num in range(8):
+            for node2_num in range(node1_num + 1, 8):
+                swap_state = obtain_swap_state(activ, array_size_list)
+                delta_counts = swap_config_var_counts(swap_tables, swap_state, node1_num, node2_num)[0]
+                swapped = activ.copy()
+                swapped[[node1_num, node2_num]] = activ[[node2_num, node1_num]]
+                counts = obtain_config_var_counts_batch(np.stack([activ, swapped]), array_size_list)
+                assert delta_counts == (counts[1] - counts[0]).tolist()
+
+
+# A cache changes where the counts come from, not the run; the final pattern of a run is kept in
+#   it, so that the next run from there (a tempering round, say) hits
+def test_runs_with_config_var_cache():
+
+    array_size_list = (400, 2)
+    activ = (np.random.default_rng(2).random(800) < 0.35).astype(np.int8)
+    config_var_cache = ConfigVarCache()
+    plain_results = run_swap_monte_carlo(activ, array_size_list, -0.5, 1.0, 5000, seed=4)
+    cached_results = run_swap_monte_carlo(activ, array_size_list, -0.5, 1.0, 5000, seed=4,
+                                          config_var_cache=config_var_cache)
+    assert np.array_equal(cached_results['activ'], plain_results['activ'])
+    assert np.array_equal(cached_results['config_var_counts'], plain_results['config_var_counts'])
+    assert (config_var_cache.hits, config_var_cache.misses, len(config_var_cache)) == (0, 1, 2)
+
+    run_swap_monte_carlo(np.roll(cached_results['activ'].reshape(2, 400), 3, axis=1), array_size_list, -0.5, 1.0, 0,
+                         config_var_cache=config_var_cache)
+    assert config_var_cache.hits == 1
+
+    annealing_results = anneal_activations(activ, array_size_list, -0.5, [1.0, 0.1], 2000, seed=1,
+                                           config_var_cache=config_var_cache)
+    assert config_var_cache.hits == 2
+    best_counts = obtain_config_var_counts_batch(annealing_results['activ'][None, :], array_size_list)[0]
+    assert np.array_equal(config_var_cache.obtain_config_var_counts(annealing_results['activ'], array_size_list),
+                          best_counts)
+
+
+def test_monte_carlo_run_keeps_x1_and_exact_counts():
+
+    array_size_list = (30, 4)
+    activ = (np.random.default_rng(8).random(120) < 0.3).astype(np.int8)
+    mc_results = run_swap_monte_carlo(activ, array_size_list, -0.75, 0.5, 20000, seed=12)
+    final_counts = obtain_config_var_counts_batch(mc_results['activ'][None, :], array_size_list)[0]
+    assert np.array_equal(mc_results['config_var_counts'], final_counts)
+    assert mc_results['activ'].sum() == activ.sum()
+    assert 0 < mc_results['accepted_moves'] < 20000
+
+    repeat_results = run_swap_monte_carlo(activ, array_size_list, -0.75, 0.5, 20000, seed=12)
+    assert np.array_equal(repeat_results['activ'], mc_results['activ'])
+    assert repeat_results['accepted_moves'] == mc_results['accepted_moves']
+
+    initial_free_energy = evaluate_config_var_counts(obtain_config_var_counts_batch(activ[None, :], array_size_list)[0],
+                                                     120, -0.75)['free_energy']
+    quench_results = run_swap_monte_carlo(activ, array_size_list, -0.75, 0.0, 5000, seed=3)
+    assert quench_results['free_energy'] <= initial_free_energy
+
+
+# On a small grid the visited patterns follow exp(-total_nodes*free_energy/temperature); the
+#   patterns are grouped by free energy, each group weighted by its number of patterns
+def test_monte_carlo_samples_the_boltzmann_distribution():
+
+    array_size_list = (4, 2)
+    epsilon1, temperature = -1.0, 1.0
+    patterns = np.array([pattern for pattern in itertools.product((0, 1), repeat=8) if sum(pattern) == 3],
+                        dtype=np.int8)
+    free_energies = np.array([evaluate_config_var_counts(counts, 8, epsilon1)['free_energy']
+                              for counts in obtain_config_var_counts_batch(patterns, array_size_list)])
+    levels, level_of_pattern = np.unique(np.round(free_energies, 9), return_inverse=True)
+    weights = np.bincount(level_of_pattern)*np.exp(-8*levels/temperature)
+    expected = weights/weights.sum()
+
+    recorder = TrajectoryRecorder(array_size_list, record_every=3, capacity=20000)
+    run_swap_monte_carlo(patterns[0], array_size_list, epsilon1, temperature, 60000, seed=6, recorder=recorder)
+    visited = np.array([activ_rows.ravel() for move_num, activ_rows in recorder.iter_snapshots()], dtype=np.int8)
+    visited_energies = np.array([evaluate_config_var_counts(counts, 8, epsilon1)['free_energy']
+                                 for counts in obtain_config_var_counts_batch(visited, array_size_list)])
+    observed = np.bincount(np.searchsorted(levels, np.round(visited_energies, 9)), minlength=levels.size)
+    assert np.allclose(observed/float(observed.sum()), expected, atol=0.02)
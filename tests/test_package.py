@@ -0,0 +1,21 @@
+import subprocess
+import sys
+
+import cvm1d
+
+
+def test_importing_one_submodule_does_not_load_the_rest():
+
+    probe = "import sys, cvm1d.grid; print(' '.join(m for m in sys.modules if m.startswith('cvm1d')))"
+    loaded = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True,
+                            cwd=cvm1d.__path__[0] + '/..').stdout.split()
+    assert 'cvm1d.grid' in loaded
+    for submodule in ('swaps', 'monte_carlo', 'enumeration', 'render', 'symmetry', 'replicas'):
+        assert 'cvm1d.' + submodule not in loaded
+
+
+def test_every_api_name_resolves():
+
+    for name in cvm1d.__all__:
+        assert getattr(cvm1d, name).__module__.startswith('cvm1d.')
+    assert set(cvm1d.__all__) <= set(dir(cvm1d))
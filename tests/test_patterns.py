@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from cvm1d.patterns import obtain_shifted_patterns, obtain_random_patterns, obtain_block_patterns
+from cvm1d.patterns import obtain_alternating_patterns, obtain_cluster_patterns, obtain_template_patterns
+from cvm1d.patterns import obtain_builtin_activations
+
+
+# The position of each node in the sequence of chain positions: U[0], D[0], U[1], D[1], ... for the
+#   first pair of rows, then the next pair
+def obtain_sequence_positions(array_size_list):
+
+    array_length, array_layers = array_size_list
+    rows, cols = np.divmod(np.arange(array_length*array_layers), array_length)
+
+    return(2*(array_length*(rows//2) + cols) + rows % 2)
+
+
+# The base sequence read at each node, moved shift positions along the sequence, one node at a time
+def obtain_shifted_reference(base_sequence, shifts, array_size_list):
+
+    positions = obtain_sequence_positions(array_size_list)
+    total_nodes = positions.size
+
+    return(np.array([[base_sequence[(position + shift) % total_nodes] for position in positions.tolist()]
+                     for shift in shifts], dtype=np.int8))
+
+
+def test_shifted_patterns_match_node_by_node_reference():
+
+    rng = np.random.default_rng(21)
+    for array_size_list in ((3, 2), (7, 2), (5, 6), (12, 4)):
+        total_nodes = array_size_list[0]*array_size_list[1]
+        base_sequence = rng.integers(0, 2, total_nodes, dtype=np.int8)
+        shifts = np.concatenate((np.arange(-total_nodes, 2*total_nodes), [5*total_nodes + 1]))
+        assert np.array_equal(obtain_shifted_patterns(base_sequence, shifts, array_size_list),
+                              obtain_shifted_reference(base_sequence, shifts, array_size_list))
+    with pytest.raises(ValueError):
+        obtain_shifted_patterns(np.zeros(13, dtype=np.int8), [0], (7, 2))
+
+
+def test_builtin_activations():
+
+    rows = obtain_builtin_activations((11, 2)).reshape(2, 11)
+    assert np.flatnonzero(rows[0]).tolist() == [0, 1, 2, 4, 5, 6, 8, 9, 10]
+    assert np.flatnonzero(rows[1]).tolist() == [0, 4, 8]
+    larger_rows = obtain_builtin_activations((20, 4)).reshape(4, 20)
+    assert np.array_equal(larger_rows[:2, :11], rows) and larger_rows.sum() == rows.sum()
+    assert np.array_equal(obtain_builtin_activations((5, 2)).reshape(2, 5), rows[:, :5])
+
+
+def test_random_patterns_have_exact_x1_counts():
+
+    x1 = np.linspace(0.0, 1.0, 9000)
+    activ = obtain_random_patterns(9000, (16, 6), x1, seed=1)
+    assert np.array_equal(activ.sum(axis=1), np.rint(x1*96))
+    assert np.array_equal(obtain_random_patterns(9000, (16, 6), x1, seed=1), activ)
+    for x1 in (-0.1, 1.2):
+        with pytest.raises(ValueError):
+            obtain_random_patterns(3, (16, 6), x1)
+
+
+# Two ON nodes out of six: each of the 15 patterns is equally likely (the 16-bit keys tie often here)
+def test_random_patterns_are_uniform():
+
+    activ = obtain_random_patterns(30000, (3, 2), 1.0/3.0, seed=2)
+    pattern_codes = activ.astype(np.int64) @ (1 << np.arange(6))
+    frequencies = np.bincount(pattern_codes, minlength=64)[np.flatnonzero(np.bincount(pattern_codes, minlength=64))]
+    assert frequencies.size == 15
+    assert np.allclose(frequencies/30000.0, 1.0/15.0, atol=0.006)
+
+
+def test_block_and_alternating_patterns():
+
+    array_size_list = (10, 4)
+    on_lengths = np.array([1, 2, 3, 0, 5])
+    off_lengths = np.array([1, 3, 0, 2, 5])
+    phases = np.array([0, 1, 7, 2, -3])
+    activ = obtain_block_patterns(5, array_size_list, on_lengths, off_lengths, phases)
+    for pattern_num in range(5):
+        block = [1]*on_lengths[pattern_num] + [0]*off_lengths[pattern_num]
+        base_sequence = np.resize(block, 40)
+        assert np.array_equal(activ[pattern_num],
+                              obtain_shifted_reference(base_sequence, [-phases[pattern_num]], array_size_list)[0])
+
+    alternating = obtain_alternating_patterns(2, array_size_list, [0, 1]).reshape(2, 4, 10)
+    assert np.all(alternating[0, 0::2] == 1) and np.all(alternating[0, 1::2] == 0)
+    assert np.array_equal(alternating[1], 1 - alternating[0])
+    with pytest.raises(ValueError):
+        obtain_block_patterns(1, array_size_list, 0, 0)
+
+
+# A cluster is one run of consecutive sequence positions, centred unless a start is given
+def test_cluster_patterns():
+
+    array_size_list = (9, 4)
+    positions = obtain_sequence_positions(array_size_list)
+    x1 = np.array([0.0, 0.25, 0.5, 1.0])
+    activ = obtain_cluster_patterns(4, array_size_list, x1)
+    for pattern_num, x1_count in enumerate(np.rint(x1*36).astype(int).tolist()):
+        start = (36 - x1_count)//2
+        assert np.array_equal(np.sort(positions[activ[pattern_num] == 1]), np.arange(start, start + x1_count))
+
+    wrapped = obtain_cluster_patterns(1, array_size_list, 0.25, start=32)[0]
+    assert np.array_equal(np.sort(positions[wrapped == 1]), [0, 1, 2, 3, 4, 32, 33, 34, 35])
+
+
+def test_template_patterns():
+
+    array_size_list = (6, 2)
+    template = [1, 1, 0, 1, 0]
+    tiled = obtain_template_patterns(3, array_size_list, template, phase=[0, 2, 11])
+    placed = obtain_template_patterns(3, array_size_list, template, phase=[0, 2, 11], tile=False)
+    once = np.zeros(12, dtype=np.int8)
+    once[:5] = template
+    for pattern_num, phase in enumerate((0, 2, 11)):
+        assert np.array_equal(tiled[pattern_num],
+                              obtain_shifted_reference(np.resize(template, 12), [-phase], array_size_list)[0])
+        assert np.array_equal(placed[pattern_num], obtain_shifted_reference(once, [-phase], array_size_list)[0])
+    assert np.array_equal(obtain_template_patterns(1, array_size_list, [1]*20, tile=False), np.ones((1, 12)))
+    for template in ([], [0, 2, 1]):
+        with pytest.raises(ValueError):
+            obtain_template_patterns(1, array_size_list, template)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+import struct
+import xml.etree.ElementTree as ElementTree
+import zlib
+
+import numpy as np
+import pytest
+
+from cvm1d.render import render_turtle_grid_indexed, render_turtle_grid_image, render_turtle_grid_file, write_png_rows
+from cvm1d.render import palette_colours, turtle_colour_indices, box_pitch, box_size, pen_size, picture_margin
+
+
+# A before/after turtle_grid_list with every colour code: random activations, and two swapped nodes
+def obtain_test_turtle_grid_list(array_size_list, seed):
+
+    array_size = array_size_list[0]*array_size_list[1]
+    rng = np.random.default_rng(seed)
+    original = rng.integers(0, 2, array_size)
+    revised = original.copy()
+    node1_num, node2_num = np.flatnonzero(original == 1)[0], np.flatnonzero(original == 0)[0]
+    revised[node1_num], revised[node2_num] = 2, 3
+
+    return(original.tolist() + revised.tolist())
+
+
+# The chunks of a PNG file as (type, data), after checking the signature and each CRC
+def read_png_chunks(path):
+
+    with open(path, 'rb') as png_file:
+        png_bytes = png_file.read()
+    assert png_bytes[:8] == b'\x89PNG\r\n\x1a\n'
+    chunks = list()
+    offset = 8
+    while offset < len(png_bytes):
+        length, chunk_type = struct.unpack('>I4s', png_bytes[offset:offset + 8])
+        data = png_bytes[offset + 8:offset + 8 + length]
+        assert struct.unpack('>I', png_bytes[offset + 8 + length:offset + 12 + length])[0] == \
+            zlib.crc32(chunk_type + data) & 0xFFFFFFFF
+        chunks.append((chunk_type, data))
+        offset = offset + 12 + length
+
+    return(chunks)
+
+
+def read_png_image(path):
+
+    chunks = read_png_chunks(path)
+    assert chunks[0][0] == b'IHDR' and chunks[-1] == (b'IEND', b'')
+    width, height, bit_depth, colour_type, compression, filtering, interlace = struct.unpack('>IIBBBBB', chunks[0][1])
+    assert (bit_depth, colour_type, compression, filtering, interlace) == (8, 2, 0, 0, 0)
+    scanlines = np.frombuffer(zlib.decompress(b''.join(data for chunk_type, data in chunks if chunk_type == b'IDAT')),
+                              dtype=np.uint8).reshape(height, 1 + 3*width)
+    assert np.all(scanlines[:, 0] == 0)
+
+    return(scanlines[:, 1:].reshape(height, width, 3))
+
+
+def test_png_file_holds_the_rendered_image(tmp_path):
+
+    for array_size_list, scale in (((11, 2), 1.0), ((7, 4), 0.5), ((3, 6), 1.3)):
+        turtle_grid_list = obtain_test_turtle_grid_list(array_size_list, sum(array_size_list))
+        image = render_turtle_grid_image(turtle_grid_list, array_size_list, scale)
+        png_path = tmp_path / 'grid.png'
+        render_turtle_grid_file(png_path, turtle_grid_list, array_size_list, scale)
+        assert np.array_equal(read_png_image(png_path), image)
+
+
+# Each node is a box of its outline colour, with its fill colour inside the pen; the revised grid
+#   is on top, and every odd row is shifted half a pitch to the right
+def test_boxes_are_drawn_where_turtle_grid_draws_them():
+
+    array_size_list = (9, 4)
+    array_length, array_layers = array_size_list
+    turtle_grid_list = obtain_test_turtle_grid_list(array_size_list, 3)
+    image = render_turtle_grid_indexed(turtle_grid_list, array_size_list)
+    assert image.shape == (2*picture_margin + (2*array_layers + 2)*box_pitch,
+                           2*picture_margin + array_length*box_pitch + box_pitch//2)
+
+    for grid_num in (0, 1):
+        for row_num in range(array_layers):
+            for col in range(array_length):
+                code = turtle_grid_list[grid_num*array_length*array_layers + row_num*array_length + col]
+                outline, fill = turtle_colour_indices[code]
+                picture_row = row_num if grid_num == 1 else array_layers + 2 + row_num
+                top = picture_margin + picture_row*box_pitch
+                left = picture_margin + col*box_pitch + (box_pitch//2 if row_num % 2 == 1 else 0)
+                box = image[top:top + box_size + pen_size, left:left + box_size + pen_size]
+                assert np.all(box[:pen_size] == outline) and np.all(box[:, -pen_size:] == outline)
+                assert np.all(box[pen_size:-pen_size, pen_size:-pen_size] == fill)
+    assert set(np.unique(image).tolist()) == {0, 1, 2, 3}
+
+    with pytest.raises(ValueError):
+        render_turtle_grid_indexed(turtle_grid_list[:-1], array_size_list)
+
+
+def test_png_rows_written_in_blocks(tmp_path):
+
+    image = render_turtle_grid_image(obtain_test_turtle_grid_list((6, 2), 1), (6, 2))
+    png_path = tmp_path / 'blocks.png'
+    write_png_rows(png_path, image.shape[1], image.shape[0], np.array_split(image, 7))
+    assert np.array_equal(read_png_image(png_path), image)
+    with pytest.raises(ValueError):
+        write_png_rows(png_path, image.shape[1], image.shape[0] + 1, [image])
+
+
+def test_svg_file_has_one_rect_per_box(tmp_path):
+
+    array_size_list = (5, 2)
+    turtle_grid_list = obtain_test_turtle_grid_list(array_size_list, 4)
+    svg_path = tmp_path / 'grid.svg'
+    render_turtle_grid_file(svg_path, turtle_grid_list, array_size_list, scale=2.0)
+    svg_root = ElementTree.parse(svg_path).getroot()
+    image = render_turtle_grid_indexed(turtle_grid_list, array_size_list)
+    assert (float(svg_root.get('width')), float(svg_root.get('height'))) == (2.0*image.shape[1], 2.0*image.shape[0])
+
+    rects = svg_root.findall('{http://www.w3.org/2000/svg}rect')[1:]
+    assert len(rects) == 2*10
+    for rect in rects:
+        x, y = float(rect.get('x')), float(rect.get('y'))
+        row, col = int(y - pen_size/2.0), int(x - pen_size/2.0)
+        outline, fill = image[row, col], image[row + box_size//2, col + box_size//2]
+        assert rect.get('stroke') == 'rgb(%d,%d,%d)' % tuple(palette_colours[outline].tolist())
+        assert rect.get('fill') == 'rgb(%d,%d,%d)' % tuple(palette_colours[fill].tolist())
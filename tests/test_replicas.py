@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+
+import numpy as np
+import pytest
+
+from cvm1d.grid import obtain_config_var_counts_batch
+from cvm1d.monte_carlo import evaluate_config_var_counts, run_swap_monte_carlo
+from cvm1d.replicas import obtain_random_replica_activations, run_replica_monte_carlo
+from cvm1d.trajectory import TrajectoryRecorder
+
+
+def test_replica_counts_match_recount():
+
+    activ = obtain_random_replica_activations(60, 25, np.linspace(0.1, 0.9, 60), seed=2)
+    x1_counts = activ.reshape(60, -1).sum(axis=-1)
+    replica_results = run_replica_monte_carlo(activ, np.linspace(-2.0, 2.0, 60), np.linspace(0.0, 2.0, 60), 400,
+                                              seed=5)
+    final_activ = replica_results['activ'].reshape(60, -1)
+    assert np.array_equal(final_activ.sum(axis=-1), x1_counts)
+    assert np.array_equal(replica_results['config_var_counts'], obtain_config_var_counts_batch(final_activ, (25, 2)))
+    for replica, counts in enumerate(replica_results['config_var_counts']):
+        free_energy = evaluate_config_var_counts(counts, 50, replica_results['epsilon1'][replica])['free_energy']
+        assert abs(replica_results['free_energy'][replica] - free_energy) < 1.0e-12
+
+
+def test_replicas_at_zero_temperature_never_go_up():
+
+    activ = obtain_random_replica_activations(40, 30, 0.4, seed=3)
+    start_results = run_replica_monte_carlo(activ, -1.0, 0.0, 0, seed=1)
+    assert start_results['moves_per_second'] == 0.0
+    replica_results = run_replica_monte_carlo(activ, -1.0, 0.0, 500, seed=1)
+    assert np.all(replica_results['free_energy'] <= start_results['free_energy'] + 1.0e-12)
+
+
+# Each replica is one Monte Carlo chain: on a 4 x 2 chain with three ON nodes, the final patterns of
+#   many replicas follow the Boltzmann weights of the free-energy levels, and their mean free energy
+#   is the time average of one single-chain run (two pairs of eps1 and temperature at once)
+def test_replicas_sample_the_single_chain_distribution():
+
+    array_size_list = (4, 2)
+    patterns = np.array([pattern for pattern in itertools.product((0, 1), repeat=8) if sum(pattern) == 3],
+                        dtype=np.int8)
+    pattern_counts = obtain_config_var_counts_batch(patterns, array_size_list)
+    num_replicas = 6000
+    epsilon1 = np.where(np.arange(num_replicas) % 2 == 0, -1.0, 1.0)
+    temperature = np.where(np.arange(num_replicas) % 2 == 0, 1.0, 0.5)
+    activ = np.broadcast_to(patterns[0].reshape(1, 2, 4), (num_replicas, 2, 4))
+    replica_results = run_replica_monte_carlo(activ, epsilon1, temperature, 200, seed=7)
+
+    for parity in (0, 1):
+        replica_free_energies = replica_results['free_energy'][parity::2]
+        level_free_energies = np.array([evaluate_config_var_counts(counts, 8, epsilon1[parity])['free_energy']
+                                        for counts in pattern_counts])
+        levels, level_of_pattern = np.unique(np.round(level_free_energies, 9), return_inverse=True)
+        weights = np.bincount(level_of_pattern)*np.exp(-8*levels/temperature[parity])
+        expected = weights/weights.sum()
+        observed = np.bincount(np.searchsorted(levels, np.round(replica_free_energies, 9)), minlength=levels.size)
+        assert np.allclose(observed/float(observed.sum()), expected, atol=0.03)
+
+        recorder = TrajectoryRecorder(array_size_list, record_every=3, capacity=20000)
+        run_swap_monte_carlo(patterns[0], array_size_list, epsilon1[parity], temperature[parity], 60000,
+                             seed=parity, recorder=recorder)
+        visited = np.array([activ_rows.ravel() for move_num, activ_rows in recorder.iter_snapshots()], dtype=np.int8)
+        visited_energies = [evaluate_config_var_counts(counts, 8, epsilon1[parity])['free_energy']
+                            for counts in obtain_config_var_counts_batch(visited, array_size_list)]
+        assert abs(np.mean(replica_free_energies) - np.mean(visited_energies)) < 0.01
+
+
+def test_replicas_need_both_node_states():
+
+    activ = obtain_random_replica_activations(3, 10, 0.5, seed=0)
+    activ[1] = 0
+    with pytest.raises(ValueError):
+        run_replica_monte_carlo(activ, 0.0, 1.0, 10, seed=0)
+    with pytest.raises(ValueError):
+        run_replica_monte_carlo(activ[0], 0.0, 1.0, 10, seed=0)
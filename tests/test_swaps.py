@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from cvm1d.entropy import compute_neg_entropy_counts_array
+from cvm1d.grid import obtain_config_var_counts_batch
+from cvm1d.monte_carlo import evaluate_config_var_counts
+from cvm1d.node_grid import obtain_node_grid, assign_local_config_vars_node_grid, obtain_config_var_counts_node_grid
+from cvm1d.patterns import obtain_builtin_activations
+from cvm1d.swaps import obtain_swap_deltas_base, obtain_swap_impact_matrix, obtain_best_swaps
+
+
+# The neg-entropy and free-energy changes of swapping each ON node with each OFF node, by
+#   counting every swapped pattern outright
+def obtain_brute_force_impact(activ, array_size_list, epsilon1):
+
+    total_nodes = array_size_list[0]*array_size_list[1]
+    on_nodes = np.flatnonzero(activ == 1)
+    off_nodes = np.flatnonzero(activ == 0)
+    node1_nums = np.repeat(on_nodes, off_nodes.size)
+    node2_nums = np.tile(off_nodes, on_nodes.size)
+    swapped = np.repeat(activ[None, :], node1_nums.size, axis=0)
+    swapped[np.arange(node1_nums.size), node1_nums] = 0
+    swapped[np.arange(node1_nums.size), node2_nums] = 1
+
+    base_results = evaluate_config_var_counts(obtain_config_var_counts_batch(activ[None, :], array_size_list)[0],
+                                              total_nodes, epsilon1)
+    swapped_results = [evaluate_config_var_counts(counts, total_nodes, epsilon1)
+                       for counts in obtain_config_var_counts_batch(swapped, array_size_list)]
+    shape = (on_nodes.size, off_nodes.size)
+    delta_neg_entropy = np.array([results['neg_entropy'] for results in swapped_results]) - base_results['neg_entropy']
+    delta_free_energy = np.array([results['free_energy'] for results in swapped_results]) - base_results['free_energy']
+
+    return(node1_nums, node2_nums, delta_neg_entropy.reshape(shape), delta_free_energy.reshape(shape))
+
+
+def test_swap_impact_matrix_matches_brute_force():
+
+    rng = np.random.default_rng(11)
+    for array_size_list, x1 in (((3, 2), 0.5), ((8, 2), 0.25), ((10, 4), 0.4), ((40, 2), 0.35)):
+        total_nodes = array_size_list[0]*array_size_list[1]
+        activ = np.zeros(total_nodes, dtype=np.int8)
+        activ[rng.permutation(total_nodes)[:round(x1*total_nodes)]] = 1
+        for epsilon1 in (-1.0, 0.0, 0.75):
+            swap_impact = obtain_swap_impact_matrix(activ, array_size_list, epsilon1)
+            delta_neg_entropy, delta_free_energy = obtain_brute_force_impact(activ, array_size_list, epsilon1)[2:]
+            assert np.allclose(swap_impact['delta_neg_entropy'], delta_neg_entropy, rtol=0.0, atol=1.0e-12)
+            assert np.allclose(swap_impact['delta_free_energy'], delta_free_energy, rtol=0.0, atol=1.0e-12)
+
+
+def test_best_swaps_match_brute_force_ranking():
+
+    rng = np.random.default_rng(12)
+    array_size_list = (30, 2)
+    activ = np.zeros(60, dtype=np.int8)
+    activ[rng.permutation(60)[:21]] = 1
+    node1_nums, node2_nums, delta_neg_entropy, delta_free_energy = obtain_brute_force_impact(activ, array_size_list,
+                                                                                              -0.5)
+    pair_values = {'neg_entropy': dict(zip(zip(node1_nums.tolist(), node2_nums.tolist()), delta_neg_entropy.ravel())),
+                   'free_energy': dict(zip(zip(node1_nums.tolist(), node2_nums.tolist()), delta_free_energy.ravel()))}
+    for rank_by in ('free_energy', 'neg_entropy'):
+        for num_best in (1, 10, 100):
+            best_swaps = obtain_best_swaps(activ, array_size_list, -0.5, num_best, rank_by)
+            brute_values = np.sort(np.array(list(pair_values[rank_by].values())))[:num_best]
+            best_pairs = list(zip(best_swaps['node1_nums'].tolist(), best_swaps['node2_nums'].tolist()))
+            assert len(set(best_pairs)) == num_best
+            assert np.allclose(best_swaps['delta_' + rank_by], brute_values, rtol=0.0, atol=1.0e-12)
+            assert np.allclose([pair_values[rank_by][pair] for pair in best_pairs], brute_values,
+                               rtol=0.0, atol=1.0e-12)
+            assert best_swaps['num_pairs'] == node1_nums.size
+
+
+# With four or fewer OFF (or ON) nodes per window, a row of the swap matrix can be all near pairs
+def test_best_swaps_of_nearly_full_and_nearly_empty_chains():
+
+    rng = np.random.default_rng(14)
+    for num_odd in (1, 2, 3, 4):
+        for nearly_full in (True, False):
+            activ = np.full(40, 1 if nearly_full else 0, dtype=np.int8)
+            activ[rng.permutation(40)[:num_odd]] = 0 if nearly_full else 1
+            delta_free_energy = obtain_brute_force_impact(activ, (20, 2), 0.5)[3]
+            for num_best in (1, 3, 10, delta_free_energy.size):
+                best_swaps = obtain_best_swaps(activ, (20, 2), 0.5, num_best)
+                assert best_swaps['delta_free_energy'].size == num_best
+                assert np.allclose(best_swaps['delta_free_energy'], np.sort(delta_free_energy.ravel())[:num_best],
+                                   rtol=0.0, atol=1.0e-12)
+
+
+def test_base_swap_deltas_match_brute_force():
+
+    rng = np.random.default_rng(13)
+    array_size_list = (7, 4)
+    activ = rng.integers(0, 2, 28, dtype=np.int8)
+    node1_nums, node2_nums = rng.integers(0, 28, (2, 500))
+    delta_counts, delta_neg_entropy, swapped = obtain_swap_deltas_base(activ, node1_nums, node2_nums, array_size_list)
+
+    swapped_activ = np.repeat(activ[None, :], 500, axis=0)
+    swapped_activ[np.arange(500), node1_nums] = activ[node2_nums]
+    swapped_activ[np.arange(500), node2_nums] = activ[node1_nums]
+    counts = obtain_config_var_counts_batch(np.concatenate((activ[None, :], swapped_activ)), array_size_list)
+    assert np.array_equal(delta_counts, counts[1:] - counts[0])
+    assert np.array_equal(swapped, activ[node1_nums] != activ[node2_nums])
+
+
+def test_read_swap_pairs_skips_comments_and_commas(demo_script):
+
+    swap_text = '# node1 node2\n0 5\n3,4  # nearby\n\n7 , 1\n'
+    node1_nums, node2_nums = demo_script.read_swap_pairs(io.StringIO(swap_text), (4, 2))
+    assert node1_nums.tolist() == [0, 3, 7] and node2_nums.tolist() == [5, 4, 1]
+    for swap_text in ('0 5\n3\n', '0 8\n', '-1 2\n'):
+        with pytest.raises(ValueError):
+            demo_script.read_swap_pairs(io.StringIO(swap_text), (4, 2))
+
+
+# In sequence mode each delta is relative to the grid left by the swaps before it
+def test_sequence_swap_deltas_match_recount(demo_script):
+
+    rng = np.random.default_rng(15)
+    array_size_list = (9, 4)
+    node_grid = obtain_node_grid(array_size_list)
+    node_grid.activ[:] = rng.integers(0, 2, 36, dtype=np.int8)
+    node_grid = assign_local_config_vars_node_grid(node_grid, array_size_list)
+    node1_nums, node2_nums = rng.integers(0, 36, (2, 300))
+
+    activ_sequence = [node_grid.activ.copy()]
+    for node1_num, node2_num in zip(node1_nums, node2_nums):
+        activ = activ_sequence[-1].copy()
+        activ[[node1_num, node2_num]] = activ[[node2_num, node1_num]]
+        activ_sequence.append(activ)
+    counts = obtain_config_var_counts_batch(np.array(activ_sequence), array_size_list)
+    neg_entropy = compute_neg_entropy_counts_array(counts, 36)
+
+    delta_counts, delta_neg_entropy, swapped = demo_script.apply_swaps_sequence(node_grid, array_size_list,
+                                                                                node1_nums, node2_nums)
+    assert np.array_equal(delta_counts, np.diff(counts, axis=0))
+    assert np.allclose(delta_neg_entropy, np.diff(neg_entropy), rtol=0.0, atol=1.0e-12)
+    assert np.array_equal(swapped, np.array([activ[node1_num] != activ[node2_num] for activ, node1_num, node2_num
+                                             in zip(activ_sequence, node1_nums, node2_nums)]))
+    assert np.array_equal(node_grid.activ, activ_sequence[-1])
+    assert np.array_equal(obtain_config_var_counts_node_grid(node_grid), counts[-1])
+
+
+# The swaps subcommand in base mode, reading from stdin and writing one line per swap
+def test_swaps_command_writes_base_deltas():
+
+    demo_script_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    'simple-1D-CVM-w-turtle-1pt6pt0-2026-10-18.py')
+    completed = subprocess.run([sys.executable, demo_script_path, 'swaps', '--against', 'base', '--length', '12',
+                                '--layers', '2'], input='0 1\n0, 12\n2 3\n', capture_output=True, text=True,
+                               timeout=120)
+    assert completed.returncode == 0
+    output_lines = completed.stdout.splitlines()
+    assert output_lines[0] == '# total_nodes 24'
+    rows = np.array([line.split() for line in output_lines[2:]], dtype=float)
+
+    activ = obtain_builtin_activations((12, 2))
+    delta_counts, delta_neg_entropy, swapped = obtain_swap_deltas_base(activ, np.array([0, 0, 2]),
+                                                                       np.array([1, 12, 3]), (12, 2))
+    assert np.array_equal(rows[:, :4], [[0, 0, 1, 0], [1, 0, 12, 0], [2, 2, 3, 1]])
+    assert np.array_equal(rows[:, 3], swapped)
+    assert np.array_equal(rows[:, 4:16], delta_counts)
+    assert np.allclose(rows[:, 16], delta_neg_entropy, rtol=0.0, atol=1.0e-11)
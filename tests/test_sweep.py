@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from cvm1d.grid import obtain_random_activations, obtain_config_vars_batch
+
+
+def run_sweep(demo_script, num_moves, max_workers):
+
+    sweep_tasks = demo_script.obtain_sweep_tasks(np.linspace(-1.0, 1.0, 3), [0.3, 0.5], [0, 1], [40],
+                                                 num_moves=num_moves)
+    sweep_results = sorted(demo_script.run_parallel_sweep(sweep_tasks, max_workers),
+                           key=lambda sweep_result: sweep_result['task_num'])
+
+    return(sweep_results)
+
+
+def test_sweep_results_do_not_depend_on_the_workers(demo_script):
+
+    for num_moves in (0, 500):
+        one_worker = run_sweep(demo_script, num_moves, 1)
+        three_workers = run_sweep(demo_script, num_moves, 3)
+        assert [result['task_num'] for result in one_worker] == list(range(12))
+        for result1, result3 in zip(one_worker, three_workers):
+            assert result1['config_vars_list'] == result3['config_vars_list']
+            assert result1['free_energy'] == result3['free_energy']
+            assert result1['accepted_moves'] == result3['accepted_moves']
+
+
+# The grid of a task comes from the first child of its seed (the moves from the second)
+def test_sweep_task_grid_comes_from_its_grid_seed(demo_script):
+
+    sweep_task = demo_script.obtain_sweep_tasks([0.0], [0.5], [7], [40], num_moves=0)[0]
+    grid_seed = np.random.SeedSequence(7).spawn(2)[0]
+    activ = obtain_random_activations((40, 2), 0.5, grid_seed)
+    config_vars = obtain_config_vars_batch(activ[None, :], (40, 2))[0]
+    sweep_result = demo_script.run_sweep_task(sweep_task)
+    assert np.allclose(sweep_result['config_vars_list'], config_vars, rtol=0.0, atol=1.0e-15)
+
+
+# Groups whose grids are shifted, reflected or A/B-exchanged copies of one grid share the cache of
+#   the worker process, so only the first group counts its grid
+def test_symmetric_grids_hit_the_process_cache(demo_script):
+
+    array_length = 300
+    grid = obtain_random_activations((array_length, 2), 0.4, 5).reshape(2, array_length)
+    copies = [grid, np.roll(grid, 11, axis=1), grid[::-1, ::-1], np.stack([grid[1], np.roll(grid[0], -1)]),
+              1 - grid]
+    sweep_tasks = list()
+    for copy_num, activ in enumerate(copies):
+        for epsilon1 in (-0.5, 0.5):
+            sweep_tasks.append({'task_num': len(sweep_tasks), 'epsilon1': epsilon1, 'x1': float(activ.mean()),
+                                'seed': 0, 'array_length': array_length, 'num_moves': 0, 'temperature': 1.0,
+                                'cache_entries': 16, 'activ': activ.ravel().tolist()})
+    sweep_results = sorted(demo_script.run_parallel_sweep(sweep_tasks, 1), key=lambda result: result['task_num'])
+
+    cache_stats = max((result['cache_stats'] for result in sweep_results),
+                      key=lambda cache_stats: cache_stats['hits'] + cache_stats['misses'])
+    assert (cache_stats['hits'], cache_stats['misses'], cache_stats['entries']) == (9, 1, 1)
+    config_vars = obtain_config_vars_batch(np.stack([copy.ravel() for copy in copies]), (array_length, 2))
+    for result in sweep_results:
+        assert np.allclose(result['config_vars_list'], config_vars[result['task_num']//2], rtol=0.0, atol=1.0e-15)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+
+import numpy as np
+
+from cvm1d.grid import obtain_config_var_counts_batch
+from cvm1d.symmetry import obtain_canonical_key, ConfigVarCache, complement_count_order
+from cvm1d.symmetry import obtain_least_rotation, obtain_least_rotation_array
+
+
+def obtain_all_patterns(array_size_list):
+
+    total_nodes = array_size_list[0]*array_size_list[1]
+    patterns = np.array(list(itertools.product((0, 1), repeat=total_nodes)), dtype=np.int8)
+
+    return(patterns)
+
+
+# The patterns reached from activ by the symmetries of the zigzag chain, applied directly: moves
+#   along each chain, reflection of each chain, reordering of the chains, and A/B exchange
+def obtain_symmetric_patterns(activ, array_size_list):
+
+    array_length, array_layers = array_size_list
+    num_chains = array_layers//2
+    chains = activ.reshape(num_chains, 2, array_length).transpose(0, 2, 1).reshape(num_chains, -1)
+    chain_images = [set() for chain in chains]
+    for chain, images in zip(chains, chain_images):
+        for sequence in (chain, chain[::-1]):
+            for shift in range(2*array_length):
+                images.add(tuple(np.roll(sequence, shift).tolist()))
+
+    symmetric_patterns = set()
+    for order in itertools.permutations(range(num_chains)):
+        for images in itertools.product(*[chain_images[chain_num] for chain_num in order]):
+            image_chains = np.array(images, dtype=np.int8)
+            pattern = image_chains.reshape(num_chains, array_length, 2).transpose(0, 2, 1).ravel()
+            symmetric_patterns.add(tuple(pattern.tolist()))
+            symmetric_patterns.add(tuple((1 - pattern).tolist()))
+
+    return(symmetric_patterns)
+
+
+def test_canonical_key_matches_exhaustive_orbits():
+
+    for array_size_list in ((3, 2), (4, 2), (3, 4)):
+        patterns = obtain_all_patterns(array_size_list)
+        keys = [obtain_canonical_key(pattern, array_size_list)[0] for pattern in patterns]
+        key_patterns = dict()
+        for pattern, key in zip(patterns.tolist(), keys):
+            key_patterns.setdefault(key, set()).add(tuple(pattern))
+        for pattern, key in zip(patterns, keys):
+            assert key_patterns[key] == obtain_symmetric_patterns(pattern, array_size_list)
+
+
+def test_cache_counts_match_direct_counts():
+
+    array_size_list = (4, 2)
+    patterns = obtain_all_patterns(array_size_list)
+    direct_counts = obtain_config_var_counts_batch(patterns, array_size_list)
+    config_var_cache = ConfigVarCache()
+    for pattern, counts in zip(patterns, direct_counts):
+        assert np.array_equal(config_var_cache.obtain_config_var_counts(pattern, array_size_list), counts)
+    assert config_var_cache.hits > 0
+    assert config_var_cache.hits + config_var_cache.misses == len(patterns)
+    assert config_var_cache.misses == len(config_var_cache)
+
+
+def test_complement_relabels_counts():
+
+    array_size_list = (5, 2)
+    activ = np.array([1, 1, 0, 1, 0, 0, 0, 1, 0, 0], dtype=np.int8)
+    counts = obtain_config_var_counts_batch(activ.reshape(1, -1), array_size_list)[0]
+    complement_counts = obtain_config_var_counts_batch((1 - activ).reshape(1, -1), array_size_list)[0]
+    assert np.array_equal(complement_counts, counts[complement_count_order])
+
+    key, complemented = obtain_canonical_key(activ, array_size_list)
+    complement_key, complement_complemented = obtain_canonical_key(1 - activ, array_size_list)
+    assert key == complement_key
+    assert complemented != complement_complemented
+
+    config_var_cache = ConfigVarCache()
+    config_var_cache.obtain_config_var_counts(activ, array_size_list)
+    assert np.array_equal(config_var_cache.obtain_config_var_counts(1 - activ, array_size_list), complement_counts)
+    assert config_var_cache.hits == 1
+
+
+def test_cache_hits_and_eviction():
+
+    array_size_list = (6, 2)
+    config_var_cache = ConfigVarCache(max_entries=2)
+    first, second, third = np.zeros((3, 12), dtype=np.int8)
+    first[0] = 1
+    second[:2] = 1
+    third[:3] = 1
+
+    for activ in (first, second, first, third, second):
+        config_var_cache.obtain_config_var_counts(activ, array_size_list)
+    cache_stats = config_var_cache.obtain_cache_stats()
+    assert len(config_var_cache) == 2
+    assert (cache_stats['hits'], cache_stats['misses'], cache_stats['evictions']) == (1, 4, 2)
+
+    config_var_cache.clear()
+    assert len(config_var_cache) == 0
+    assert config_var_cache.obtain_cache_stats()['hit_rate'] == 0.0
+
+
+def test_least_rotation_array_matches_booth():
+
+    rng = np.random.default_rng(3)
+    for trial in range(600):
+        chain_length = int(rng.integers(1, 700))
+        if trial % 3 == 0:
+            chain = (rng.random(chain_length) < rng.random()).astype(np.uint8)
+        elif trial % 3 == 1:
+            chain = np.resize((rng.random(int(rng.integers(1, 100))) < 0.7).astype(np.uint8), chain_length)
+        else:
+            chain = np.zeros(chain_length, dtype=np.uint8)
+            chain[rng.integers(0, chain_length, size=int(rng.integers(0, 4)))] = 1
+        sequence = chain.tobytes()
+        start = obtain_least_rotation(sequence)
+        array_start = obtain_least_rotation_array(chain)
+        assert sequence[array_start:] + sequence[:array_start] == sequence[start:] + sequence[:start]
+
+
+def test_canonical_key_of_large_grid():
+
+    array_size_list = (1000, 4)
+    activ = (np.random.default_rng(1).random(4000) < 0.35).astype(np.int8)
+    grid = activ.reshape(4, 1000)
+    shifted = np.roll(grid, 7, axis=1).ravel()
+    reflected = grid[[1, 0, 3, 2], ::-1].ravel()
+    reordered = grid[[2, 3, 0, 1]].ravel()
+
+    key, complemented = obtain_canonical_key(activ, array_size_list)
+    assert not complemented
+    for pattern in (shifted, reflected, reordered):
+        assert obtain_canonical_key(pattern, array_size_list) == (key, False)
+    assert obtain_canonical_key(1 - activ, array_size_list) == (key, True)
+    other = activ.copy()
+    other[np.flatnonzero(other)[0]] = 0
+    assert obtain_canonical_key(other, array_size_list)[0] != key
+
+    config_var_cache = ConfigVarCache()
+    direct_counts = obtain_config_var_counts_batch(np.stack([activ, 1 - activ]), array_size_list)
+    for pattern in (activ, shifted, reflected, reordered):
+        assert np.array_equal(config_var_cache.obtain_config_var_counts(pattern, array_size_list), direct_counts[0])
+    assert np.array_equal(config_var_cache.obtain_config_var_counts(1 - activ, array_size_list), direct_counts[1])
+    assert (config_var_cache.hits, config_var_cache.misses) == (4, 1)
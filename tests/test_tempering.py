@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from cvm1d.grid import obtain_config_var_counts_batch, obtain_random_activations
+from cvm1d.monte_carlo import evaluate_config_var_counts
+from cvm1d.tempering import run_parallel_tempering
+
+
+def obtain_rung_activations(array_size_list, x1_list, seed):
+
+    return(np.stack([obtain_random_activations(array_size_list, x1, seed + rung) for rung, x1 in enumerate(x1_list)]))
+
+
+def test_tempering_does_not_depend_on_the_workers():
+
+    array_size_list = (30, 2)
+    activ = obtain_rung_activations(array_size_list, [0.4]*4, 1)
+    epsilon1 = np.linspace(-1.0, 0.5, 4)
+    temperature = np.geomspace(0.3, 1.5, 4)
+    one_worker = run_parallel_tempering(activ, array_size_list, epsilon1, temperature, 5, 200, max_workers=1, seed=9)
+    two_workers = run_parallel_tempering(activ, array_size_list, epsilon1, temperature, 5, 200, max_workers=2, seed=9)
+    for name in ('activ', 'config_var_counts', 'accepted_moves', 'exchanges_accepted', 'mean_free_energy'):
+        assert np.array_equal(one_worker[name], two_workers[name])
+
+
+# Even rounds try the pairs (0, 1), (2, 3), ...; odd rounds try (1, 2), (3, 4), ...; the patterns
+#   only move between rungs, so each keeps its x1, and the counts of each rung are those of its pattern
+def test_exchanges_alternate_and_keep_the_patterns():
+
+    array_size_list = (20, 4)
+    x1_list = [0.2, 0.3, 0.4, 0.5, 0.6]
+    activ = obtain_rung_activations(array_size_list, x1_list, 3)
+    epsilon1 = np.linspace(-2.0, 2.0, 5)
+    tempering_results = run_parallel_tempering(activ, array_size_list, epsilon1, 0.8, 7, 300, max_workers=1, seed=4)
+
+    assert tempering_results['exchange_attempts'].tolist() == [4, 3, 4, 3]
+    assert np.all(tempering_results['exchanges_accepted'] <= tempering_results['exchange_attempts'])
+    final_activ = tempering_results['activ']
+    assert sorted(final_activ.sum(axis=1).tolist()) == sorted(activ.sum(axis=1).tolist())
+    assert np.array_equal(tempering_results['config_var_counts'],
+                          obtain_config_var_counts_batch(final_activ, array_size_list))
+    for rung in range(5):
+        free_energy = evaluate_config_var_counts(tempering_results['config_var_counts'][rung], 80,
+                                                 epsilon1[rung])['free_energy']
+        assert abs(tempering_results['free_energy'][rung] - free_energy) < 1.0e-12
+
+
+# With no moves and the same eps1 and temperature on every rung, every exchange is accepted, and the
+#   patterns are passed along the ladder by the alternating pair swaps
+def test_equal_rungs_always_exchange():
+
+    array_size_list = (10, 2)
+    activ = obtain_rung_activations(array_size_list, [0.1, 0.3, 0.5, 0.7], 5)
+    tempering_results = run_parallel_tempering(activ, array_size_list, 0.5, 1.0, 3, 0, max_workers=1, seed=6)
+    assert np.array_equal(tempering_results['exchanges_accepted'], tempering_results['exchange_attempts'])
+
+    order = list(range(4))
+    for round_num in range(3):
+        for lower in range(round_num % 2, 3, 2):
+            order[lower], order[lower + 1] = order[lower + 1], order[lower]
+    assert np.array_equal(tempering_results['activ'], activ[order])
+
+    with pytest.raises(ValueError):
+        run_parallel_tempering(activ, array_size_list, 0.5, [1.0, 0.5, 0.0, 1.0], 1, 10, max_workers=1)
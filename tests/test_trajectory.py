@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from cvm1d.render import palette_colours, write_gif_frames, render_turtle_grid_image
+from cvm1d.trajectory import TrajectoryRecorder, iter_trajectory_grid_lists, write_trajectory_file
+
+
+def obtain_test_snapshots(array_size_list, num_snapshots, seed):
+
+    rng = np.random.default_rng(seed)
+
+    return(rng.integers(0, 2, (num_snapshots, array_size_list[1], array_size_list[0]), dtype=np.int8))
+
+
+# Every frame of a GIF file as an RGB image, decoded by Pillow
+def read_gif_frames(path):
+
+    image_module = pytest.importorskip('PIL.Image')
+    gif_plugin = pytest.importorskip('PIL.GifImagePlugin')
+    gif_plugin.LOADING_STRATEGY = gif_plugin.LoadingStrategy.RGB_ALWAYS
+    with image_module.open(path) as gif_image:
+        frames = list()
+        for frame_num in range(gif_image.n_frames):
+            gif_image.seek(frame_num)
+            frames.append(np.array(gif_image.convert('RGB')))
+        gif_info = dict(gif_image.info)
+
+    return(frames, gif_info)
+
+
+def test_ring_buffer_keeps_the_latest_snapshots():
+
+    snapshots = obtain_test_snapshots((70, 2), 12, 1)
+    recorder = TrajectoryRecorder((70, 2), capacity=5)
+    for move_num, activ_rows in enumerate(snapshots):
+        recorder.record(activ_rows.ravel(), 10*move_num)
+    assert len(recorder) == 5
+    kept = list(recorder.iter_snapshots())
+    assert [move_num for move_num, activ_rows in kept] == [70, 80, 90, 100, 110]
+    assert np.array_equal(np.array([activ_rows for move_num, activ_rows in kept]), snapshots[7:])
+
+
+def test_disk_recorder_keeps_every_snapshot(tmp_path):
+
+    snapshots = obtain_test_snapshots((9, 4), 11, 2)
+    recorder = TrajectoryRecorder((9, 4), directory=str(tmp_path / 'chunks'), snapshots_per_chunk=4)
+    for move_num, activ_rows in enumerate(snapshots):
+        recorder.record(activ_rows, move_num)
+    recorder.close()
+    assert len(recorder) == 11 and len(recorder.chunk_files) == 3
+    kept = list(recorder.iter_snapshots())
+    assert [move_num for move_num, activ_rows in kept] == list(range(11))
+    assert np.array_equal(np.array([activ_rows for move_num, activ_rows in kept]), snapshots)
+
+
+# Noise frames fill the LZW code table, so the coder has to send clear codes and restart
+def test_gif_frames_decode_exactly(tmp_path):
+
+    rng = np.random.default_rng(3)
+    frames = [rng.integers(0, 4, (150, 170), dtype=np.uint8), np.zeros((150, 170), dtype=np.uint8),
+              np.tile(np.arange(4, dtype=np.uint8).repeat(5), (150, 9))[:, :170]]
+    gif_path = tmp_path / 'frames.gif'
+    assert write_gif_frames(gif_path, frames, frame_duration=0.25) == 3
+    decoded_frames, gif_info = read_gif_frames(gif_path)
+    assert len(decoded_frames) == 3
+    for frame, decoded_frame in zip(frames, decoded_frames):
+        assert np.array_equal(decoded_frame, palette_colours[frame])
+    assert gif_info['duration'] == 250 and gif_info['loop'] == 0
+
+
+# Each frame shows the previous snapshot below the current one, with the changed nodes in red
+def test_trajectory_gif_frames_are_the_turtle_grid_pictures(tmp_path):
+
+    array_size_list = (8, 2)
+    snapshots = obtain_test_snapshots(array_size_list, 4, 4)
+    recorder = TrajectoryRecorder(array_size_list)
+    for move_num, activ_rows in enumerate(snapshots):
+        recorder.record(activ_rows, move_num)
+
+    grid_lists = [turtle_grid_list for move_num, turtle_grid_list in iter_trajectory_grid_lists(recorder)]
+    assert np.array_equal(grid_lists[0], np.tile(snapshots[0].ravel(), 2))
+    for snapshot_num in range(1, 4):
+        previous_activ, activ = snapshots[snapshot_num - 1].ravel(), snapshots[snapshot_num].ravel()
+        assert np.array_equal(grid_lists[snapshot_num][:16], previous_activ)
+        assert np.array_equal(grid_lists[snapshot_num][16:], activ + 2*(activ != previous_activ))
+
+    gif_path = tmp_path / 'trajectory.gif'
+    assert write_trajectory_file(recorder, gif_path, scale=0.3) == 4
+    decoded_frames = read_gif_frames(gif_path)[0]
+    for turtle_grid_list, decoded_frame in zip(grid_lists, decoded_frames):
+        assert np.array_equal(decoded_frame, render_turtle_grid_image(turtle_grid_list, array_size_list, 0.3))
+
+
+# One row per snapshot, the nodes of each zigzag chain in chain order
+def test_space_time_png_follows_the_chains(tmp_path):
+
+    image_module = pytest.importorskip('PIL.Image')
+    array_size_list = (5, 4)
+    snapshots = obtain_test_snapshots(array_size_list, 6, 5)
+    recorder = TrajectoryRecorder(array_size_list)
+    for move_num, activ_rows in enumerate(snapshots):
+        recorder.record(activ_rows, move_num)
+    png_path = tmp_path / 'space_time.png'
+    assert write_trajectory_file(recorder, png_path, pixel_size=2) == 6
+    with image_module.open(png_path) as png_image:
+        image = np.array(png_image.convert('RGB'))
+    assert image.shape == (12, 40, 3)
+
+    chains = np.concatenate([snapshots[:, 2*pair_num:2*pair_num + 2].transpose(0, 2, 1).reshape(6, 10)
+                             for pair_num in range(2)], axis=1)
+    changed = np.concatenate((np.zeros((1, 20), dtype=bool), chains[1:] != chains[:-1]))
+    colours = {(0, False): (255, 255, 255), (1, False): (0, 0, 0), (1, True): (255, 0, 0), (0, True): (0, 0, 255)}
+    expected = np.array([[colours[activ, change] for activ, change in zip(row, changed_row)]
+                         for row, changed_row in zip(chains.tolist(), changed.tolist())], dtype=np.uint8)
+    assert np.array_equal(image[::2, ::2], expected) and np.array_equal(image[1::2, 1::2], expected)
+
+    with pytest.raises(ValueError):
+        write_trajectory_file(recorder, tmp_path / 'space_time.bmp')
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from cvm1d.enumeration import enumerate_config_var_counts
+from cvm1d.grid import enthalpy_weights
+from cvm1d.monte_carlo import evaluate_config_var_counts
+from cvm1d.transfer_matrix import build_transfer_matrices, solve_transfer_matrix
+
+
+# The trace of T**(2*array_length), for each chain of the grid, is the sum over every pattern of
+#   exp(-(epsilon1/2)*(z2/2 + z3 + z4 + z5/2) + field*(ON nodes)), with the counts of the pattern
+def test_transfer_matrix_trace_matches_enumeration():
+
+    for array_size_list in ((5, 2), (4, 4)):
+        array_length, array_layers = array_size_list
+        config_var_counts, multiplicities = enumerate_config_var_counts(array_size_list)
+        on_counts = config_var_counts[:, 0] + config_var_counts[:, 1]/2.0
+        for epsilon1, field in ((-1.0, 0.0), (0.3, 0.0), (2.0, 0.0), (0.5, 0.7), (-1.5, -0.4)):
+            transfer_matrix = build_transfer_matrices(epsilon1, field)
+            partition_sum = np.trace(np.linalg.matrix_power(transfer_matrix, 2*array_length))**(array_layers//2)
+            pattern_sum = np.sum(multiplicities*np.exp(-0.5*epsilon1*(config_var_counts @ enthalpy_weights)
+                                                       + field*on_counts))
+            assert np.isclose(partition_sum, pattern_sum, rtol=1.0e-12)
+
+
+# The free energy of the demo programs is least for the infinite chain: no pattern of a finite
+#   grid goes below the transfer-matrix free energy, free or at its own x1
+def test_no_pattern_below_transfer_matrix_free_energy():
+
+    array_size_list = (6, 2)
+    total_nodes = 12
+    for x1_count in (None, 3, 6):
+        config_var_counts, multiplicities = enumerate_config_var_counts(array_size_list, x1_count)
+        x1 = None if x1_count is None else x1_count/float(total_nodes)
+        for epsilon1 in (-2.0, -0.5, 0.0, 1.0):
+            free_energy = np.array([evaluate_config_var_counts(counts, total_nodes, epsilon1)['free_energy']
+                                    for counts in config_var_counts])
+            assert free_energy.min() >= solve_transfer_matrix(epsilon1, x1)['free_energy'] - 1.0e-12
+
+
+def test_transfer_matrix_meets_its_x1():
+
+    tm_results = solve_transfer_matrix(np.linspace(-2.0, 2.0, 9)[:, None], np.array([0.0, 0.1, 0.35, 0.5, 1.0]))
+    assert np.allclose(tm_results['x1'], [0.0, 0.1, 0.35, 0.5, 1.0], rtol=0.0, atol=1.0e-9)
+    assert np.allclose(tm_results['config_vars'][..., 0:3].sum(axis=-1), 1.0)
+    assert np.allclose(tm_results['config_vars'][..., 6:12].sum(axis=-1), 1.0)